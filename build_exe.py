@@ -1,10 +1,32 @@
 """
 Build script to create an executable using PyInstaller
+
+Modes:
+    onefile  single executable (dist/HandGestureMouseControl.exe). Simple to share, but every
+             launch unpacks the whole bundle to a temp directory before main() runs.
+    onedir   folder with the executable and its libraries already unpacked
+             (dist/onedir/HandGestureMouseControl/). Starts without the extraction step.
+
+All of MediaPipe and OpenCV is bundled. --trim bundles only the MediaPipe
+Tasks modules and binaries the app uses, into dist/trim/. It is not the
+default until startup_benchmark.py shows it helps on the target machines:
+    python build_exe.py --mode onedir
+    python build_exe.py --mode onedir --trim
+    python startup_benchmark.py --variant onedir --variant onedir-trim
 """
 import PyInstaller.__main__
+import argparse
 import os
 import shutil
 
+APP_NAME = 'HandGestureMouseControl'
+
+parser = argparse.ArgumentParser(description="Build the Hand Gesture Mouse Control executable")
+parser.add_argument('--mode', default='onefile', choices=('onefile', 'onedir'))
+parser.add_argument('--trim', action='store_true',
+                    help="Bundle only the MediaPipe modules the app uses (built into dist/trim/)")
+build_args = parser.parse_args()
+
 # Check if model file exists
 if not os.path.exists('models/hand_landmarker.task'):
     print("ERROR: Model file not found!")
@@ -13,42 +35,83 @@ if not os.path.exists('models/hand_landmarker.task'):
     print("Run 'python main.py' once to download it, then build the executable.")
     exit(1)
 
-# Clean previous builds
+# Every mode / bundle combination builds side by side, so all of them can be benchmarked
+dist_root = os.path.join('dist', 'trim') if build_args.trim else 'dist'
+if build_args.mode == 'onefile':
+    dist_path = dist_root
+    output = os.path.join(dist_path, f'{APP_NAME}.exe')
+else:
+    dist_path = os.path.join(dist_root, 'onedir')
+    output = os.path.join(dist_path, APP_NAME)
+
+# Clean previous builds of this mode
 print("Cleaning previous builds...")
-if os.path.exists('dist'):
-    shutil.rmtree('dist')
+for path in (output, os.path.join(dist_path, APP_NAME)):
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    elif os.path.exists(path):
+        os.remove(path)
 if os.path.exists('build'):
     shutil.rmtree('build')
-if os.path.exists('HandGestureMouseControl.spec'):
-    os.remove('HandGestureMouseControl.spec')
+if os.path.exists(f'{APP_NAME}.spec'):
+    os.remove(f'{APP_NAME}.spec')
 
-print("Building executable...")
+print(f"Building {build_args.mode} executable{' (trimmed)' if build_args.trim else ''}...")
 print("This may take several minutes...")
 
 # PyInstaller arguments
 args = [
     'main.py',
-    '--name=HandGestureMouseControl',
-    '--onefile',  # Create a single executable file
+    f'--name={APP_NAME}',
+    f'--{build_args.mode}',  # Single executable file, or a folder that needs no extraction
+    f'--distpath={dist_path}',
     '--windowed',  # No console window (GUI app)
     '--add-data=models;models',  # Include models directory (Windows uses semicolon)
     '--hidden-import=mediapipe.tasks.python',
     '--hidden-import=mediapipe.tasks.python.vision',
     '--hidden-import=mediapipe.tasks.python.core',
-    '--hidden-import=mediapipe.framework.formats',
     '--hidden-import=cv2',
     '--hidden-import=PIL',
     '--hidden-import=pyautogui',
-    '--collect-all=mediapipe',  # Collect all mediapipe data files
-    '--collect-all=opencv-python',  # Collect all opencv data files
 ]
 
+if not build_args.trim:
+    args += [
+        '--hidden-import=mediapipe.framework.formats',
+        '--collect-all=mediapipe',  # Collect all mediapipe data files
+        '--collect-all=opencv-python',  # Collect all opencv data files
+    ]
+else:
+    args += [
+        # Hand landmarker / gesture recognizer: the Tasks vision API and its native library
+        '--collect-submodules=mediapipe.tasks.python.core',
+        '--collect-submodules=mediapipe.tasks.python.components',
+        '--collect-submodules=mediapipe.tasks.python.vision',
+        '--collect-binaries=mediapipe',
+        # Task families, tooling and optional frameworks the app never imports
+        '--exclude-module=mediapipe.tasks.python.audio',
+        '--exclude-module=mediapipe.tasks.python.text',
+        '--exclude-module=mediapipe.tasks.python.genai',
+        '--exclude-module=mediapipe.model_maker',
+        '--exclude-module=mediapipe.python.solutions',
+        '--exclude-module=matplotlib',
+        '--exclude-module=tensorflow',
+        '--exclude-module=jax',
+        '--exclude-module=torch',
+        '--exclude-module=pandas',
+        '--exclude-module=scipy',
+        # OpenCV: PyInstaller's cv2 hook collects the extension and its libraries
+    ]
+
 PyInstaller.__main__.run(args)
 
 print("\n" + "="*50)
-print("Build complete! Executable is in the 'dist' folder.")
+print(f"Build complete! Executable is in the '{dist_path}' folder.")
 print("="*50)
-print("\nFile: dist/HandGestureMouseControl.exe")
-print("\nNote: The executable is large (~100-200MB) because it includes")
-print("all dependencies. This is normal for PyInstaller executables.")
-
+if build_args.mode == 'onefile':
+    print(f"\nFile: {output}")
+    print("\nNote: The executable is large (~100-200MB) because it includes")
+    print("all dependencies. This is normal for PyInstaller executables.")
+else:
+    print(f"\nFolder: {output} (run {APP_NAME}.exe inside it)")
+    print("\nDistribute the whole folder - the executable needs the files next to it.")
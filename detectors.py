@@ -0,0 +1,409 @@
+"""
+Hand detection backends behind one interface.
+
+Every backend takes an RGB frame (unflipped camera image) and returns a
+HandDetection:
+    hand_landmarks  per hand, 21 points with .x/.y/.z in normalized image coordinates
+    handedness      per hand, a list of categories with .category_name ('Left'/'Right') and .score
+    gestures        per hand, an app gesture name (see gesture_stream.GESTURES) when the
+                    backend classifies gestures itself, otherwise None
+
+Backends:
+    landmarker          MediaPipe HandLandmarker (default)
+    gesture_recognizer  MediaPipe GestureRecognizer - landmarks plus its built-in gestures
+    remote              a shared inference server (see inference_server.py)
+    stub                deterministic scripted hands, no model or camera content needed
+
+Run `python detectors.py bench` to compare backends on the same frames.
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+import model_assets
+import model_registry
+from gestures import GestureClassifier, hand_side
+
+HandDetection = namedtuple('HandDetection', 'hand_landmarks handedness gestures')
+Landmark = namedtuple('Landmark', 'x y z')
+Category = namedtuple('Category', 'category_name score')
+
+BACKENDS = ('landmarker', 'gesture_recognizer', 'remote', 'stub')
+LOCAL_BACKENDS = ('landmarker', 'gesture_recognizer')  # Take their detection options from the app
+
+# GestureRecognizer's canned gestures -> app gesture names ('None' = let the rules decide)
+RECOGNIZER_GESTURES = {
+    'Closed_Fist': "FIST",
+    'Open_Palm': "OPEN PALM",
+    'Pointing_Up': "POINTING",
+    'Thumb_Up': "THUMB OUT",
+    'Thumb_Down': "THUMB OUT",
+    'Victory': "VICTORY",
+    'ILoveYou': "ROCK",  # Index + pinky up (thumb out too) - the closest app gesture
+}
+
+
+class HandDetector:
+    """Common interface: detect(frame_rgb) -> HandDetection, close()."""
+
+    name = 'base'
+    outage = None  # Why detection is currently unavailable (for the status bar), None while it works
+
+    def detect(self, frame_rgb):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class LandmarkerDetector(HandDetector):
+    """MediaPipe HandLandmarker in IMAGE mode."""
+
+    name = 'landmarker'
+
+    def __init__(self, model_path, num_hands=2, min_hand_detection_confidence=0.7):
+        import mediapipe as mp
+        from mediapipe.tasks.python import vision
+
+        self.mp = mp
+        options = vision.HandLandmarkerOptions(
+            base_options=model_assets.base_options(model_path),
+            num_hands=num_hands,
+            min_hand_detection_confidence=min_hand_detection_confidence,
+            min_hand_presence_confidence=0.5,
+            min_tracking_confidence=0.5
+        )
+        self.landmarker = vision.HandLandmarker.create_from_options(options)
+
+    def detect(self, frame_rgb):
+        result = self.landmarker.detect(self.mp.Image(image_format=self.mp.ImageFormat.SRGB, data=frame_rgb))
+        return HandDetection(result.hand_landmarks, result.handedness, [None] * len(result.hand_landmarks))
+
+    def close(self):
+        self.landmarker.close()
+
+
+class GestureRecognizerDetector(HandDetector):
+    """MediaPipe GestureRecognizer: the same hand landmarks plus built-in gesture classes."""
+
+    name = 'gesture_recognizer'
+
+    def __init__(self, model_path, num_hands=2, min_hand_detection_confidence=0.7, min_gesture_score=0.6):
+        import mediapipe as mp
+        from mediapipe.tasks.python import vision
+
+        self.mp = mp
+        self.min_gesture_score = min_gesture_score
+        options = vision.GestureRecognizerOptions(
+            base_options=model_assets.base_options(model_path),
+            num_hands=num_hands,
+            min_hand_detection_confidence=min_hand_detection_confidence,
+            min_hand_presence_confidence=0.5,
+            min_tracking_confidence=0.5
+        )
+        self.recognizer = vision.GestureRecognizer.create_from_options(options)
+
+    def detect(self, frame_rgb):
+        result = self.recognizer.recognize(self.mp.Image(image_format=self.mp.ImageFormat.SRGB, data=frame_rgb))
+        gestures = []
+        for idx in range(len(result.hand_landmarks)):
+            gesture = None
+            if idx < len(result.gestures) and result.gestures[idx]:
+                top = result.gestures[idx][0]
+                if top.score >= self.min_gesture_score:
+                    gesture = RECOGNIZER_GESTURES.get(top.category_name)
+            gestures.append(gesture)
+        return HandDetection(result.hand_landmarks, result.handedness, gestures)
+
+    def close(self):
+        self.recognizer.close()
+
+
+class RemoteDetector(HandDetector):
+    """Landmarks from an inference server.
+
+    Connecting happens on a background thread, so the frame loop never waits
+    on a server that is down. Attempts back off from RETRY_MIN to RETRY_MAX
+    seconds while it stays unreachable. Frames without a connection get no
+    hands, and `outage` says why.
+    """
+
+    name = 'remote'
+    RETRY_MIN = 0.5
+    RETRY_MAX = 10.0
+
+    def __init__(self, address, timeout=2.0):
+        from inference_server import RemoteHandLandmarker, parse_address
+        host, port = parse_address(address)
+        self.address = f"{host}:{port}"
+        self.client = RemoteHandLandmarker(host, port, timeout=timeout)
+        self.outage = f"Connecting to inference server {self.address}"
+        self.retry_delay = self.RETRY_MIN
+        self.next_attempt = 0.0
+        self.connecting = False
+        self.closed = False
+        self._start_connect()
+
+    def _start_connect(self):
+        if self.connecting or self.closed or time.perf_counter() < self.next_attempt:
+            return
+        self.connecting = True
+        threading.Thread(target=self._connect, name="RemoteDetectorConnect", daemon=True).start()
+
+    def _connect(self):
+        try:
+            self.client.connect()
+            if self.closed:
+                self.client.close()
+            self.outage = None
+            self.retry_delay = self.RETRY_MIN
+        except OSError as e:
+            self._failed(e)
+        finally:
+            self.connecting = False
+
+    def _failed(self, error):
+        self.outage = f"Inference server {self.address} unreachable, retrying ({error})"
+        self.next_attempt = time.perf_counter() + self.retry_delay
+        self.retry_delay = min(self.retry_delay * 2, self.RETRY_MAX)
+
+    def detect(self, frame_rgb):
+        if self.client.sock is None:
+            self._start_connect()
+            return HandDetection([], [], [])
+        try:
+            # A request on an open connection is bounded by the client timeout
+            result = self.client.detect_array(frame_rgb)
+        except (OSError, ConnectionError) as e:
+            # The client dropped the connection - reconnect in the background after the delay
+            self._failed(e)
+            return HandDetection([], [], [])
+        return HandDetection(result.hand_landmarks, result.handedness, [None] * len(result.hand_landmarks))
+
+    def wait_connected(self, timeout):
+        """Block until the first connection attempt is done (tools that must not skip frames)"""
+        deadline = time.perf_counter() + timeout
+        while self.client.sock is None and self.next_attempt == 0.0 and time.perf_counter() < deadline:
+            time.sleep(0.01)
+        return self.client.sock is not None
+
+    def close(self):
+        self.closed = True
+        self.client.close()
+
+
+# Finger poses for synthetic hands: (index, middle, ring, pinky) extended?, thumb pose
+STUB_POSES = {
+    "FIST": ((False, False, False, False), 'tucked'),
+    "POINTING": ((True, False, False, False), 'tucked'),
+    "VICTORY": ((True, True, False, False), 'tucked'),
+    "ROCK": ((True, False, False, True), 'tucked'),
+    "OPEN PALM": ((True, True, True, True), 'out'),
+    "THUMB OUT": ((False, False, False, False), 'out'),
+    "PINCH": ((True, True, True, True), 'pinch'),
+    "OK SIGN": ((False, True, True, True), 'ok'),
+}
+
+# A short loop through the gestures the app acts on, with hands entering and leaving
+DEFAULT_STUB_SCRIPT = (
+    (),
+    (('Right', "OPEN PALM"),),
+    (('Right', "POINTING"),),
+    (('Right', "POINTING"), ('Left', "POINTING")),
+    (('Right', "THUMB OUT"),),
+    (('Right', "VICTORY"),),
+    (('Right', "FIST"),),
+    (('Right', "FIST"), ('Left', "FIST")),
+)
+
+
+def synthetic_hand(gesture, side='Right', wrist=(0.5, 0.8)):
+    """21 landmarks that the rule classifier reads as `gesture` (see STUB_POSES)"""
+    fingers, thumb = STUB_POSES[gesture]
+    wx, wy = wrist
+    points = [(0.0, 0.0)]
+
+    # Thumb CMC, MCP, IP, TIP (thumb on the -x side of the hand)
+    tips = {'tucked': [(-0.04, -0.03), (-0.07, -0.06), (-0.05, -0.09), (-0.03, -0.10)],
+            'out': [(-0.04, -0.03), (-0.07, -0.06), (-0.11, -0.08), (-0.15, -0.10)]}
+    if thumb in tips:
+        points.extend(tips[thumb])
+
+    finger_points = []
+    for finger, extended in enumerate(fingers):
+        x = -0.045 + 0.03 * finger
+        mcp_y = -0.12
+        if extended:
+            finger_points.append([(x, mcp_y), (x, mcp_y - 0.05), (x, mcp_y - 0.09), (x, mcp_y - 0.12)])
+        else:
+            finger_points.append([(x, mcp_y), (x, mcp_y - 0.04), (x, mcp_y - 0.01), (x, mcp_y + 0.01)])
+
+    if thumb in ('pinch', 'ok'):
+        # Thumb tip meets the index tip (OK: just outside the pinch distance)
+        index_tip = finger_points[0][3]
+        offset = 0.01 if thumb == 'pinch' else 0.035
+        points.extend([(-0.04, -0.03), (-0.07, -0.06), (index_tip[0] - offset - 0.02, index_tip[1] + 0.02),
+                       (index_tip[0] - offset, index_tip[1])])
+
+    for finger in finger_points:
+        points.extend(finger)
+
+    mirror = 1.0 if side == 'Right' else -1.0
+    return [Landmark(wx + mirror * x, wy + y, 0.0) for x, y in points]
+
+
+class StubDetector(HandDetector):
+    """Deterministic backend: plays a script of hands, one script step per frame (frames are ignored).
+
+    Each script step is a tuple of (handedness, gesture) pairs. Gestures are
+    produced as landmarks for the rule classifier, not reported directly,
+    unless report_gestures is set.
+    """
+
+    name = 'stub'
+
+    def __init__(self, script=DEFAULT_STUB_SCRIPT, frames_per_step=30, report_gestures=False):
+        self.frames_per_step = frames_per_step
+        self.report_gestures = report_gestures
+        self.frame = 0
+        # Precompute every step so detect() costs nothing
+        self.steps = []
+        for step in script:
+            hand_landmarks, handedness, gestures = [], [], []
+            for slot, (side, gesture) in enumerate(step):
+                wrist = (0.3 + 0.4 * slot, 0.8)
+                hand_landmarks.append(synthetic_hand(gesture, side, wrist))
+                handedness.append([Category(side, 1.0)])
+                gestures.append(gesture if report_gestures else None)
+            self.steps.append(HandDetection(hand_landmarks, handedness, gestures))
+
+    def detect(self, frame_rgb):
+        step = self.steps[(self.frame // self.frames_per_step) % len(self.steps)]
+        self.frame += 1
+        return step
+
+
+def create_detector(backend, model_path=None, address=None, min_hand_detection_confidence=0.7):
+    if backend == 'landmarker':
+        return LandmarkerDetector(model_path, min_hand_detection_confidence=min_hand_detection_confidence)
+    if backend == 'gesture_recognizer':
+        return GestureRecognizerDetector(model_path, min_hand_detection_confidence=min_hand_detection_confidence)
+    if backend == 'remote':
+        return RemoteDetector(address)
+    if backend == 'stub':
+        return StubDetector()
+    raise ValueError(f"Unknown detector backend: {backend}")
+
+
+def frame_gestures(detection, classifier):
+    """Per hand (side, gesture): the backend's gesture when it has one, else the rule classifier's"""
+    hands = []
+    for idx, landmarks in enumerate(detection.hand_landmarks):
+        handedness = detection.handedness[idx] if idx < len(detection.handedness) else []
+        gesture = detection.gestures[idx] or classifier.get_gesture_name(landmarks)
+        hands.append((hand_side(handedness, landmarks), gesture, landmarks))
+    return hands
+
+
+def compare(reference, candidate, classifier):
+    """Agreement of one frame: (same hand count, [landmark distance per matched hand], gestures matched, hands matched)"""
+    ref_hands = {side: (gesture, landmarks) for side, gesture, landmarks in frame_gestures(reference, classifier)}
+    cand_hands = {side: (gesture, landmarks) for side, gesture, landmarks in frame_gestures(candidate, classifier)}
+    distances = []
+    gestures_matched = 0
+    for side in ref_hands.keys() & cand_hands.keys():
+        ref_gesture, ref_points = ref_hands[side]
+        cand_gesture, cand_points = cand_hands[side]
+        a = np.array([(lm.x, lm.y) for lm in ref_points])
+        b = np.array([(lm.x, lm.y) for lm in cand_points])
+        distances.append(float(np.linalg.norm(a - b, axis=1).mean()))
+        gestures_matched += ref_gesture == cand_gesture
+    return len(ref_hands) == len(cand_hands), distances, gestures_matched, len(distances)
+
+
+def run_benchmark(detectors, frames, warmup=5):
+    """Time each detector on the same frames and compare its output to the first detector's"""
+    classifier = GestureClassifier()
+    results = {}
+    for detector in detectors:
+        for frame in frames[:warmup]:
+            detector.detect(frame)
+        latencies, outputs = [], []
+        for frame in frames:
+            start = time.perf_counter()
+            outputs.append(detector.detect(frame))
+            latencies.append((time.perf_counter() - start) * 1000.0)
+        results[detector.name] = {'latencies': np.array(latencies), 'outputs': outputs}
+
+    reference = detectors[0].name
+    print(f"{len(frames)} frames, agreement relative to '{reference}'")
+    print(f"{'backend':<20} {'p50 ms':>8} {'p95 ms':>8} {'hands/frame':>12} {'count agree':>12} "
+          f"{'lm dist':>8} {'gesture agree':>14}")
+    for name, result in results.items():
+        latencies = result['latencies']
+        hands = np.mean([len(output.hand_landmarks) for output in result['outputs']])
+        count_agree, distances, gestures_matched, hands_matched = 0, [], 0, 0
+        for ref_output, output in zip(results[reference]['outputs'], result['outputs']):
+            same_count, frame_distances, frame_gestures_matched, frame_hands = compare(ref_output, output, classifier)
+            count_agree += same_count
+            distances.extend(frame_distances)
+            gestures_matched += frame_gestures_matched
+            hands_matched += frame_hands
+        distance = f"{np.mean(distances):.4f}" if distances else "-"
+        gesture_agree = f"{gestures_matched / hands_matched:.1%}" if hands_matched else "-"
+        print(f"{name:<20} {np.percentile(latencies, 50):>8.2f} {np.percentile(latencies, 95):>8.2f} "
+              f"{hands:>12.2f} {count_agree / len(frames):>12.1%} {distance:>8} {gesture_agree:>14}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare hand detection backends on the same frames")
+    sub = parser.add_subparsers(dest='command', required=True)
+    bench = sub.add_parser('bench')
+    bench.add_argument('--backends', nargs='+', default=['landmarker', 'gesture_recognizer', 'stub'],
+                       choices=BACKENDS, help="The first backend is the agreement reference")
+    bench.add_argument('--landmarker-model', default=None, help="Default: the bundled hand landmarker")
+    bench.add_argument('--recognizer-model', default=None, help="Default: models/gesture_recognizer.task")
+    bench.add_argument('--server', default=None, metavar='HOST:PORT', help="Inference server for 'remote'")
+    bench.add_argument('--clip', default=None, help="Video to take frames from (random frames otherwise)")
+    bench.add_argument('--frames', type=int, default=120)
+    args = parser.parse_args()
+
+    from inference_server import default_model_path
+    models_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+    model_paths = {
+        'landmarker': args.landmarker_model or default_model_path(),
+        'gesture_recognizer': args.recognizer_model or os.path.join(
+            models_dir, model_registry.AUXILIARY_MODELS['gesture_recognizer']['filename']),
+    }
+
+    detectors = []
+    for backend in args.backends:
+        try:
+            detector = create_detector(backend, model_paths.get(backend), args.server)
+        except Exception as e:
+            print(f"Skipping {backend}: {e}")
+            continue
+        if backend == 'remote' and not detector.wait_connected(5.0):
+            print(f"Skipping {backend}: {detector.outage}")
+            detector.close()
+            continue
+        detectors.append(detector)
+    if not detectors:
+        return 1
+    frames = model_registry.load_benchmark_frames(args.clip, max_frames=args.frames)
+    try:
+        run_benchmark(detectors, frames)
+    finally:
+        for detector in detectors:
+            detector.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
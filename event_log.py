@@ -0,0 +1,162 @@
+"""
+Structured event log with a background writer.
+
+The frame loop (and any other thread) only appends a tuple to a bounded
+deque - append/popleft on a deque are atomic in CPython, so there is no
+lock and no I/O on the caller's side. A daemon thread drains the queue a
+few times a second, serializes events to JSON lines and writes them to
+rotating files:
+    <dir>/events.jsonl, events.jsonl.1, ... (oldest dropped after `backups`)
+
+Each line is {"ts": unix time, "event": kind, ...fields}. Kinds used by
+the app: state, action, error, stats, camera (with a session summary on
+stop), detector, model, gesture_profile, pointer_calibration.
+
+Errors are deduplicated at the source: the same (where, message) is logged
+at most once per `error_interval` seconds, and the next one to get through
+carries the number of repeats that were suppressed. Entries older than
+that are forgotten whenever a new error is logged, so a long session with
+many distinct messages keeps only the recent ones. When the queue is full
+new events are dropped and counted rather than blocking the caller.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_BACKUPS = 5
+DEFAULT_CAPACITY = 10000  # Events queued before new ones are dropped
+DEFAULT_ERROR_INTERVAL = 5.0  # Seconds between logs of the same error
+DEFAULT_FLUSH_INTERVAL = 0.25  # Seconds between writer wake-ups
+
+
+class EventLog:
+    """Non-blocking JSON-lines event log. emit() from anywhere, start()/stop() from the owner."""
+
+    def __init__(self, directory='logs', filename='events.jsonl', max_bytes=DEFAULT_MAX_BYTES,
+                 backups=DEFAULT_BACKUPS, capacity=DEFAULT_CAPACITY, error_interval=DEFAULT_ERROR_INTERVAL,
+                 flush_interval=DEFAULT_FLUSH_INTERVAL, echo_errors=True):
+        self.path = os.path.join(directory, filename)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.capacity = capacity
+        self.error_interval = error_interval
+        self.flush_interval = flush_interval
+        self.echo_errors = echo_errors  # Errors also go to stderr - from the writer thread
+
+        self.queue = deque()
+        self.dropped = 0  # Events lost to a full queue
+        self.written = 0
+        self.failed = False  # The log file could not be written - events are only counted
+        self.errors_seen = {}  # (where, message) -> [time last logged, repeats suppressed since]
+
+        self.file = None
+        self.thread = None
+        self.stop_event = threading.Event()
+
+    def start(self):
+        if self.thread is not None:
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="EventLogWriter", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Log suppressed error counts, write everything still queued and close the file"""
+        for (where, message), (logged_at, repeats) in list(self.errors_seen.items()):
+            if repeats:
+                self.emit('error', where=where, message=message, repeats=repeats)
+        self.errors_seen.clear()
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(2.0)
+            self.thread = None
+
+    def emit(self, event, **fields):
+        """Queue one event (never blocks, drops when the queue is full)"""
+        if len(self.queue) >= self.capacity:
+            self.dropped += 1
+            return
+        self.queue.append((time.time(), event, fields))
+
+    def error(self, where, error):
+        """Queue an error, unless the same one was logged less than error_interval ago"""
+        message = str(error)
+        key = (where, message)
+        now = time.time()
+        seen = self.errors_seen.get(key)
+        if seen is not None and now - seen[0] < self.error_interval:
+            seen[1] += 1
+            return
+        repeats = seen[1] if seen is not None else 0
+        self.errors_seen.pop(key, None)  # Its repeats go out with this event, not with the eviction
+        self._evict(now)
+        self.errors_seen[key] = [now, 0]
+        if repeats:
+            self.emit('error', where=where, message=message, type=type(error).__name__, repeats=repeats)
+        else:
+            self.emit('error', where=where, message=message, type=type(error).__name__)
+
+    def _evict(self, now):
+        """Forget errors not seen for error_interval, so distinct messages don't pile up over a long session"""
+        for (where, message), (logged_at, repeats) in list(self.errors_seen.items()):
+            if now - logged_at >= self.error_interval:
+                if repeats:
+                    self.emit('error', where=where, message=message, repeats=repeats)
+                self.errors_seen.pop((where, message), None)
+
+    def _run(self):
+        try:
+            while not self.stop_event.wait(self.flush_interval):
+                self._drain()
+            self._drain()
+        finally:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+    def _drain(self):
+        lines = []
+        while self.queue:
+            timestamp, event, fields = self.queue.popleft()
+            record = {'ts': round(timestamp, 3), 'event': event}
+            record.update(fields)
+            lines.append(json.dumps(record, default=str))
+            if event == 'error' and self.echo_errors:
+                repeats = f" (repeated {fields['repeats']}x)" if fields.get('repeats') else ""
+                print(f"Error in {fields.get('where')}: {fields.get('message')}{repeats}", file=sys.stderr)
+        if not lines or self.failed:
+            return
+        try:
+            if self.file is None:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                self.file = open(self.path, 'a', encoding='utf-8')
+            self.file.write("\n".join(lines) + "\n")
+            self.file.flush()
+            self.written += len(lines)
+            if self.file.tell() >= self.max_bytes:
+                self._rotate()
+        except OSError as e:
+            # Keep the app running - events are lost from here on, say so once
+            print(f"Error writing event log {self.path}: {e}", file=sys.stderr)
+            self.failed = True
+            self.file = None
+
+    def _rotate(self):
+        self.file.close()
+        self.file = None
+        for index in range(self.backups - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    def describe(self):
+        status = "write failed, " if self.failed else ""
+        return f"Event log: {self.path}, {status}{self.written} events written, {self.dropped} dropped"
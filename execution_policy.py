@@ -0,0 +1,86 @@
+"""
+Per-control-state execution budget.
+
+Only a few gestures can change anything outside the ON state:
+- HARD_DISABLED: only the two-fists-apart unlock
+- SOFT_DISABLED: right hand pointing / open palm (enable) and the two-fists unlock
+
+Running full-rate, full-resolution inference and every classifier in those
+states wastes CPU, so each state gets its own frame interval, detection
+resolution and gesture set. The ON state keeps the full budget.
+"""
+import time
+
+# frame_interval_ms: minimum time between processed frames (camera frames arriving sooner are skipped)
+# gestures:
+# - 'all': full gesture processing for both hands
+# - 'enable': right hand pointing / open palm only (re-enable from soft disable)
+# - 'unlock': per-hand processing skipped, only the both-fists unlock runs
+STATE_POLICIES = {
+    'ON': {
+        'frame_interval_ms': 10,
+        'input_scale': 1.0,
+        'gestures': 'all',
+    },
+    'SOFT_DISABLED': {
+        'frame_interval_ms': 33,  # ~30 fps
+        'input_scale': 0.75,
+        'gestures': 'enable',
+    },
+    'HARD_DISABLED': {
+        'frame_interval_ms': 100,  # ~10 fps fist watcher - unlock needs a 0.5s hold anyway
+        'input_scale': 0.5,
+        'gestures': 'unlock',
+    },
+}
+
+
+def get_state_policy(control_state):
+    return STATE_POLICIES.get(control_state, STATE_POLICIES['ON'])
+
+
+class StateCpuMeter:
+    """Measure process CPU usage and frame rate separately for each control state."""
+
+    def __init__(self):
+        self.stats = {state: {'cpu': 0.0, 'wall': 0.0, 'frames': 0} for state in STATE_POLICIES}
+        self.last_state = None
+        self.last_cpu = None
+        self.last_wall = None
+
+    def reset(self):
+        self.__init__()
+
+    def tick(self, control_state):
+        """Call once per frame. Time since the previous tick is charged to the previous state."""
+        cpu = time.process_time()
+        wall = time.perf_counter()
+        if self.last_state is not None:
+            stats = self.stats[self.last_state]
+            stats['cpu'] += cpu - self.last_cpu
+            stats['wall'] += wall - self.last_wall
+            stats['frames'] += 1
+        self.last_state = control_state
+        self.last_cpu = cpu
+        self.last_wall = wall
+
+    def cpu_percent(self, control_state):
+        stats = self.stats[control_state]
+        if stats['wall'] <= 0:
+            return 0.0
+        return 100.0 * stats['cpu'] / stats['wall']
+
+    def fps(self, control_state):
+        stats = self.stats[control_state]
+        if stats['wall'] <= 0:
+            return 0.0
+        return stats['frames'] / stats['wall']
+
+    def describe(self):
+        """One-line per-state CPU comparison for the GUI"""
+        parts = []
+        for state in STATE_POLICIES:
+            if self.stats[state]['frames'] == 0:
+                continue
+            parts.append(f"{state}: {self.cpu_percent(state):.0f}% CPU @ {self.fps(state):.0f} fps")
+        return "CPU by state - " + (", ".join(parts) if parts else "no data yet")
@@ -0,0 +1,200 @@
+"""
+Event-driven frame pacing.
+
+A capture thread blocks on the camera and wakes the Tk main loop with a
+virtual event as soon as a new frame is available, instead of the main loop
+polling with root.after(10). Processing is therefore locked to the camera
+cadence: no wakeups without a frame, no scheduling jitter on top of it.
+
+The capture thread owns the capture: stop() only signals it and returns,
+and the thread releases the capture once its current read() returns. The
+main loop never waits on a read, and the thread never waits on the main
+loop after stop (no event_generate once stopping).
+
+Only the newest frame is kept. If processing falls behind, older frames are
+dropped rather than queued, and at most one wake-up event is ever pending.
+Lossless sources (files read as fast as possible, see frame_sources.py) are
+the exception: the next frame is only read once the last one was taken.
+"""
+import threading
+import time
+import tkinter as tk
+from collections import deque
+
+import numpy as np
+
+FRAME_READY_EVENT = '<<FrameReady>>'
+
+
+class FramePacer:
+    """Capture frames on a background thread and wake the Tk loop for each new one."""
+
+    def __init__(self, root, cap, event_name=FRAME_READY_EVENT, stats_window=120, error_fn=None):
+        self.root = root
+        self.cap = cap
+        self.event_name = event_name
+        self.error_fn = error_fn  # Called with the error when the source stops delivering (default: print)
+        self.lock = threading.Lock()
+        self.thread = None
+        self.running = False
+        self.failed = False  # Camera stopped delivering frames (the main loop is woken to notice)
+        self.released = threading.Event()  # The capture has been released
+
+        self.latest = None  # (frame, captured_at, seq, timestamp) not yet taken by the main loop
+        self.event_pending = False
+        self.seq = 0
+        self.lossless = getattr(cap, 'lossless', False)
+        self.frame_taken = threading.Event()  # Lossless sources: the last frame was taken
+
+        # Pacing statistics
+        self.captured = 0
+        self.taken = 0
+        self.dropped = 0  # Overwritten before the main loop took them
+        self.skipped = 0  # Taken but deliberately not processed (rate limited)
+        self.capture_intervals = deque(maxlen=stats_window)  # Seconds between camera frames
+        self.process_intervals = deque(maxlen=stats_window)  # Seconds between taken frames
+        self.wake_delays = deque(maxlen=stats_window)  # Capture -> main loop pickup (seconds)
+        self.last_capture_time = None
+        self.last_take_time = None
+
+    def start(self):
+        self.running = True
+        self.failed = False
+        self.frame_taken.set()
+        self.thread = threading.Thread(target=self._capture_loop, name="FrameCapture", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop capturing without waiting. The capture thread releases the capture (see `released`)."""
+        self.running = False
+        self.frame_taken.set()  # Lossless sources: don't wait for a take that won't come
+        if self.thread is None:
+            self._release()  # Never started
+        with self.lock:
+            self.latest = None
+            self.event_pending = False
+
+    def _release(self):
+        try:
+            self.cap.release()
+        finally:
+            self.released.set()
+
+    def _capture_loop(self):
+        try:
+            self._capture()
+        finally:
+            # Here rather than in stop(): a read() may still be in progress when stop() returns
+            self._release()
+
+    def _capture(self):
+        while self.running:
+            if self.lossless:
+                # Don't read ahead - every frame reaches the main loop, in order
+                while self.running and not self.frame_taken.wait(0.1):
+                    pass
+                if not self.running:
+                    break
+                self.frame_taken.clear()
+            if hasattr(self.cap, 'read_frame'):
+                # Frame sources number their frames (shared memory gaps are the producer's drops)
+                item = self.cap.read_frame()
+                ret, frame, seq, timestamp = (True, item.image, item.seq, item.timestamp) if item is not None \
+                    else (False, None, None, None)
+            else:
+                ret, frame = self.cap.read()
+                seq = self.seq + 1
+                timestamp = None
+            if not self.running:
+                break
+            if not ret:
+                self.failed = True
+                error = IOError("Camera stopped delivering frames")
+                if self.error_fn:
+                    self.error_fn(error)
+                else:
+                    print(error)
+                # Always wake the main loop, even with a wake-up pending: the handler finds no frame and sees failed
+                self._notify()
+                break
+
+            now = time.perf_counter()
+            if self.last_capture_time is not None:
+                self.capture_intervals.append(now - self.last_capture_time)
+            self.last_capture_time = now
+
+            with self.lock:
+                if self.latest is not None:
+                    self.dropped += 1
+                self.seq = seq
+                self.captured += 1
+                self.latest = (frame, now, self.seq, timestamp)
+                # Only one wake-up in flight - the handler always takes the newest frame
+                notify = not self.event_pending
+                self.event_pending = True
+
+            if notify and not self._notify():
+                break
+
+    def _notify(self):
+        """Wake the main loop. False when stopping or Tk is shutting down."""
+        # event_generate from this thread waits for the main loop, which may be busy stopping us
+        if not self.running:
+            return False
+        try:
+            self.root.event_generate(self.event_name, when='tail')
+        except (tk.TclError, RuntimeError):
+            # Tk is shutting down
+            return False
+        return True
+
+    def take_frame(self):
+        """Take the newest frame from the main loop. Returns (frame, captured_at, seq, timestamp) or None.
+
+        captured_at is time.perf_counter() on arrival; timestamp is the source's own frame time
+        (media time for files, see frame_sources.py), None for a plain cv2.VideoCapture.
+        """
+        with self.lock:
+            item = self.latest
+            self.latest = None
+            self.event_pending = False
+        if item is None:
+            return None
+        self.frame_taken.set()
+
+        now = time.perf_counter()
+        self.taken += 1
+        self.wake_delays.append(now - item[1])
+        if self.last_take_time is not None:
+            self.process_intervals.append(now - self.last_take_time)
+        self.last_take_time = now
+        return item
+
+    def mark_skipped(self):
+        """Record that the last taken frame was not processed"""
+        self.skipped += 1
+
+    def stats(self):
+        """Effective pacing statistics"""
+        def fps(intervals):
+            return 1.0 / np.mean(intervals) if intervals else 0.0
+
+        def percentile_ms(values, q):
+            return float(np.percentile(values, q)) * 1000.0 if values else 0.0
+
+        return {
+            'camera_fps': fps(self.capture_intervals),
+            'process_fps': fps(self.process_intervals),
+            'wake_delay_p50_ms': percentile_ms(self.wake_delays, 50),
+            'wake_delay_p95_ms': percentile_ms(self.wake_delays, 95),
+            'captured': self.captured,
+            'dropped': self.dropped,
+            'skipped': self.skipped,
+        }
+
+    def describe(self):
+        """One-line pacing status for the GUI"""
+        s = self.stats()
+        return (f"Pacing: camera {s['camera_fps']:.1f} fps, processing {s['process_fps']:.1f} fps, "
+                f"wake delay p50 {s['wake_delay_p50_ms']:.1f}ms / p95 {s['wake_delay_p95_ms']:.1f}ms, "
+                f"dropped {s['dropped']}, rate-limited {s['skipped']}")
@@ -0,0 +1,347 @@
+"""
+Frame sources: where the frame loop gets its frames from.
+
+Every source has the cv2.VideoCapture methods the app uses (isOpened, read,
+release), so it can be handed to FramePacer in place of a camera, plus
+read_frame(), which returns a Frame carrying the image, a timestamp and a
+sequence number.
+
+    camera[:INDEX]       live device (timestamp: time.perf_counter() on arrival)
+    video:PATH           recorded clip paced at its own frame rate
+    video-fast:PATH      recorded clip as fast as the app takes frames
+    images:DIR           image files in name order, paced at 30 fps
+    images-fast:DIR      image files as fast as the app takes frames
+    synthetic[-fast]     generated gradient frames (for the stub detector)
+    shm:NAME             frames written by another process (SharedMemoryProducer)
+
+File-backed and synthetic sources are deterministic: timestamps are media
+time (frame index / fps) and sequence numbers count from 1. The "-fast"
+variants are lossless - FramePacer waits for each frame to be taken before
+reading the next, so every frame reaches the pipeline, in order, and the
+app runs its hold timers and cooldowns on the frame timestamps - which is
+what benchmarks and CI runs want.
+
+Feed the app from another process through shared memory:
+    python frame_sources.py produce hgmc_frames --source video:clip.mp4
+    python main.py --source shm:hgmc_frames
+"""
+import argparse
+import os
+import sys
+import time
+from collections import namedtuple
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+Frame = namedtuple('Frame', ['image', 'timestamp', 'seq'])
+
+DEFAULT_FPS = 30.0
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff', '.webp')
+SHM_HEADER_BYTES = 64  # seq_begin u64, seq_end u64, timestamp f64, height/width/channels u32
+SHM_TIMEOUT = 5.0  # Seconds without a new frame before a shared-memory source gives up
+SHM_POLL_INTERVAL = 0.001
+
+
+class FrameSource:
+    """Base class. Subclasses implement _grab() -> (image, timestamp[, seq]) or None at the end."""
+
+    lossless = False  # FramePacer reads the next frame only once the last one was taken
+
+    def __init__(self, fps=DEFAULT_FPS, realtime=False, speed=1.0):
+        self.fps = fps
+        self.realtime = realtime
+        self.interval = 1.0 / (fps * speed) if realtime else 0.0
+        self.next_frame = None
+        self.seq = 0  # Sequence number of the last frame returned
+
+    def isOpened(self):
+        return True
+
+    def _wait(self):
+        """Hold the frame until its slot on the real-time schedule"""
+        now = time.perf_counter()
+        if self.next_frame is None:
+            self.next_frame = now
+        elif self.next_frame > now:
+            time.sleep(self.next_frame - now)
+        # Don't try to catch up after a stall
+        self.next_frame = max(self.next_frame + self.interval, now)
+
+    def read_frame(self):
+        """The next Frame, or None when the source is exhausted or failed"""
+        if self.realtime:
+            self._wait()
+        item = self._grab()
+        if item is None:
+            return None
+        self.seq = item[2] if len(item) > 2 else self.seq + 1
+        return Frame(item[0], item[1], self.seq)
+
+    def read(self):
+        """cv2.VideoCapture-compatible read"""
+        frame = self.read_frame()
+        if frame is None:
+            return False, None
+        return True, frame.image
+
+    def release(self):
+        pass
+
+
+class CameraSource(FrameSource):
+    """A live capture device"""
+
+    def __init__(self, index=0):
+        super().__init__()
+        self.cap = cv2.VideoCapture(index)
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or DEFAULT_FPS
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def _grab(self):
+        ret, frame = self.cap.read()
+        return (frame, time.perf_counter()) if ret else None
+
+    def release(self):
+        self.cap.release()
+
+
+class VideoFileSource(FrameSource):
+    """A recorded clip, paced at its frame rate (times speed) or read as fast as it is taken"""
+
+    def __init__(self, path, realtime=True, speed=1.0, loop=False):
+        self.cap = cv2.VideoCapture(path)
+        super().__init__(self.cap.get(cv2.CAP_PROP_FPS) or DEFAULT_FPS, realtime, speed)
+        self.lossless = not realtime
+        self.loop = loop
+        self.loops = 0
+        self.index = 0  # Frames read, across loops (media time keeps increasing)
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def _grab(self):
+        ret, frame = self.cap.read()
+        if not ret and self.loop and self.index:
+            self.loops += 1
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read()
+        if not ret:
+            return None
+        self.index += 1
+        return frame, (self.index - 1) / self.fps
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageDirectorySource(FrameSource):
+    """Image files of a directory in name order (BGR, like a camera)"""
+
+    def __init__(self, directory, fps=DEFAULT_FPS, realtime=True, speed=1.0, loop=False):
+        super().__init__(fps, realtime, speed)
+        self.lossless = not realtime
+        self.paths = sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                            if name.lower().endswith(IMAGE_EXTENSIONS)) if os.path.isdir(directory) else []
+        self.loop = loop
+        self.index = 0
+
+    def isOpened(self):
+        return bool(self.paths)
+
+    def _grab(self):
+        if self.index >= len(self.paths):
+            if not self.loop or not self.paths:
+                return None
+        frame = cv2.imread(self.paths[self.index % len(self.paths)])
+        if frame is None:
+            print(f"Could not read {self.paths[self.index % len(self.paths)]}")
+            return None
+        self.index += 1
+        return frame, (self.index - 1) / self.fps
+
+
+class SyntheticSource(FrameSource):
+    """Moving gradient frames (use with the stub detector, which ignores frame content)"""
+
+    def __init__(self, realtime=True, speed=1.0, width=640, height=480, fps=DEFAULT_FPS, count=60, limit=None):
+        super().__init__(fps, realtime, speed)
+        self.lossless = not realtime
+        self.limit = limit  # Frames to deliver (None = endless)
+        x = np.linspace(0, 255, width, dtype=np.float32)
+        y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+        self.frames = []
+        for i in range(count):
+            shift = 255.0 * i / count
+            frame = np.empty((height, width, 3), dtype=np.uint8)
+            frame[:, :, 0] = (x + shift) % 256
+            frame[:, :, 1] = (y + shift) % 256
+            frame[:, :, 2] = (x + y) / 2
+            self.frames.append(frame)
+
+    def _grab(self):
+        if self.limit is not None and self.seq >= self.limit:
+            return None
+        # A fresh array per frame, like a camera
+        return self.frames[self.seq % len(self.frames)].copy(), self.seq / self.fps
+
+
+def _attach(name):
+    """Open an existing shared memory block without adopting it (the producer unlinks it)"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13 the resource tracker would unlink the block when this process exits
+        shm = shared_memory.SharedMemory(name=name)
+        if os.name == 'posix':
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
+
+
+def _shm_views(buffer):
+    """(seq_begin/seq_end, timestamp, height/width/channels, data) views of a shared block"""
+    return (np.ndarray((2,), dtype='<u8', buffer=buffer, offset=0),
+            np.ndarray((1,), dtype='<f8', buffer=buffer, offset=16),
+            np.ndarray((3,), dtype='<u4', buffer=buffer, offset=24),
+            np.ndarray((len(buffer) - SHM_HEADER_BYTES,), dtype=np.uint8, buffer=buffer, offset=SHM_HEADER_BYTES))
+
+
+class SharedMemoryProducer:
+    """Publish frames to a named shared memory block for a SharedMemorySource in another process.
+
+    One slot, guarded like a seqlock: seq_begin is set before the pixels are
+    written and seq_end after, so a reader that sees them differ retries.
+    """
+
+    def __init__(self, name, width, height, channels=3):
+        self.shm = shared_memory.SharedMemory(name=name, create=True,
+                                              size=SHM_HEADER_BYTES + width * height * channels)
+        self.seqs, self.timestamp, self.shape, self.data = _shm_views(self.shm.buf)
+        self.shape[:] = (height, width, channels)
+        self.seq = 0
+
+    def write(self, image, timestamp=None):
+        height, width, channels = (int(value) for value in self.shape)
+        if image.shape != (height, width, channels) or image.dtype != np.uint8:
+            raise ValueError(f"Frame must be uint8 {height}x{width}x{channels}, got {image.dtype} {image.shape}")
+        self.seq += 1
+        self.seqs[0] = self.seq
+        self.timestamp[0] = time.perf_counter() if timestamp is None else timestamp
+        self.data[:image.size] = image.reshape(-1)
+        self.seqs[1] = self.seq
+
+    def close(self):
+        # Drop the numpy views first - the block can't be closed while they exist
+        self.seqs = self.timestamp = self.shape = self.data = None
+        self.shm.close()
+        self.shm.unlink()
+
+
+class SharedMemorySource(FrameSource):
+    """Frames from a SharedMemoryProducer. Sequence numbers are the producer's, so gaps are drops."""
+
+    def __init__(self, name, timeout=SHM_TIMEOUT, poll_interval=SHM_POLL_INTERVAL):
+        super().__init__()
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        try:
+            self.shm = _attach(name)
+        except (FileNotFoundError, OSError) as e:
+            print(f"Could not open shared memory '{name}': {e}")
+            self.shm = None
+            return
+        self.seqs, self.timestamp, self.shape, self.data = _shm_views(self.shm.buf)
+
+    def isOpened(self):
+        return self.shm is not None
+
+    def _grab(self):
+        if self.shm is None:
+            return None
+        deadline = time.perf_counter() + self.timeout
+        while True:
+            seq = int(self.seqs[1])
+            if seq and seq != self.seq:
+                timestamp = float(self.timestamp[0])
+                height, width, channels = (int(value) for value in self.shape)
+                image = self.data[:height * width * channels].reshape(height, width, channels).copy()
+                if int(self.seqs[0]) == seq:
+                    return image, timestamp, seq
+                continue  # The producer started the next frame while we copied - take that one
+            if time.perf_counter() > deadline:
+                print("Shared memory producer stopped sending frames")
+                return None
+            time.sleep(self.poll_interval)
+
+    def release(self):
+        if self.shm is not None:
+            self.seqs = self.timestamp = self.shape = self.data = None
+            self.shm.close()
+            self.shm = None
+
+
+def open_source(spec):
+    """Create a frame source from a spec like 'camera:0', 'video-fast:clip.mp4' or 'shm:hgmc_frames'"""
+    kind, _, argument = spec.partition(':')
+    if kind.isdigit():
+        return CameraSource(int(kind))
+    fast = kind.endswith('-fast')
+    kind = kind[:-len('-fast')] if fast else kind
+    if kind == 'camera':
+        return CameraSource(int(argument or 0))
+    if kind == 'video':
+        return VideoFileSource(argument, realtime=not fast)
+    if kind == 'images':
+        return ImageDirectorySource(argument, realtime=not fast)
+    if kind == 'synthetic':
+        return SyntheticSource(realtime=not fast)
+    if kind == 'shm':
+        return SharedMemorySource(argument)
+    raise ValueError(f"Unknown frame source '{spec}' (camera, video, images, synthetic, shm)")
+
+
+def produce(name, spec, loop):
+    """Copy frames from a source into shared memory until it ends (or forever with loop)"""
+    source = open_source(spec)
+    if not source.isOpened():
+        print(f"Could not open {spec}")
+        return 1
+    if isinstance(source, (VideoFileSource, ImageDirectorySource)):
+        source.loop = loop
+    frame = source.read_frame()
+    if frame is None:
+        print(f"No frames in {spec}")
+        return 1
+    height, width, channels = frame.image.shape
+    producer = SharedMemoryProducer(name, width, height, channels)
+    print(f"Producing {width}x{height} frames to shared memory '{name}' (Ctrl+C to stop)")
+    try:
+        while frame is not None:
+            producer.write(frame.image)
+            frame = source.read_frame()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"{producer.seq} frames written")
+        producer.close()
+        source.release()
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Frame source tools")
+    sub = parser.add_subparsers(dest='command', required=True)
+    produce_parser = sub.add_parser('produce', help="Publish frames to shared memory for main.py --source shm:NAME")
+    produce_parser.add_argument('name')
+    produce_parser.add_argument('--source', default='camera:0', help="Frame source spec to read from")
+    produce_parser.add_argument('--loop', action='store_true', help="Rewind clips and image directories")
+    args = parser.parse_args()
+    return produce(args.name, args.source, args.loop)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
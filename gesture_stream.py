@@ -0,0 +1,276 @@
+"""
+Low-latency gesture event stream for other local applications.
+
+Publishes per-frame hand landmarks, classified gestures, palm orientation
+and control state transitions as compact binary UDP datagrams on localhost.
+UDP works the same on Windows, macOS and Linux.
+
+Subscribing: a client sends a SUBSCRIBE datagram to the publisher port and
+repeats it at least every SUBSCRIPTION_TIMEOUT seconds (GestureEventSubscriber
+does this for you). The publisher sends every event to every live subscriber
+with a non-blocking sendto. A slow or dead consumer only loses its own
+datagrams and never delays the frame loop.
+
+Datagram layout (little endian):
+    header  '<2sBBId'  magic b'HG', version, message type, sequence, timestamp (time.time())
+    FRAME   '<BB'      control state, hand count, then per hand:
+            '<BBbB'    handedness (0 left, 1 right), gesture code, palm facing (1 front, 0 back, -1 n/a), reserved
+            63 x float32  landmarks x, y, z for the 21 points
+    STATE   '<BB'      previous control state, new control state
+"""
+import socket
+import struct
+import threading
+import time
+
+import numpy as np
+
+DEFAULT_EVENT_PORT = 47800
+SUBSCRIPTION_TIMEOUT = 5.0  # Seconds without a renewal before a subscriber is dropped
+
+MAGIC = b'HG'
+VERSION = 1
+
+MSG_FRAME = 1
+MSG_STATE = 2
+MSG_SUBSCRIBE = 3
+MSG_UNSUBSCRIBE = 4
+
+HEADER = struct.Struct('<2sBBId')
+FRAME_INFO = struct.Struct('<BB')
+HAND_INFO = struct.Struct('<BBbB')
+STATE_INFO = struct.Struct('<BB')
+NUM_LANDMARKS = 21
+LANDMARK_BYTES = NUM_LANDMARKS * 3 * 4
+
+CONTROL_STATES = ('ON', 'SOFT_DISABLED', 'HARD_DISABLED')
+GESTURES = ('UNKNOWN', 'THUMB OUT', 'FIST', 'POINTING', 'PINCH', 'OPEN PALM', 'VICTORY', 'OK SIGN', 'ROCK', 'IDLE')
+
+_STATE_CODES = {name: code for code, name in enumerate(CONTROL_STATES)}
+_GESTURE_CODES = {name: code for code, name in enumerate(GESTURES)}
+
+
+def encode_header(msg_type, seq, timestamp=None):
+    return HEADER.pack(MAGIC, VERSION, msg_type, seq & 0xFFFFFFFF, time.time() if timestamp is None else timestamp)
+
+
+def encode_frame(seq, control_state, hands, timestamp=None):
+    """Encode a FRAME message.
+
+    Args:
+        hands: list of (is_right_hand, gesture_name, palm_facing, landmarks) where
+               palm_facing is True/False/None and landmarks has .x/.y/.z points
+    """
+    parts = [encode_header(MSG_FRAME, seq, timestamp), FRAME_INFO.pack(_STATE_CODES[control_state], len(hands))]
+    for is_right_hand, gesture_name, palm_facing, landmarks in hands:
+        palm_code = -1 if palm_facing is None else int(bool(palm_facing))
+        parts.append(HAND_INFO.pack(int(is_right_hand), _GESTURE_CODES.get(gesture_name, 0), palm_code, 0))
+        points = np.array([(lm.x, lm.y, lm.z) for lm in landmarks], dtype='<f4')
+        parts.append(points.tobytes())
+    return b''.join(parts)
+
+
+def encode_state(seq, previous_state, new_state, timestamp=None):
+    return encode_header(MSG_STATE, seq, timestamp) + STATE_INFO.pack(
+        _STATE_CODES[previous_state], _STATE_CODES[new_state])
+
+
+def decode(data):
+    """Decode a datagram into a dict (raises ValueError for foreign or malformed data)"""
+    try:
+        return _decode(data)
+    except (struct.error, IndexError) as e:
+        # Truncated packet or an unknown state/gesture code
+        raise ValueError(f"malformed datagram: {e}") from e
+
+
+def _decode(data):
+    if len(data) < HEADER.size:
+        raise ValueError("datagram too short")
+    magic, version, msg_type, seq, timestamp = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a gesture stream datagram")
+    event = {'type': msg_type, 'seq': seq, 'timestamp': timestamp}
+    offset = HEADER.size
+
+    if msg_type == MSG_FRAME:
+        state_code, hand_count = FRAME_INFO.unpack_from(data, offset)
+        offset += FRAME_INFO.size
+        event['control_state'] = CONTROL_STATES[state_code]
+        hands = []
+        for _ in range(hand_count):
+            right, gesture_code, palm_code, _reserved = HAND_INFO.unpack_from(data, offset)
+            offset += HAND_INFO.size
+            landmarks = np.frombuffer(data, dtype='<f4', count=NUM_LANDMARKS * 3, offset=offset)
+            offset += LANDMARK_BYTES
+            hands.append({
+                'handedness': 'Right' if right else 'Left',
+                'gesture': GESTURES[gesture_code] if gesture_code < len(GESTURES) else 'UNKNOWN',
+                'palm_facing': None if palm_code < 0 else bool(palm_code),
+                'landmarks': landmarks.reshape(NUM_LANDMARKS, 3),
+            })
+        event['hands'] = hands
+    elif msg_type == MSG_STATE:
+        previous_code, new_code = STATE_INFO.unpack_from(data, offset)
+        event['previous_state'] = CONTROL_STATES[previous_code]
+        event['control_state'] = CONTROL_STATES[new_code]
+    return event
+
+
+class GestureEventPublisher:
+    """Fan out gesture events to all subscribers without ever blocking the caller."""
+
+    def __init__(self, port=DEFAULT_EVENT_PORT, host='127.0.0.1'):
+        self.host = host
+        self.port = port
+        self.sock = None  # Receives subscription requests
+        self.send_sock = None  # Non-blocking, used by the frame loop only
+        self.thread = None
+        self.running = False
+        self.seq = 0
+        # address -> last renewal time; replaced wholesale so the frame loop can read it without a lock
+        self.subscribers = {}
+        self.sent = 0
+        self.send_failures = 0
+
+    def start(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((self.host, self.port))
+        self.send_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.send_sock.setblocking(False)
+        self.running = True
+        self.thread = threading.Thread(target=self._subscription_loop, name="GestureStream", daemon=True)
+        self.thread.start()
+        print(f"Gesture event stream on udp://{self.host}:{self.port}")
+
+    def stop(self):
+        self.running = False
+        if self.sock:
+            self.sock.close()
+            self.sock = None
+        if self.send_sock:
+            self.send_sock.close()
+            self.send_sock = None
+
+    def has_subscribers(self):
+        return bool(self.subscribers)
+
+    def _subscription_loop(self):
+        """Handle SUBSCRIBE / UNSUBSCRIBE datagrams and expire silent subscribers"""
+        self.sock.settimeout(1.0)
+        while self.running:
+            try:
+                data, address = self.sock.recvfrom(64)
+            except socket.timeout:
+                data, address = None, None
+            except OSError:
+                # Socket closed by stop(), or Windows reporting an unreachable subscriber
+                if not self.running:
+                    break
+                continue
+
+            now = time.monotonic()
+            subscribers = {addr: seen for addr, seen in self.subscribers.items()
+                           if now - seen < SUBSCRIPTION_TIMEOUT}
+            if data and len(data) >= HEADER.size:
+                try:
+                    magic, version, msg_type, _seq, _timestamp = HEADER.unpack_from(data, 0)
+                except struct.error:
+                    continue
+                if magic == MAGIC and version == VERSION:
+                    if msg_type == MSG_SUBSCRIBE:
+                        subscribers[address] = now
+                    elif msg_type == MSG_UNSUBSCRIBE:
+                        subscribers.pop(address, None)
+            self.subscribers = subscribers
+
+    def _send(self, payload):
+        sock = self.send_sock
+        if sock is None:
+            return
+        for address in tuple(self.subscribers):
+            try:
+                # Non-blocking: a full buffer or a vanished receiver only loses
+                # this datagram for that subscriber
+                sock.sendto(payload, address)
+                self.sent += 1
+            except OSError:
+                self.send_failures += 1
+
+    def publish_frame(self, control_state, hands):
+        if not self.subscribers:
+            return
+        self.seq += 1
+        self._send(encode_frame(self.seq, control_state, hands))
+
+    def publish_state(self, previous_state, new_state):
+        if not self.subscribers:
+            return
+        self.seq += 1
+        self._send(encode_state(self.seq, previous_state, new_state))
+
+
+class GestureEventSubscriber:
+    """Client helper: subscribe to a publisher and iterate over decoded events."""
+
+    def __init__(self, port=DEFAULT_EVENT_PORT, host='127.0.0.1', renew_interval=SUBSCRIPTION_TIMEOUT / 3):
+        self.publisher = (host, port)
+        self.renew_interval = renew_interval
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((host, 0))
+        # Bigger receive buffer so bursts survive a briefly busy consumer
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+        self.sock.settimeout(renew_interval)
+        self.last_renewal = 0.0
+
+    def _renew(self):
+        self.sock.sendto(encode_header(MSG_SUBSCRIBE, 0), self.publisher)
+        self.last_renewal = time.monotonic()
+
+    def events(self):
+        """Yield decoded events forever (renews the subscription as needed)"""
+        self._renew()
+        while True:
+            if time.monotonic() - self.last_renewal >= self.renew_interval:
+                self._renew()
+            try:
+                data, _address = self.sock.recvfrom(4096)
+            except socket.timeout:
+                continue
+            except ConnectionResetError:
+                # Windows: publisher not running yet
+                continue
+            try:
+                event = decode(data)
+            except ValueError:
+                continue
+            yield event
+
+    def close(self):
+        try:
+            self.sock.sendto(encode_header(MSG_UNSUBSCRIBE, 0), self.publisher)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+def main():
+    """Print events from a running app: python gesture_stream.py [port]"""
+    import sys
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_EVENT_PORT
+    subscriber = GestureEventSubscriber(port)
+    try:
+        for event in subscriber.events():
+            if event['type'] == MSG_FRAME:
+                hands = ", ".join(f"{hand['handedness']} {hand['gesture']}" for hand in event['hands'])
+                print(f"#{event['seq']} {event['control_state']}: {hands or 'no hands'}")
+            elif event['type'] == MSG_STATE:
+                print(f"#{event['seq']} state {event['previous_state']} -> {event['control_state']}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        subscriber.close()
+
+
+if __name__ == "__main__":
+    main()
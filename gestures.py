@@ -0,0 +1,393 @@
+"""
+Rule-based hand gesture classification on MediaPipe hand landmarks.
+
+Shared by the app and the offline tools. Landmarks are the 21 normalized
+points of one hand (anything with .x/.y/.z).
+
+When a learned model has classified the current frame (see
+learned_classifier.py), learned_gestures maps id(landmarks) to its gesture
+name and the predicates answer from it instead of running the rules.
+
+While a hand holds still, feature_memos maps id(landmarks) to the memo of
+that hand's pose (see hand_tracker.py) and predicate results computed on an
+earlier frame of the same pose are reused.
+"""
+import functools
+import time
+
+import numpy as np
+
+
+def hand_side(handedness, landmarks):
+    """'Left' or 'Right' from a handedness category list, falling back to wrist position like the app"""
+    if handedness:
+        name = str(getattr(handedness[0], 'category_name', handedness[0])).lower()
+        if 'left' in name:
+            return 'Left'
+        if 'right' in name:
+            return 'Right'
+    return 'Left' if landmarks[0].x < 0.5 else 'Right'
+
+
+def learned_override(gesture):
+    """Answer a gesture predicate from learned_gestures when the hand was classified by the model"""
+    def decorate(predicate):
+        @functools.wraps(predicate)
+        def wrapper(self, landmarks):
+            if self.learned_gestures:
+                name = self.learned_gestures.get(id(landmarks))
+                if name is not None:
+                    return name == gesture
+            return predicate(self, landmarks)
+        return wrapper
+    return decorate
+
+
+def coherent_feature(predicate):
+    """Reuse a predicate result from feature_memos while the hand has not moved"""
+    name = predicate.__name__
+
+    @functools.wraps(predicate)
+    def wrapper(self, landmarks, *args, **kwargs):
+        memo = self.feature_memos.get(id(landmarks)) if self.feature_memos else None
+        if memo is None:
+            return predicate(self, landmarks, *args, **kwargs)
+        key = (name, args, tuple(kwargs.items())) if args or kwargs else name
+        entry = memo.get(key)
+        if entry is not None:
+            # (result, seconds it took to compute)
+            memo.stats.reused += 1
+            memo.stats.saved_seconds += entry[1]
+            return entry[0]
+        start = time.perf_counter()
+        result = predicate(self, landmarks, *args, **kwargs)
+        memo[key] = (result, time.perf_counter() - start)
+        memo.stats.computed += 1
+        return result
+    return wrapper
+
+
+class GestureClassifier:
+    """Gesture predicates over one hand's landmarks."""
+
+    # Thresholds (normalized image units unless noted). threshold_tuner.py fits them
+    # to a user's recordings; the app applies the saved profile over these defaults.
+    click_threshold = 0.03  # Distance threshold for pinch gesture (thumb to index finger)
+    fist_finger_distance = 0.09  # Finger tip-to-MCP distance that counts as curled (was 0.13)
+    fist_thumb_distance = 0.11  # Thumb tip-to-MCP distance that counts as tucked in (was 0.15)
+    thumb_length_threshold = 0.08  # Thumb tip-to-MCP length of an extended thumb
+    fist_thumb_out_ratio = 1.05  # Thumb tip this much farther from the palm than its IP joint: not a fist
+    thumb_out_ratio = 1.1  # Thumb tip at least this much farther from the palm than its IP joint: thumb out
+    both_fists_separation = 0.4  # Wrist distance (fraction of frame width) between the two unlock fists
+    learned_gestures = None  # id(landmarks) -> gesture name for the current frame
+    feature_memos = None  # id(landmarks) -> FeatureMemo of a hand holding still
+
+    def calculate_distance(self, point1, point2):
+        """Calculate 3D distance between two points"""
+        dx = point1.x - point2.x
+        dy = point1.y - point2.y
+        dz = point1.z - point2.z if hasattr(point1, 'z') and hasattr(point2, 'z') else 0
+        return np.sqrt(dx*dx + dy*dy + dz*dz)
+    
+    @learned_override("PINCH")
+    @coherent_feature
+    def is_pinch(self, landmarks):
+        """Check if thumb and index finger are pinched together"""
+        thumb_tip = landmarks[4]
+        index_tip = landmarks[8]
+        distance = self.calculate_distance(thumb_tip, index_tip)
+        return distance < self.click_threshold
+    
+    @learned_override("FIST")
+    @coherent_feature
+    def is_fist(self, landmarks):
+        """Check if all fingers are closed (fist gesture)
+        Uses two methods to handle different hand orientations:
+        1. Y-coordinate: tip at or below PIP (works for side view)
+        2. Distance: tip close to MCP (works for forward-facing fist)
+        """
+        # Check fingers (Index, Middle, Ring, Pinky)
+        finger_tips = [8, 12, 16, 20]
+        finger_pips = [6, 10, 14, 18]
+        finger_mcps = [5, 9, 13, 17]
+
+        for tip_idx, pip_idx, mcp_idx in zip(finger_tips, finger_pips, finger_mcps):
+            tip = landmarks[tip_idx]
+            pip = landmarks[pip_idx]
+            mcp = landmarks[mcp_idx]
+
+            # Method 1: Y-coordinate check (tip at or below PIP)
+            y_closed = tip.y >= pip.y
+
+            # Method 2: Distance check (tip close to MCP = curled finger)
+            # Use strict threshold to avoid detecting claw gesture as fist
+            dx = tip.x - mcp.x
+            dy = tip.y - mcp.y
+            dz = (tip.z - mcp.z) if hasattr(tip, 'z') else 0
+            distance = (dx*dx + dy*dy + dz*dz) ** 0.5
+            distance_closed = distance < self.fist_finger_distance
+
+            # Finger is closed if EITHER method indicates closed
+            if not (y_closed or distance_closed):
+                return False
+
+        # Check thumb separately
+        thumb_tip = landmarks[4]
+        thumb_ip = landmarks[3]
+        thumb_mcp = landmarks[2]
+        wrist = landmarks[0]
+        index_mcp = landmarks[5]
+
+        # First check: if thumb is clearly extended outward, this is NOT a fist
+        # Calculate thumb extension distance
+        dx = thumb_tip.x - thumb_mcp.x
+        dy = thumb_tip.y - thumb_mcp.y
+        dz = (thumb_tip.z - thumb_mcp.z) if hasattr(thumb_tip, 'z') else 0
+        thumb_distance = (dx*dx + dy*dy + dz*dz) ** 0.5
+
+        # Check if thumb tip is farther from palm center than thumb IP (extended outward)
+        palm_x = (wrist.x + index_mcp.x) / 2
+        palm_y = (wrist.y + index_mcp.y) / 2
+        thumb_tip_to_palm = ((thumb_tip.x - palm_x)**2 + (thumb_tip.y - palm_y)**2) ** 0.5
+        thumb_ip_to_palm = ((thumb_ip.x - palm_x)**2 + (thumb_ip.y - palm_y)**2) ** 0.5
+
+        # If thumb is extended (long and tip farther from palm), NOT a fist
+        if thumb_distance >= self.thumb_length_threshold and \
+                thumb_tip_to_palm > thumb_ip_to_palm * self.fist_thumb_out_ratio:
+            return False
+
+        # Method 1: Y-check for thumb
+        thumb_y_closed = thumb_tip.y >= thumb_ip.y
+
+        # Method 2: Distance check for thumb
+        # Use strict threshold to avoid detecting claw gesture as fist
+        thumb_distance_closed = thumb_distance < self.fist_thumb_distance
+
+        if not (thumb_y_closed or thumb_distance_closed):
+            return False
+
+        return True
+    
+    @learned_override("OPEN PALM")
+    @coherent_feature
+    def is_open_palm(self, landmarks):
+        """Check if all fingers are extended (open palm)"""
+        finger_tips = [8, 12, 16, 20]  # Index, Middle, Ring, Pinky
+        finger_pips = [6, 10, 14, 18]
+
+        for tip, pip in zip(finger_tips, finger_pips):
+            if landmarks[tip].y >= landmarks[pip].y:  # Finger not extended
+                return False
+
+        return True
+
+    @coherent_feature
+    def is_palm_facing_camera(self, landmarks, is_right_hand=True):
+        """Detect if palm is facing toward the camera (front) or away (back).
+
+        Uses the cross product of palm plane vectors to determine the normal direction.
+        For a right hand with palm facing camera, the normal points toward the camera (positive z).
+
+        Args:
+            landmarks: Hand landmarks from MediaPipe
+            is_right_hand: True if this is a right hand, False for left hand
+
+        Returns:
+            True if palm faces camera (front), False if back of hand faces camera (back)
+        """
+        wrist = landmarks[0]
+        index_mcp = landmarks[5]   # Base of index finger
+        pinky_mcp = landmarks[17]  # Base of pinky finger
+
+        # Calculate vectors from wrist to finger MCPs
+        # Vector A: wrist -> index MCP
+        ax = index_mcp.x - wrist.x
+        ay = index_mcp.y - wrist.y
+        az = index_mcp.z - wrist.z if hasattr(index_mcp, 'z') else 0
+
+        # Vector B: wrist -> pinky MCP
+        bx = pinky_mcp.x - wrist.x
+        by = pinky_mcp.y - wrist.y
+        bz = pinky_mcp.z - wrist.z if hasattr(pinky_mcp, 'z') else 0
+
+        # Cross product A × B gives palm normal
+        # We only need the z-component to determine facing direction
+        normal_z = ax * by - ay * bx
+
+        # For right hand: negative normal_z = palm facing camera
+        # For left hand: positive normal_z = palm facing camera
+        if is_right_hand:
+            return normal_z < 0
+        else:
+            return normal_z > 0
+
+    @coherent_feature
+    def _get_finger_curl(self, landmarks):
+        """Calculate how much the fingers are curled (0.0 = straight, 1.0 = fully bent).
+        Used for dynamic scroll speed - more curl = faster scroll."""
+        finger_tips = [8, 12, 16, 20]  # Index, Middle, Ring, Pinky
+        finger_pips = [6, 10, 14, 18]
+        finger_mcps = [5, 9, 13, 17]
+
+        total_curl = 0.0
+        for tip_idx, pip_idx, mcp_idx in zip(finger_tips, finger_pips, finger_mcps):
+            tip = landmarks[tip_idx]
+            pip = landmarks[pip_idx]
+            mcp = landmarks[mcp_idx]
+
+            # Measure how close tip is to MCP relative to fully extended
+            # When straight: tip is far from MCP (low curl)
+            # When bent: tip is close to MCP (high curl)
+            dx = tip.x - mcp.x
+            dy = tip.y - mcp.y
+            tip_to_mcp = (dx*dx + dy*dy) ** 0.5
+
+            # Normalize: ~0.2 is extended, ~0.08 is bent
+            # Map to 0-1 range (inverted: smaller distance = more curl)
+            curl = max(0.0, min(1.0, (0.18 - tip_to_mcp) / 0.10))
+            total_curl += curl
+
+        # Average curl across 4 fingers
+        return total_curl / 4.0
+
+    
+    @learned_override("VICTORY")
+    @coherent_feature
+    def is_victory(self, landmarks):
+        """Check if index and middle fingers are extended (victory/peace sign)"""
+        # Index and middle should be extended
+        if landmarks[8].y >= landmarks[6].y or landmarks[12].y >= landmarks[10].y:
+            return False
+        
+        # Ring and pinky should be closed
+        if landmarks[16].y < landmarks[14].y or landmarks[20].y < landmarks[18].y:
+            return False
+        
+        return True
+    
+    @learned_override("OK SIGN")
+    @coherent_feature
+    def is_ok_sign(self, landmarks):
+        """Check if thumb and index form a circle (OK sign)"""
+        thumb_tip = landmarks[4]
+        index_tip = landmarks[8]
+        thumb_ip = landmarks[3]
+        index_pip = landmarks[6]
+        
+        # Check if thumb and index are close together (forming circle)
+        distance = self.calculate_distance(thumb_tip, index_tip)
+        if distance > 0.04:  # Too far apart
+            return False
+        
+        # Other fingers should be extended
+        if landmarks[12].y >= landmarks[10].y or landmarks[16].y >= landmarks[14].y or landmarks[20].y >= landmarks[18].y:
+            return False
+        
+        return True
+    
+    @learned_override("ROCK")
+    @coherent_feature
+    def is_rock(self, landmarks):
+        """Check if index and pinky are extended (rock/devil horns gesture)"""
+        # Index and pinky should be extended
+        if landmarks[8].y >= landmarks[6].y or landmarks[20].y >= landmarks[18].y:
+            return False
+        
+        # Middle and ring should be closed
+        if landmarks[12].y < landmarks[10].y or landmarks[16].y < landmarks[14].y:
+            return False
+        
+        return True
+    
+    @coherent_feature
+    def get_gesture_name(self, landmarks):
+        """Get the name of the detected gesture"""
+        if self.learned_gestures:
+            name = self.learned_gestures.get(id(landmarks))
+            if name is not None:
+                return name
+        if self.is_thumb_up(landmarks):
+            return "THUMB OUT"
+        elif self.is_fist(landmarks):
+            return "FIST"
+        elif self.is_pointing(landmarks):
+            return "POINTING"
+        elif self.is_pinch(landmarks):
+            return "PINCH"
+        elif self.is_open_palm(landmarks):
+            return "OPEN PALM"
+        elif self.is_victory(landmarks):
+            return "VICTORY"
+        elif self.is_ok_sign(landmarks):
+            return "OK SIGN"
+        elif self.is_rock(landmarks):
+            return "ROCK"
+        else:
+            return "UNKNOWN"
+        
+    @learned_override("THUMB OUT")
+    @coherent_feature
+    def is_thumb_up(self, landmarks):
+        """Check if thumb is extended (any direction) while other fingers are closed"""
+        thumb_tip = landmarks[4]
+        thumb_ip = landmarks[3]
+        thumb_mcp = landmarks[2]
+        wrist = landmarks[0]
+        index_mcp = landmarks[5]  # Base of index finger
+
+        # Calculate thumb extension (distance from thumb tip to thumb MCP)
+        dx = thumb_tip.x - thumb_mcp.x
+        dy = thumb_tip.y - thumb_mcp.y
+        thumb_length = (dx*dx + dy*dy) ** 0.5
+
+        # Thumb must be extended (tip far from MCP)
+        if thumb_length < self.thumb_length_threshold:  # Thumb not extended enough
+            return False
+
+        # Calculate palm center (average of wrist and index MCP)
+        palm_x = (wrist.x + index_mcp.x) / 2
+        palm_y = (wrist.y + index_mcp.y) / 2
+
+        # Thumb tip should be farther from palm center than thumb IP
+        # (indicates thumb is extended outward)
+        thumb_tip_to_palm = ((thumb_tip.x - palm_x)**2 + (thumb_tip.y - palm_y)**2) ** 0.5
+        thumb_ip_to_palm = ((thumb_ip.x - palm_x)**2 + (thumb_ip.y - palm_y)**2) ** 0.5
+        if thumb_tip_to_palm < thumb_ip_to_palm * self.thumb_out_ratio:  # Thumb not extended outward
+            return False
+
+        # Index finger must be closed (not extended) for thumb out
+        # Otherwise pointing with thumb extended would be detected as thumb out
+        if landmarks[8].y < landmarks[6].y:  # Index tip above PIP = extended
+            return False
+
+        # Other fingers should be closed (at least 2 of 4)
+        finger_tips = [8, 12, 16, 20]  # Index, Middle, Ring, Pinky
+        finger_pips = [6, 10, 14, 18]
+        closed_count = 0
+        for tip, pip in zip(finger_tips, finger_pips):
+            if landmarks[tip].y >= landmarks[pip].y:  # Tip at or below PIP (closed)
+                closed_count += 1
+
+        if closed_count < 2:
+            return False
+
+        return True
+    
+    @learned_override("POINTING")
+    @coherent_feature
+    def is_pointing(self, landmarks):
+        """Check if only index finger is extended (pointing gesture)"""
+        # Index finger should be extended
+        if landmarks[8].y > landmarks[6].y:  # Index tip below PIP (closed)
+            return False
+        
+        # Other fingers should be closed
+        finger_tips = [12, 16, 20]  # Middle, Ring, Pinky
+        finger_pips = [10, 14, 18]
+        
+        for tip, pip in zip(finger_tips, finger_pips):
+            if landmarks[tip].y < landmarks[pip].y:  # Tip is above PIP (extended)
+                return False
+        
+        # Thumb can be in any position for pointing
+        return True
@@ -0,0 +1,228 @@
+"""
+Cross-frame hand tracking.
+
+MediaPipe reports hands in no particular order and its handedness can
+flicker for a frame or two. The tracker matches each detected hand to the
+track it most likely continues (nearest wrist and bounding-box centre,
+within a maximum jump), so a hand keeps its track ID - and everything the
+app accumulates for it - across order swaps and handedness flicker.
+
+Per-track state:
+- side: the handedness vote, only changed after several consistent frames
+- hold timers (fist / victory) and pointer smoothing, previously shared
+  between both hands on the app
+- the gesture classification of the current landmarks, so frames reusing
+  the previous detection are not classified again
+- a feature memo: while no landmark has moved more than `still_epsilon`
+  from the pose the memo was started on, predicate results (gesture cascade,
+  palm orientation, finger curl) are reused from it instead of recomputed
+  (see gestures.coherent_feature). Time-based logic - hold timers and
+  cooldowns - still runs every frame. Comparing against the pose the memo
+  started on, not the previous frame, keeps slow drift from accumulating.
+"""
+import time
+
+from gestures import hand_side
+
+DEFAULT_MAX_DISTANCE = 0.2  # Normalized frame units a hand may move between frames
+DEFAULT_MAX_MISSED = 5  # Frames a track survives without a matching hand
+DEFAULT_SIDE_FRAMES = 3  # Consistent frames needed to flip a track's handedness
+DEFAULT_STILL_EPSILON = 0.004  # Largest landmark movement (normalized x/y) that keeps the memo (0 = off)
+
+
+def _position(landmarks):
+    """(wrist x, wrist y, bbox centre x, bbox centre y)"""
+    xs = [lm.x for lm in landmarks]
+    ys = [lm.y for lm in landmarks]
+    return (landmarks[0].x, landmarks[0].y, (min(xs) + max(xs)) / 2, (min(ys) + max(ys)) / 2)
+
+
+def max_displacement(landmarks, reference):
+    """Largest x/y movement of any landmark between two poses"""
+    largest = 0.0
+    for a, b in zip(landmarks, reference):
+        largest = max(largest, abs(a.x - b.x), abs(a.y - b.y))
+    return largest
+
+
+class CoherenceStats:
+    """How much classification work the feature memos saved."""
+
+    def __init__(self):
+        self.hands_still = 0  # Hand-frames that kept their memo
+        self.hands_moved = 0  # Hand-frames that started a new memo
+        self.reused = 0  # Predicate results served from a memo
+        self.computed = 0  # Predicate results computed into a memo
+        self.saved_seconds = 0.0  # Compute time of the reused results
+        self.check_seconds = 0.0  # Time spent comparing poses
+
+    def hit_rate(self):
+        lookups = self.reused + self.computed
+        return self.reused / lookups if lookups else 0.0
+
+    def describe(self):
+        return (f"Still-hand memo: {self.hit_rate():.0%} of predicate results reused, "
+                f"{self.hands_still}/{self.hands_still + self.hands_moved} hand-frames still, "
+                f"saved {self.saved_seconds * 1000:.0f}ms for {self.check_seconds * 1000:.0f}ms of checks")
+
+
+class FeatureMemo(dict):
+    """Predicate results for one pose: key -> (result, seconds it took)"""
+
+    def __init__(self, stats):
+        super().__init__()
+        self.stats = stats
+
+
+class HandTrack:
+    """One physical hand followed across frames."""
+
+    def __init__(self, track_id, side, position):
+        self.track_id = track_id
+        self.side = side  # 'Left' or 'Right'
+        self.position = position
+        self.missed = 0  # Consecutive frames without a match
+        self.frames = 1  # Frames matched so far
+        self.side_streak = 0  # Consecutive frames disagreeing with self.side
+
+        # Hold timers (the app's frame_time when the gesture started, None when not held)
+        self.fist_hold_start_time = None
+        self.victory_hold_start_time = None
+
+        # Pointer movement
+        self.last_finger_x = None  # Previous finger position in normalized coordinates (0-1)
+        self.last_finger_y = None
+        self.smoothed_dx = 0.0  # Smoothed movement delta
+        self.smoothed_dy = 0.0
+        self.pointer_x = None  # Smoothed finger position (absolute pointer mode)
+        self.pointer_y = None
+        self.moved_x = None  # Smoothed position the cursor was last moved to
+        self.moved_y = None
+
+        # Classification cache
+        self.classified_landmarks = None
+        self.gesture_name = None
+
+        # Feature memo of the pose the hand is holding
+        self.memo = None
+        self.memo_landmarks = None  # The pose the memo was started on
+
+    @property
+    def is_right(self):
+        return self.side == 'Right'
+
+    def observe_side(self, side, side_frames):
+        """Vote with this frame's handedness - a flip needs side_frames consistent frames"""
+        if side == self.side:
+            self.side_streak = 0
+            return
+        self.side_streak += 1
+        if self.side_streak >= side_frames:
+            self.side = side
+            self.side_streak = 0
+            # The other hand's timers and pointer history don't carry over
+            self.reset_holds()
+            self.reset_pointer()
+
+    def reset_holds(self):
+        self.fist_hold_start_time = None
+        self.victory_hold_start_time = None
+
+    def reset_pointer(self):
+        self.last_finger_x = None
+        self.last_finger_y = None
+        self.smoothed_dx = 0.0
+        self.smoothed_dy = 0.0
+        self.pointer_x = None
+        self.pointer_y = None
+        self.moved_x = None
+        self.moved_y = None
+
+    def feature_memo(self, landmarks, epsilon, stats):
+        """The memo to classify landmarks with - kept while the hand is still, otherwise a fresh one"""
+        start = time.perf_counter()
+        still = self.memo is not None and (
+            landmarks is self.memo_landmarks or max_displacement(landmarks, self.memo_landmarks) <= epsilon)
+        if still:
+            stats.hands_still += 1
+        else:
+            self.memo = FeatureMemo(stats)
+            self.memo_landmarks = landmarks
+            stats.hands_moved += 1
+        stats.check_seconds += time.perf_counter() - start
+        return self.memo
+
+    def gesture(self, landmarks, classify):
+        """Gesture name of landmarks, classified only when they changed since the last call"""
+        if landmarks is not self.classified_landmarks:
+            self.gesture_name = classify(landmarks)
+            self.classified_landmarks = landmarks
+        return self.gesture_name
+
+
+class HandTracker:
+    """Assign detected hands to stable tracks, frame to frame."""
+
+    def __init__(self, max_distance=DEFAULT_MAX_DISTANCE, max_missed=DEFAULT_MAX_MISSED,
+                 side_frames=DEFAULT_SIDE_FRAMES, still_epsilon=DEFAULT_STILL_EPSILON):
+        self.max_distance = max_distance
+        self.max_missed = max_missed
+        self.side_frames = side_frames
+        self.still_epsilon = still_epsilon
+        self.tracks = []
+        self.next_id = 1
+        self.coherence = CoherenceStats()
+
+    def reset(self):
+        self.tracks = []
+
+    def update(self, hand_landmarks, handedness):
+        """Match this frame's hands to tracks. Returns the track of each hand, in detection order."""
+        positions = [_position(landmarks) for landmarks in hand_landmarks]
+
+        # Greedy matching on the closest pairs first (there are at most a few hands)
+        pairs = []
+        for hand, position in enumerate(positions):
+            for track in self.tracks:
+                distance = max(abs(position[0] - track.position[0]) + abs(position[1] - track.position[1]),
+                               abs(position[2] - track.position[2]) + abs(position[3] - track.position[3]))
+                if distance <= self.max_distance:
+                    pairs.append((distance, hand, track))
+        pairs.sort(key=lambda pair: pair[0])
+
+        assigned = [None] * len(positions)
+        matched = set()
+        for distance, hand, track in pairs:
+            if assigned[hand] is None and track.track_id not in matched:
+                assigned[hand] = track
+                matched.add(track.track_id)
+
+        for hand, landmarks in enumerate(hand_landmarks):
+            hand_handedness = handedness[hand] if handedness and hand < len(handedness) else []
+            side = hand_side(hand_handedness, landmarks)
+            track = assigned[hand]
+            if track is None:
+                track = HandTrack(self.next_id, side, positions[hand])
+                self.next_id += 1
+                self.tracks.append(track)
+                assigned[hand] = track
+                matched.add(track.track_id)
+            else:
+                track.position = positions[hand]
+                track.missed = 0
+                track.frames += 1
+                track.observe_side(side, self.side_frames)
+
+        # Unmatched tracks coast for a few frames (brief detection dropouts), then expire
+        for track in self.tracks:
+            if track.track_id not in matched:
+                track.missed += 1
+        self.tracks = [track for track in self.tracks if track.missed <= self.max_missed]
+        return assigned
+
+    def feature_memos(self, hand_landmarks, tracks):
+        """id(landmarks) -> FeatureMemo for this frame's hands (None when the memo is off)"""
+        if self.still_epsilon <= 0:
+            return None
+        return {id(landmarks): track.feature_memo(landmarks, self.still_epsilon, self.coherence)
+                for landmarks, track in zip(hand_landmarks, tracks)}
@@ -0,0 +1,432 @@
+"""
+Networked hand landmark inference for thin clients.
+
+Low-end terminals only capture frames, JPEG-compress them and send them to a
+central server. The server runs a pool of HandLandmarker workers, batches and
+schedules requests from many clients, and returns landmark arrays. On the
+client, RemoteHandLandmarker.detect() returns a result with the same
+hand_landmarks / handedness shape as HandLandmarker.detect(), so the gesture
+and state logic runs unchanged.
+
+Usage:
+    python inference_server.py serve --port 47900 --workers 4
+    python main.py --inference-server 127.0.0.1:47900
+    python inference_server.py bench --clients 1 10 50      (server + clients on localhost)
+
+Wire protocol (TCP, little endian, requests answered in order per connection):
+    request   '<II' request id, JPEG length (at most MAX_JPEG_BYTES), then the JPEG bytes
+    response  '<IB' request id, hand count, then per hand:
+              '<Bf'  handedness (0 left, 1 right), handedness score
+              63 x float32  landmarks x, y, z for the 21 points
+
+There is no authentication. The server listens on localhost unless --host
+says otherwise; only expose it on a network you trust.
+
+The client JPEG-encodes the RGB frame as if it were BGR and the server decodes
+it the same way. The channel order survives the round trip without any color
+conversion on either side.
+"""
+import argparse
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+from collections import deque, namedtuple
+
+import cv2
+import numpy as np
+import mediapipe as mp
+from mediapipe.tasks.python import vision
+
+import model_assets
+import model_registry
+
+DEFAULT_SERVER_PORT = 47900
+DEFAULT_JPEG_QUALITY = 80
+MAX_JPEG_BYTES = 4 * 1024 * 1024  # Larger requests close the connection (a 1080p frame at q80 is ~300 KB)
+MAX_PENDING_PER_CONNECTION = 2  # Queued requests per client before the server stops reading from it
+
+REQUEST = struct.Struct('<II')
+RESPONSE = struct.Struct('<IB')
+HAND = struct.Struct('<Bf')
+NUM_LANDMARKS = 21
+LANDMARK_BYTES = NUM_LANDMARKS * 3 * 4
+
+# Same attribute names as the MediaPipe result objects the gesture code reads
+RemoteLandmark = namedtuple('RemoteLandmark', 'x y z')
+RemoteCategory = namedtuple('RemoteCategory', 'category_name score')
+RemoteDetectionResult = namedtuple('RemoteDetectionResult', 'hand_landmarks handedness')
+
+
+def _recv_exact(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            raise ConnectionError("connection closed")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def encode_result(request_id, detection_result):
+    hands = detection_result.hand_landmarks or []
+    parts = [RESPONSE.pack(request_id, len(hands))]
+    for idx, hand_landmarks in enumerate(hands):
+        is_right, score = 0, 0.0
+        if detection_result.handedness and idx < len(detection_result.handedness):
+            category = detection_result.handedness[idx][0]
+            is_right = int(category.category_name == 'Right')
+            score = category.score
+        parts.append(HAND.pack(is_right, score))
+        parts.append(np.array([(lm.x, lm.y, lm.z) for lm in hand_landmarks], dtype='<f4').tobytes())
+    return b''.join(parts)
+
+
+def decode_result(data):
+    """Decode a response body (after the RESPONSE header) into a RemoteDetectionResult"""
+    hand_landmarks = []
+    handedness = []
+    offset = 0
+    while offset < len(data):
+        is_right, score = HAND.unpack_from(data, offset)
+        offset += HAND.size
+        points = np.frombuffer(data, dtype='<f4', count=NUM_LANDMARKS * 3, offset=offset).reshape(NUM_LANDMARKS, 3)
+        offset += LANDMARK_BYTES
+        hand_landmarks.append([RemoteLandmark(float(x), float(y), float(z)) for x, y, z in points])
+        handedness.append([RemoteCategory('Right' if is_right else 'Left', score)])
+    return RemoteDetectionResult(hand_landmarks, handedness)
+
+
+class InferenceServer:
+    """Accept thin clients and run their frames through a pool of landmarkers.
+
+    Every connection has its own queue of at most max_pending requests; a
+    client that sends more is not read from until its queue has room (TCP
+    pushes back on it). Connections with queued requests take turns: each
+    worker takes up to max_batch requests, one per connection, and a
+    connection only gets its next turn once its request has been answered.
+    So a pipelining client gets one slot per round like everyone else, and
+    its responses go out in order. A batch is decoded and run back to back
+    on that worker's landmarker. MediaPipe has no batched detect() for this
+    task, so batching amortizes the wake-ups and keeps each landmarker busy.
+    """
+
+    def __init__(self, model_path, host='127.0.0.1', port=DEFAULT_SERVER_PORT, workers=2, max_batch=8,
+                 batch_window_ms=2.0, num_hands=2, max_pending=MAX_PENDING_PER_CONNECTION):
+        self.model_path = model_path
+        self.host = host
+        self.port = port
+        self.num_workers = workers
+        self.max_batch = max_batch
+        self.batch_window = batch_window_ms / 1000.0
+        self.num_hands = num_hands
+        self.max_pending = max_pending
+
+        # All guarded by pending_cond
+        self.queues = {}  # connection -> deque of (request_id, jpeg bytes, received_at)
+        self.turns = deque()  # Connections with queued requests and none being processed, in serving order
+        self.in_flight = set()  # Connections with a request in a worker's batch
+        self.pending_cond = threading.Condition()
+        self.running = False
+        self.listener = None
+        self.threads = []
+
+        # Statistics
+        self.stats_lock = threading.Lock()
+        self.processed = 0
+        self.batches = 0
+
+    def _create_landmarker(self):
+        options = vision.HandLandmarkerOptions(
+            base_options=model_assets.base_options(self.model_path, keep=True),  # One read for all workers
+            num_hands=self.num_hands,
+            min_hand_detection_confidence=0.7,
+            min_hand_presence_confidence=0.5,
+            min_tracking_confidence=0.5
+        )
+        return vision.HandLandmarker.create_from_options(options)
+
+    def start(self):
+        self.running = True
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind((self.host, self.port))
+        self.port = self.listener.getsockname()[1]  # Resolves port 0
+        self.listener.listen(128)
+
+        # Create the landmarkers up front so the first requests don't pay for it
+        landmarkers = [self._create_landmarker() for _ in range(self.num_workers)]
+        model_assets.forget(self.model_path)
+        for idx, landmarker in enumerate(landmarkers):
+            thread = threading.Thread(target=self._worker_loop, args=(landmarker,),
+                                      name=f"InferenceWorker-{idx}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+        thread = threading.Thread(target=self._accept_loop, name="InferenceAccept", daemon=True)
+        thread.start()
+        self.threads.append(thread)
+        print(f"Inference server on tcp://{self.host}:{self.port} with {self.num_workers} workers")
+
+    def stop(self):
+        self.running = False
+        with self.pending_cond:
+            self.pending_cond.notify_all()
+        if self.listener:
+            self.listener.close()
+            self.listener = None
+
+    def _accept_loop(self):
+        while self.running:
+            try:
+                conn, _address = self.listener.accept()
+            except OSError:
+                break
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=self._client_loop, args=(conn,), daemon=True).start()
+
+    def _client_loop(self, conn):
+        """Read requests from one client and queue them for the workers"""
+        queue = deque()
+        with self.pending_cond:
+            self.queues[conn] = queue
+        try:
+            while self.running:
+                with self.pending_cond:
+                    # Stop reading while the queue is full - the client blocks on its send buffer
+                    while self.running and len(queue) >= self.max_pending:
+                        self.pending_cond.wait()
+                    if not self.running:
+                        break
+                request_id, jpeg_len = REQUEST.unpack(_recv_exact(conn, REQUEST.size))
+                if jpeg_len > MAX_JPEG_BYTES:
+                    # Not a frame from our client - don't allocate for it, and the stream can't be resynced
+                    print(f"Closing connection: request of {jpeg_len} bytes exceeds {MAX_JPEG_BYTES}")
+                    break
+                jpeg = _recv_exact(conn, jpeg_len)
+                with self.pending_cond:
+                    queue.append((request_id, jpeg, time.perf_counter()))
+                    if conn not in self.in_flight and conn not in self.turns:
+                        self.turns.append(conn)
+                    self.pending_cond.notify_all()
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            with self.pending_cond:
+                del self.queues[conn]
+                if conn in self.turns:
+                    self.turns.remove(conn)
+            conn.close()
+
+    def _take_batch(self):
+        with self.pending_cond:
+            while self.running and not self.turns:
+                self.pending_cond.wait()
+            if not self.running:
+                return []
+            # Give other clients' requests a moment to arrive so they share this wake-up
+            if len(self.turns) < self.max_batch and self.batch_window > 0:
+                self.pending_cond.wait(self.batch_window)
+            batch = []
+            while self.turns and len(batch) < self.max_batch:
+                conn = self.turns.popleft()
+                request_id, jpeg, received_at = self.queues[conn].popleft()
+                self.in_flight.add(conn)
+                batch.append((conn, request_id, jpeg, received_at))
+            self.pending_cond.notify_all()  # Readers waiting for room in their queue
+            return batch
+
+    def _finish_request(self, conn):
+        """The connection's request was answered - queue its next one for a turn"""
+        with self.pending_cond:
+            self.in_flight.discard(conn)
+            if self.queues.get(conn):
+                self.turns.append(conn)
+                self.pending_cond.notify_all()
+
+    def _worker_loop(self, landmarker):
+        while self.running:
+            batch = self._take_batch()
+            if not batch:
+                continue
+            for conn, request_id, jpeg, _received_at in batch:
+                frame = cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), cv2.IMREAD_COLOR)
+                if frame is None:
+                    response = RESPONSE.pack(request_id, 0)
+                else:
+                    mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=frame)
+                    response = encode_result(request_id, landmarker.detect(mp_image))
+                try:
+                    conn.sendall(response)
+                except OSError:
+                    pass  # Client went away - its reader thread cleans up
+                self._finish_request(conn)
+            with self.stats_lock:
+                self.processed += len(batch)
+                self.batches += 1
+
+
+class RemoteHandLandmarker:
+    """Drop-in replacement for HandLandmarker.detect() backed by an InferenceServer."""
+
+    def __init__(self, host, port=DEFAULT_SERVER_PORT, jpeg_quality=DEFAULT_JPEG_QUALITY, timeout=5.0):
+        self.address = (host, port)
+        self.jpeg_params = [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality]
+        self.timeout = timeout
+        self.sock = None
+        self.request_id = 0
+
+    def connect(self):
+        sock = socket.create_connection(self.address, timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock = sock  # Only published once usable (RemoteDetector connects from another thread)
+
+    def detect_jpeg(self, jpeg):
+        """Send an already encoded frame and wait for its landmarks"""
+        if self.sock is None:
+            self.connect()
+        self.request_id = (self.request_id + 1) & 0xFFFFFFFF
+        try:
+            self.sock.sendall(REQUEST.pack(self.request_id, len(jpeg)) + jpeg)
+            request_id, hand_count = RESPONSE.unpack(_recv_exact(self.sock, RESPONSE.size))
+            body = _recv_exact(self.sock, hand_count * (HAND.size + LANDMARK_BYTES))
+        except (OSError, ConnectionError):
+            # Reconnect on the next frame
+            self.close()
+            raise
+        return decode_result(body)
+
+    def detect(self, mp_image):
+        return self.detect_array(mp_image.numpy_view())
+
+    def detect_array(self, frame_rgb):
+        # RGB data is encoded as-is (see module docstring)
+        ok, jpeg = cv2.imencode('.jpg', frame_rgb, self.jpeg_params)
+        if not ok:
+            raise RuntimeError("JPEG encoding failed")
+        return self.detect_jpeg(jpeg.tobytes())
+
+    def close(self):
+        if self.sock:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+            self.sock = None
+
+
+def parse_address(address):
+    """'host:port' or 'host' -> (host, port)"""
+    host, _, port = address.rpartition(':')
+    if not host:
+        return address, DEFAULT_SERVER_PORT
+    return host, int(port)
+
+
+def default_model_path():
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(script_dir, "models", model_registry.MODEL_VARIANTS[model_registry.DEFAULT_VARIANT]['filename'])
+
+
+def run_benchmark(server_address, client_counts, duration, clip_path=None, jpeg_quality=DEFAULT_JPEG_QUALITY):
+    """Simulate thin clients sending frames as fast as responses come back"""
+    frames = model_registry.load_benchmark_frames(clip_path)
+    params = [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality]
+    # Clients only send - encode once so the numbers measure the server
+    jpegs = [cv2.imencode('.jpg', frame, params)[1].tobytes() for frame in frames]
+
+    print(f"{'clients':>8} {'total fps':>10} {'fps/client':>11} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}")
+    for count in client_counts:
+        latencies = [[] for _ in range(count)]
+        errors = [0] * count
+        stop_at = time.perf_counter() + duration
+
+        def client(idx):
+            landmarker = RemoteHandLandmarker(*server_address, jpeg_quality=jpeg_quality, timeout=30.0)
+            i = idx  # Stagger the clips between clients
+            while time.perf_counter() < stop_at:
+                start = time.perf_counter()
+                try:
+                    landmarker.detect_jpeg(jpegs[i % len(jpegs)])
+                    latencies[idx].append(time.perf_counter() - start)
+                except (OSError, ConnectionError):
+                    errors[idx] += 1
+                    time.sleep(0.1)
+                i += 1
+            landmarker.close()
+
+        threads = [threading.Thread(target=client, args=(idx,), daemon=True) for idx in range(count)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        all_latencies = np.array([value for values in latencies for value in values]) * 1000.0
+        total_fps = len(all_latencies) / elapsed
+        p50 = np.percentile(all_latencies, 50) if len(all_latencies) else 0.0
+        p95 = np.percentile(all_latencies, 95) if len(all_latencies) else 0.0
+        print(f"{count:>8} {total_fps:>10.1f} {total_fps / count:>11.1f} {p50:>8.1f} {p95:>8.1f} {sum(errors):>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hand landmark inference server for thin clients")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    serve = subparsers.add_parser('serve', help="Run the inference server")
+    serve.add_argument('--host', default='127.0.0.1',
+                       help="Address to listen on (0.0.0.0 for all interfaces - there is no authentication)")
+    serve.add_argument('--port', type=int, default=DEFAULT_SERVER_PORT)
+    serve.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    serve.add_argument('--max-batch', type=int, default=8)
+    serve.add_argument('--batch-window-ms', type=float, default=2.0)
+    serve.add_argument('--max-pending', type=int, default=MAX_PENDING_PER_CONNECTION,
+                       help="Requests queued per client before the server stops reading from it")
+    serve.add_argument('--model', default=default_model_path())
+
+    bench = subparsers.add_parser('bench', help="Measure throughput with simulated clients")
+    bench.add_argument('--server', default=None,
+                       help="host:port of a running server (default: start one on localhost)")
+    bench.add_argument('--clients', type=int, nargs='+', default=[1, 10, 50])
+    bench.add_argument('--duration', type=float, default=10.0, help="Seconds per client count")
+    bench.add_argument('--clip', default=None, help="Video file to send (random frames otherwise)")
+    bench.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    bench.add_argument('--model', default=default_model_path())
+
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        server = InferenceServer(args.model, host=args.host, port=args.port, workers=args.workers,
+                                 max_batch=args.max_batch, batch_window_ms=args.batch_window_ms,
+                                 max_pending=args.max_pending)
+        server.start()
+        try:
+            while True:
+                time.sleep(10)
+                print(f"processed {server.processed} frames in {server.batches} batches")
+        except KeyboardInterrupt:
+            server.stop()
+        return
+
+    server = None
+    if args.server:
+        server_address = parse_address(args.server)
+    else:
+        server = InferenceServer(args.model, port=0, workers=args.workers)
+        server.start()
+        server_address = ('127.0.0.1', server.port)
+    try:
+        run_benchmark(server_address, args.clients, args.duration, args.clip)
+    finally:
+        if server:
+            if server.batches:
+                print(f"average batch size {server.processed / server.batches:.1f}")
+            server.stop()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+"""
+Keyframe inference: carry hand landmarks between detections with optical flow.
+
+Full hand detection runs only on keyframes. On the frames in between, the 21
+landmarks of every hand are moved with sparse pyramidal Lucas-Kanade flow
+(cv2.calcOpticalFlowPyrLK) on a downscaled grayscale frame, which costs a
+fraction of a millisecond instead of a model inference. Depth (z),
+handedness and backend gestures are carried over from the keyframe.
+
+Propagation gives up - and the caller runs detection instead - when fewer
+than `min_tracked` of a hand's points were found again. Points that were
+lost while the rest of the hand tracked are moved by the hand's median
+displacement.
+
+Measure the trade-off (inference calls saved vs. landmark error against
+running detection on every frame) on recorded clips:
+    python landmark_flow.py eval clip.mp4 --intervals 2 3 4 6
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from detectors import HandDetection, Landmark, compare, create_detector
+from gestures import GestureClassifier
+
+DEFAULT_KEYFRAME_INTERVAL = 3  # Detect on every 3rd frame
+DEFAULT_FLOW_SCALE = 0.5  # Flow runs on a half-size grayscale frame
+DEFAULT_MIN_TRACKED = 0.7  # Fraction of a hand's points that must track
+
+
+class LandmarkFlow:
+    """Propagate the last keyframe's landmarks to new frames."""
+
+    def __init__(self, scale=DEFAULT_FLOW_SCALE, min_tracked=DEFAULT_MIN_TRACKED, win_size=15, max_level=2,
+                 max_error=40.0, color=cv2.COLOR_BGR2GRAY):
+        self.scale = scale
+        self.min_tracked = min_tracked
+        self.win_size = (win_size, win_size)
+        self.max_level = max_level
+        self.max_error = max_error  # Largest accepted LK matching error per point
+        self.color = color
+        self.prev_gray = None
+        self.detection = None
+        self.points = None  # (hands * 21, 1, 2) float32 pixel positions in prev_gray
+
+        # Statistics
+        self.keyframes = 0
+        self.propagated = 0
+        self.lost = 0  # Propagations abandoned for low tracking quality
+
+    def reset(self):
+        self.prev_gray = None
+        self.detection = None
+        self.points = None
+
+    def _gray(self, frame):
+        if self.scale != 1.0:
+            # Resize first - converting the smaller image is cheaper
+            frame = cv2.resize(frame, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(frame, self.color)
+
+    def keyframe(self, frame, detection):
+        """Start propagating from a fresh detection on frame"""
+        gray = self._gray(frame)
+        height, width = gray.shape
+        self.prev_gray = gray
+        self.detection = detection
+        self.points = np.array([(lm.x * width, lm.y * height) for landmarks in detection.hand_landmarks
+                                for lm in landmarks], dtype=np.float32).reshape(-1, 1, 2)
+        self.keyframes += 1
+
+    def propagate(self, frame):
+        """The keyframe's hands moved to frame, or None when detection has to run instead"""
+        if self.detection is None:
+            return None
+        if not self.detection.hand_landmarks:
+            # Nothing to track - new hands show up on the next keyframe
+            self.propagated += 1
+            return self.detection
+
+        gray = self._gray(frame)
+        height, width = gray.shape
+        points, status, error = cv2.calcOpticalFlowPyrLK(
+            self.prev_gray, gray, self.points, None, winSize=self.win_size, maxLevel=self.max_level)
+        tracked = (status.ravel() == 1) & (error.ravel() < self.max_error)
+
+        points = points.reshape(-1, 21, 2)
+        previous = self.points.reshape(-1, 21, 2)
+        tracked = tracked.reshape(-1, 21)
+        hands = []
+        for hand, landmarks in enumerate(self.detection.hand_landmarks):
+            if tracked[hand].mean() < self.min_tracked:
+                self.lost += 1
+                self.reset()
+                return None
+            # Lost points follow the rest of the hand
+            lost = ~tracked[hand]
+            if lost.any():
+                shift = np.median(points[hand][tracked[hand]] - previous[hand][tracked[hand]], axis=0)
+                points[hand][lost] = previous[hand][lost] + shift
+            hands.append([Landmark(float(x) / width, float(y) / height, lm.z)
+                          for (x, y), lm in zip(points[hand], landmarks)])
+
+        self.prev_gray = gray
+        self.points = points.reshape(-1, 1, 2)
+        self.detection = HandDetection(hands, self.detection.handedness, self.detection.gestures)
+        self.propagated += 1
+        return self.detection
+
+    def describe(self):
+        total = self.keyframes + self.propagated
+        if not total:
+            return "Keyframes: -"
+        return (f"Keyframes: {self.keyframes / total:.0%} of frames detected, "
+                f"{self.propagated} propagated, {self.lost} tracking losses")
+
+
+def evaluate(reference, frames, interval, use_flow=True, classifier=None):
+    """Replay keyframe inference against per-frame detections of the same frames.
+
+    reference holds the detection of every frame; a keyframe simply takes the
+    reference result, so only the propagation is replayed. With use_flow off,
+    the keyframe's landmarks are reused unchanged (the quality controller's
+    detect_every behaviour) as the baseline.
+    """
+    classifier = classifier or GestureClassifier()
+    flow = LandmarkFlow(color=cv2.COLOR_RGB2GRAY)
+    calls, distances, gestures_matched, hands_matched, flow_seconds = 0, [], 0, 0, 0.0
+    last = None
+    for index, (frame, expected) in enumerate(zip(frames, reference)):
+        detection = None
+        if index % interval != 0:
+            if use_flow:
+                start = time.perf_counter()
+                detection = flow.propagate(frame)
+                flow_seconds += time.perf_counter() - start
+            else:
+                detection = last
+        if detection is None:
+            detection = expected
+            calls += 1
+            if use_flow:
+                start = time.perf_counter()
+                flow.keyframe(frame, detection)
+                flow_seconds += time.perf_counter() - start
+        last = detection
+        _, frame_distances, frame_gestures_matched, frame_hands = compare(expected, detection, classifier)
+        distances.extend(frame_distances)
+        gestures_matched += frame_gestures_matched
+        hands_matched += frame_hands
+    return {
+        'calls': calls,
+        'mean_error': float(np.mean(distances)) if distances else 0.0,
+        'p95_error': float(np.percentile(distances, 95)) if distances else 0.0,
+        'gesture_agreement': gestures_matched / hands_matched if hands_matched else 0.0,
+        'flow_ms_per_frame': flow_seconds / max(len(frames), 1) * 1000.0,
+        'tracking_losses': flow.lost,
+    }
+
+
+def load_clip(path, max_frames):
+    """Consecutive RGB frames of a clip"""
+    frames = []
+    cap = cv2.VideoCapture(path)
+    while len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    cap.release()
+    return frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keyframe inference with optical-flow landmark propagation")
+    sub = parser.add_subparsers(dest='command', required=True)
+    eval_parser = sub.add_parser('eval', help="Inference calls saved vs. landmark error on recorded clips")
+    eval_parser.add_argument('clips', nargs='+')
+    eval_parser.add_argument('--intervals', type=int, nargs='+', default=[2, 3, 4, 6])
+    eval_parser.add_argument('--frames', type=int, default=900, help="Frames per clip")
+    eval_parser.add_argument('--model', default=None, help="Default: the bundled hand landmarker")
+    args = parser.parse_args()
+
+    from inference_server import default_model_path
+    detector = create_detector('landmarker', args.model or default_model_path())
+    classifier = GestureClassifier()
+    print(f"{'clip':<24} {'interval':>8} {'mode':<6} {'calls':>6} {'saved':>6} {'mean err':>9} {'p95 err':>8} "
+          f"{'gestures':>9} {'flow ms':>8} {'losses':>7}")
+    try:
+        for clip in args.clips:
+            frames = load_clip(clip, args.frames)
+            if not frames:
+                print(f"Could not read frames from {clip}")
+                continue
+            start = time.perf_counter()
+            reference = [detector.detect(frame) for frame in frames]
+            detect_ms = (time.perf_counter() - start) / len(frames) * 1000.0
+            name = os.path.basename(clip)[:24]
+            print(f"{name:<24} {1:>8} {'detect':<6} {len(frames):>6} {'0%':>6} {0.0:>9.4f} {0.0:>8.4f} "
+                  f"{'100.0%':>9} {'-':>8} {'-':>7}   (detection {detect_ms:.2f} ms/frame)")
+            for interval in args.intervals:
+                for use_flow in (True, False):
+                    result = evaluate(reference, frames, interval, use_flow, classifier)
+                    saved = 1.0 - result['calls'] / len(frames)
+                    flow_ms = f"{result['flow_ms_per_frame']:.2f}" if use_flow else "-"
+                    losses = result['tracking_losses'] if use_flow else "-"
+                    print(f"{name:<24} {interval:>8} {'flow' if use_flow else 'reuse':<6} {result['calls']:>6} "
+                          f"{saved:>6.0%} {result['mean_error']:>9.4f} {result['p95_error']:>8.4f} "
+                          f"{result['gesture_agreement']:>9.1%} {flow_ms:>8} {losses:>7}")
+    finally:
+        detector.close()
+    print("\nErrors are mean landmark distances to per-frame detection, in normalized image units. "
+          "'reuse' repeats the keyframe's landmarks unchanged.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,280 @@
+"""
+Learned gesture classifier.
+
+A softmax (multinomial logistic regression) model over normalized landmark
+features. At runtime all hands of a frame are classified together. Feature
+standardization is folded into the weights when the model is trained, and
+the wrist-relative transform is folded into them when it is loaded, so a
+frame costs one (hands x 63) @ (63 x classes+18) matrix multiply plus the
+normalization by hand size and an argmax.
+
+Features per hand (hand-size and position invariant):
+- the 21 landmarks relative to the wrist, divided by the wrist -> middle
+  finger MCP length, with x mirrored for left hands (63 values)
+- thumb-index tip distance and tip-to-MCP distance of each finger, in the
+  same units (5 values)
+
+Training data is the <video>.landmarks.npz output of offline_eval.py.
+
+Usage:
+    python learned_classifier.py train eval_output/*.landmarks.npz
+    python learned_classifier.py bench eval_output/*.landmarks.npz
+"""
+import argparse
+import os
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from gestures import GestureClassifier, hand_side
+
+MODEL_FILENAME = "gesture_classifier.npz"
+FEATURE_VERSION = 1
+
+# (a, b) landmark pairs whose distance is added as a feature
+DISTANCE_PAIRS = ((4, 8), (8, 5), (12, 9), (16, 13), (20, 17))
+SCALE_PAIR = (9, 0)  # Wrist -> middle finger MCP, the hand size unit
+
+Point = namedtuple('Point', 'x y z')
+
+
+def _difference_matrix(pairs):
+    """(63, 3 * len(pairs)) matrix mapping flattened landmarks to points[a] - points[b] per pair"""
+    matrix = np.zeros((63, 3 * len(pairs)), dtype=np.float32)
+    for k, (a, b) in enumerate(pairs):
+        for c in range(3):
+            matrix[3 * a + c, 3 * k + c] += 1.0
+            matrix[3 * b + c, 3 * k + c] -= 1.0
+    return matrix
+
+
+# Landmarks relative to the wrist, and the difference vectors whose lengths are features
+RELATIVE = _difference_matrix([(i, 0) for i in range(21)])
+DIFFERENCES = _difference_matrix((SCALE_PAIR,) + DISTANCE_PAIRS)
+
+# Row 0 mirrors x (left hands), row 1 leaves right hands unchanged - indexed by is_right
+MIRROR = np.ones((2, 21, 3), dtype=np.float32)
+MIRROR[0, :, 0] = -1.0
+MIRROR = MIRROR.reshape(2, 63)
+
+
+def _flatten(points, is_right):
+    points = np.asarray(points, dtype=np.float32).reshape(-1, 63)
+    return points * MIRROR[np.asarray(is_right, dtype=np.intp)]
+
+
+def _lengths(flat):
+    """Hand size (H,) and pair distances (H, 5) in landmark units"""
+    diffs = (flat @ DIFFERENCES).reshape(len(flat), -1, 3)
+    lengths = np.sqrt((diffs * diffs).sum(axis=2))
+    return np.maximum(lengths[:, 0], 1e-6), lengths[:, 1:]
+
+
+def default_model_path():
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(script_dir, "models", MODEL_FILENAME)
+
+
+def extract_features(points, is_right):
+    """Feature matrix for a batch of hands.
+
+    Args:
+        points: (H, 21, 3) landmark array
+        is_right: (H,) bool array
+    Returns:
+        (H, 69) float32 features including a trailing bias column of ones
+    """
+    # Mirror left hands so both hands share one model
+    flat = _flatten(points, is_right)
+    scale, distances = _lengths(flat)
+    relative = flat @ RELATIVE
+    bias = np.ones((len(flat), 1), dtype=np.float32)
+    return np.concatenate([relative / scale[:, None], distances / scale[:, None], bias], axis=1)
+
+
+class GestureModel:
+    """Trained weights plus the class names they score."""
+
+    def __init__(self, weights, classes):
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.classes = [str(name) for name in classes]
+        # Runtime form: relative-coordinate weights and the length differences share one matmul.
+        # Dividing by hand size commutes with the matmul, so it is applied to the logits instead.
+        relative_weights = self.weights[:63]
+        self.distance_weights = self.weights[63:-1]
+        self.bias = self.weights[-1]
+        self.fused = np.concatenate([RELATIVE @ relative_weights, DIFFERENCES], axis=1)
+
+    @classmethod
+    def load(cls, path=None):
+        data = np.load(path or default_model_path())
+        if int(data['feature_version']) != FEATURE_VERSION:
+            raise ValueError(f"Gesture model {path} uses feature version {int(data['feature_version'])}, "
+                             f"expected {FEATURE_VERSION} - retrain it")
+        return cls(data['weights'], data['classes'])
+
+    def save(self, path):
+        np.savez(path, weights=self.weights, classes=np.array(self.classes), feature_version=FEATURE_VERSION)
+
+    def predict(self, points, is_right):
+        """Gesture names for a batch of hands (same result as extract_features(...) @ weights)"""
+        flat = _flatten(points, is_right)
+        count = len(self.classes)
+        out = flat @ self.fused
+        diffs = out[:, count:].reshape(len(flat), -1, 3)
+        lengths = np.sqrt((diffs * diffs).sum(axis=2))
+        scale = np.maximum(lengths[:, 0], 1e-6)
+        logits = (out[:, :count] + lengths[:, 1:] @ self.distance_weights) / scale[:, None] + self.bias
+        return [self.classes[i] for i in logits.argmax(axis=1)]
+
+    def classify_result(self, detection_result):
+        """Classify every hand of a HandLandmarker result at once. Returns {id(landmarks): gesture name}."""
+        hands = detection_result.hand_landmarks
+        points = np.fromiter((v for landmarks in hands for lm in landmarks for v in (lm.x, lm.y, lm.z)),
+                             dtype=np.float32, count=len(hands) * 63)
+        is_right = []
+        for idx, landmarks in enumerate(hands):
+            handedness = []
+            if detection_result.handedness and idx < len(detection_result.handedness):
+                handedness = detection_result.handedness[idx]
+            is_right.append(hand_side(handedness, landmarks) == 'Right')
+        names = self.predict(points, np.array(is_right))
+        return {id(landmarks): name for landmarks, name in zip(hands, names)}
+
+
+def train(features, labels, l2=1e-3, iterations=500, learning_rate=0.5):
+    """Fit softmax regression with full-batch gradient descent. Returns a GestureModel."""
+    classes = sorted(set(labels))
+    class_index = {name: i for i, name in enumerate(classes)}
+    targets = np.zeros((len(labels), len(classes)), dtype=np.float32)
+    targets[np.arange(len(labels)), [class_index[name] for name in labels]] = 1.0
+
+    # Standardize the non-bias columns for stable steps
+    x = features[:, :-1]
+    mean = x.mean(axis=0)
+    std = x.std(axis=0) + 1e-6
+    x = np.concatenate([(x - mean) / std, features[:, -1:]], axis=1)
+
+    weights = np.zeros((x.shape[1], len(classes)), dtype=np.float32)
+    for _ in range(iterations):
+        logits = x @ weights
+        logits -= logits.max(axis=1, keepdims=True)
+        probs = np.exp(logits)
+        probs /= probs.sum(axis=1, keepdims=True)
+        gradient = x.T @ (probs - targets) / len(x)
+        gradient[:-1] += l2 * weights[:-1]
+        weights -= learning_rate * gradient
+
+    # Fold the standardization into the weights: one matmul on raw features at runtime
+    folded = np.empty_like(weights)
+    folded[:-1] = weights[:-1] / std[:, None]
+    folded[-1] = weights[-1] - (mean / std) @ weights[:-1]
+    return GestureModel(folded, classes)
+
+
+def load_recordings(paths, target='label'):
+    """Stack offline_eval landmark archives. Returns (points, is_right, labels) of hands with a target."""
+    points, is_right, labels = [], [], []
+    for path in paths:
+        data = np.load(path)
+        names = data[target]
+        keep = names != ''
+        points.append(data['landmarks'][keep])
+        is_right.append(data['hand'][keep] == 1)
+        labels.append(names[keep])
+    if not points:
+        return np.zeros((0, 21, 3), np.float32), np.zeros(0, bool), np.zeros(0, str)
+    return np.concatenate(points), np.concatenate(is_right), np.concatenate(labels)
+
+
+def split(count, validation_fraction, seed=0):
+    order = np.random.default_rng(seed).permutation(count)
+    cut = int(count * (1.0 - validation_fraction))
+    return order[:cut], order[cut:]
+
+
+def benchmark(model, points, is_right, labels, repeats=3):
+    """Accuracy and per-frame cost (two hands) of the rule cascade and the learned model"""
+    rules = GestureClassifier()
+    hands = [[Point(*lm) for lm in hand] for hand in points.tolist()]
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        rule_names = [rules.get_gesture_name(hand) for hand in hands]
+    rule_seconds = (time.perf_counter() - start) / repeats
+
+    # The app hands over MediaPipe landmark objects, so conversion to an array is part of the cost
+    start = time.perf_counter()
+    for _ in range(repeats):
+        learned_names = []
+        for i in range(0, len(hands), 2):
+            frame_hands = hands[i:i + 2]
+            frame_points = np.fromiter((v for hand in frame_hands for lm in hand for v in (lm.x, lm.y, lm.z)),
+                                       dtype=np.float32, count=len(frame_hands) * 63)
+            learned_names.extend(model.predict(frame_points, is_right[i:i + 2]))
+    learned_seconds = (time.perf_counter() - start) / repeats
+
+    frames = max(len(hands) / 2.0, 1.0)
+    return {
+        'rules_accuracy': float(np.mean(np.array(rule_names) == labels)) if len(labels) else 0.0,
+        'learned_accuracy': float(np.mean(np.array(learned_names) == labels)) if len(labels) else 0.0,
+        'rules_us_per_frame': rule_seconds / frames * 1e6,
+        'learned_us_per_frame': learned_seconds / frames * 1e6,
+    }
+
+
+def print_benchmark(stats, count):
+    print(f"{count} labelled hands (cost per frame = two hands)")
+    print(f"{'classifier':<10} {'accuracy':>9} {'us/frame':>9}")
+    print(f"{'rules':<10} {stats['rules_accuracy']:>9.3f} {stats['rules_us_per_frame']:>9.1f}")
+    print(f"{'learned':<10} {stats['learned_accuracy']:>9.3f} {stats['learned_us_per_frame']:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train and benchmark the learned gesture classifier")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    train_parser = sub.add_parser('train', help="Fit a model from offline_eval landmark archives")
+    train_parser.add_argument('recordings', nargs='+', help="<video>.landmarks.npz files")
+    train_parser.add_argument('--output', default=default_model_path())
+    train_parser.add_argument('--target', default='label', choices=('label', 'predicted'),
+                              help="Train on human labels, or distill the rule classifier's predictions")
+    train_parser.add_argument('--validation', type=float, default=0.2)
+    train_parser.add_argument('--iterations', type=int, default=500)
+    train_parser.add_argument('--l2', type=float, default=1e-3)
+
+    bench_parser = sub.add_parser('bench', help="Compare accuracy and cost against the rule classifier")
+    bench_parser.add_argument('recordings', nargs='+')
+    bench_parser.add_argument('--model', default=default_model_path())
+    args = parser.parse_args()
+
+    if args.command == 'train':
+        points, is_right, labels = load_recordings(args.recordings, args.target)
+        if len(labels) == 0:
+            print(f"No hands with a '{args.target}' in the recordings")
+            return 1
+        train_idx, val_idx = split(len(labels), args.validation)
+        features = extract_features(points, is_right)
+        model = train(features[train_idx], labels[train_idx], l2=args.l2, iterations=args.iterations)
+        train_accuracy = np.mean(np.array(model.predict(points[train_idx], is_right[train_idx])) == labels[train_idx])
+        print(f"{len(train_idx)} training hands, classes: {', '.join(model.classes)}")
+        print(f"Training accuracy {train_accuracy:.3f}")
+        if len(val_idx):
+            print_benchmark(benchmark(model, points[val_idx], is_right[val_idx], labels[val_idx]), len(val_idx))
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        model.save(args.output)
+        print(f"Model saved to {args.output}")
+    else:
+        model = GestureModel.load(args.model)
+        points, is_right, labels = load_recordings(args.recordings)
+        if len(labels) == 0:
+            print("No labelled hands in the recordings")
+            return 1
+        print_benchmark(benchmark(model, points, is_right, labels), len(labels))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
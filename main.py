@@ -1,18 +1,41 @@
 import cv2
-import mediapipe as mp
-from mediapipe.tasks import python
-from mediapipe.tasks.python import vision
 import pyautogui
 import numpy as np
 import tkinter as tk
 from tkinter import ttk
-from PIL import Image, ImageTk
 import threading
 import time
 import os
 import urllib.request
 import sys
 import ctypes
+import argparse
+import getpass
+import json
+
+import model_assets
+import model_registry
+from quality_controller import QualityController
+from execution_policy import get_state_policy, StateCpuMeter
+from overlay import LandmarkOverlay
+from preview import PreviewSurface
+from frame_pacing import FramePacer, FRAME_READY_EVENT
+from metrics import AppMetrics, MetricsServer
+from gesture_stream import GestureEventPublisher
+from detectors import LOCAL_BACKENDS, create_detector
+from scroll_engine import ScrollEngine, DEFAULT_RAMP_TIME as DEFAULT_SCROLL_RAMP_TIME
+from profiler import SamplingProfiler, DEFAULT_DURATION as DEFAULT_PROFILE_SECONDS
+from session_log import SessionLogWriter
+from event_log import EventLog
+from gestures import GestureClassifier
+from hand_tracker import HandTracker
+from frame_sources import open_source
+from pointer_mapping import (PointerCalibration, PointerMapping, DEFAULT_CAMERA_RECT, absolute_move,
+                             load_calibration, relative_move, save_calibration, virtual_desktop)
+from landmark_flow import LandmarkFlow
+from threshold_tuner import profile_path as gesture_profile_path, load_profile as load_gesture_profile, \
+    list_profiles as list_gesture_profiles, THRESHOLDS as GESTURE_THRESHOLDS
+from learned_classifier import GestureModel, MODEL_FILENAME as GESTURE_MODEL_FILENAME
 
 # Get the script directory
 # Handle PyInstaller bundled mode
@@ -128,24 +151,53 @@ class CornerIndicator:
             self.window = None
 
 
-class HandGestureMouseControl:
-    def __init__(self, root):
+class HandGestureMouseControl(GestureClassifier):
+    def __init__(self, root, metrics_port=None, event_port=None, inference_server=None, session_log_dir=None,
+                 detector='landmarker', profile_seconds=None, profile_dir='profiles', keyframe_interval=1,
+                 event_log_dir='logs', pointer_mode='relative', frame_source='camera:0',
+                 gesture_profile=None):
         self.root = root
         self.root.title("Hand Gesture Mouse Control")
         self.root.geometry("800x600")
+
+        # Structured diagnostics: the frame loop only enqueues, a background thread writes
+        # rotating JSON lines (see event_log.py). Replaces print() on the frame loop.
+        self.event_log = EventLog(event_log_dir)
+        self.event_log.start()
+        self.stats_log_interval = 60.0  # seconds between periodic 'stats' events
+        self.last_stats_log_time = time.perf_counter()
         
-        # MediaPipe setup using new tasks API
-        # Download model if not exists
-        model_path = self.download_model_if_needed()
-        base_options = python.BaseOptions(model_asset_path=model_path)
-        options = vision.HandLandmarkerOptions(
-            base_options=base_options,
-            num_hands=2,  # Detect both hands
-            min_hand_detection_confidence=0.7,
-            min_hand_presence_confidence=0.5,
-            min_tracking_confidence=0.5
-        )
-        self.hand_landmarker = vision.HandLandmarker.create_from_options(options)
+        # Hand detection backend (see detectors.py)
+        self.model_latency_budget_ms = model_registry.DEFAULT_LATENCY_BUDGET_MS
+        self.min_hand_detection_confidence = 0.7
+        # Thin-client mode: frames go to an inference server ('host:port') instead of a local model
+        self.inference_server = inference_server
+        self.detector_backend = 'remote' if inference_server else detector
+        self.model_selection_thread = None  # Downloads and benchmarks the variants off the UI thread
+        if self.detector_backend == 'landmarker':
+            # Settings override or this machine's cached selection - nothing else is downloaded or benchmarked here
+            selected = model_registry.cached_variant(model_registry.MODEL_VARIANTS, self.model_latency_budget_ms)
+            self.model_variant = selected or model_registry.DEFAULT_VARIANT
+            # Download only the chosen model if it doesn't exist
+            try:
+                self.model_path = self.download_model_if_needed(self.model_variant)
+            except Exception as e:
+                if self.model_variant == model_registry.DEFAULT_VARIANT:
+                    raise
+                self.event_log.error('download_model', e)
+                self.model_variant = model_registry.DEFAULT_VARIANT
+                self.model_path = self.download_model_if_needed(self.model_variant)
+            if selected is None:
+                # First run on this machine: the other variants are fetched and benchmarked in the
+                # background while the default runs, and the pick is applied when it is ready
+                self.start_model_selection()
+        elif self.detector_backend == 'gesture_recognizer':
+            self.model_variant = self.detector_backend
+            self.model_path = self.download_model_if_needed(self.detector_backend)
+        else:
+            self.model_variant = self.detector_backend
+            self.model_path = None
+        self.detector = self.create_detector(self.model_path)
         
         # Hand connections for drawing
         self.HAND_CONNECTIONS = [
@@ -155,10 +207,23 @@ class HandGestureMouseControl:
             (0, 13), (13, 14), (14, 15), (15, 16),  # Ring
             (0, 17), (17, 18), (18, 19), (19, 20)  # Pinky
         ]
+        self.overlay = LandmarkOverlay(self.HAND_CONNECTIONS)
         
         # Camera setup
         self.cap = None
+        self.frame_source = frame_source  # Spec for frame_sources.open_source (camera, clip, images, ...)
         self.is_running = False
+        self.frame_pacer = None  # Capture thread that wakes update_frame per camera frame
+        self.capture_released = None  # Set once the last session's capture thread has let go of the source
+        self.camera_start_deadline = None  # While a start waits for that (perf_counter)
+        self.last_processed_time = 0.0
+        self.last_frame_seq = None
+        # Clock for hold timers and cooldowns: wall time for live sources, media time (offset by
+        # clock_origin) for lossless ones, so a clip replayed as fast as possible acts the same every run
+        self.frame_time = time.time()
+        self.clock_origin = 0.0
+        self.status = ("Status: Camera Off", "red")  # Status bar (text, color) behind any detector outage
+        self.detector_outage = None  # Detector's outage message while it is shown in the status bar
         # Control state: 'ON', 'SOFT_DISABLED', 'HARD_DISABLED'
         # - SOFT_DISABLED: Can be re-enabled by pointing/palm or both fists
         # - HARD_DISABLED: Can only be re-enabled by both fists
@@ -171,19 +236,31 @@ class HandGestureMouseControl:
         self.smoothing_factor = 0.85  # Higher value = more smoothing
         self.movement_threshold = 0.001  # Minimum normalized movement (0-1 range) to trigger mouse movement
         self.sensitivity = 3.0  # Multiplier for finger movement to mouse movement (higher = more sensitive)
-        self.last_finger_x = None  # Previous finger position in normalized coordinates (0-1)
-        self.last_finger_y = None
-        self.smoothed_dx = 0.0  # Smoothed movement delta
-        self.smoothed_dy = 0.0
+
+        # Pointer mode: 'relative' moves by the finger delta, 'absolute' maps a calibrated
+        # camera rectangle onto the whole virtual desktop (see pointer_mapping.py)
+        self.pointer_mode = pointer_mode
+        self.pointer_calibration_path = os.path.join(model_registry.get_cache_dir(), "pointer_calibration.json")
+        corners = load_calibration(self.pointer_calibration_path)
+        self.pointer_calibrated = corners is not None
+        self.pointer_mapping = PointerMapping(corners or DEFAULT_CAMERA_RECT,
+                                              virtual_desktop((self.screen_width, self.screen_height)))
+        self.pointer_calibration = None  # PointerCalibration while the user sets the corners
+        self.pointer_calibration_prompt = None
+
+        # Stable per-hand tracks across frames - pointer smoothing, hold timers and
+        # the cached classification live on the track (see hand_tracker.py)
+        self.hand_tracker = HandTracker()
         
         # Click detection
-        self.click_threshold = 0.03  # Distance threshold for pinch gesture (thumb to index finger)
         self.last_click_time = 0
         self.click_cooldown = 2.0  # seconds between clicks
         
         # Scroll detection
-        self.last_scroll_time = 0
-        self.scroll_cooldown = 0.1  # seconds between scroll actions
+        self.scroll_ramp_time = DEFAULT_SCROLL_RAMP_TIME  # seconds to reach full scroll speed
+        # Emits smooth scroll events on its own timer; the frame loop only sets a target velocity
+        self.scroll_engine = ScrollEngine(self.emit_scroll, ramp_time=self.scroll_ramp_time,
+                                          error_fn=lambda e: self.event_log.error('scroll', e))
         self.scroll_speed = 12  # Scroll units per gesture
 
         # Toggle control detection (both fists)
@@ -194,52 +271,230 @@ class HandGestureMouseControl:
         self.both_fists_hold_start_time = None
         self.both_fists_hold_duration = 0.5  # seconds to hold both fists to unlock
 
-        # Right hand fist hold detection
-        self.fist_hold_start_time = None  # When fist was first detected
+        # Right hand fist hold detection (hold start time is per track)
         self.fist_hold_duration = 1.0  # seconds to hold fist to soft-disable control
 
-        # Right hand victory hold detection
-        self.victory_hold_start_time = None  # When victory was first detected
+        # Right hand victory hold detection (hold start time is per track)
         self.victory_hold_duration = 1.0  # seconds to hold victory to trigger task view
 
+        # Adaptive quality: trades input scale, detection cadence, preview rate and
+        # detection confidence for latency to hold the target p95 frame latency
+        self.quality_controller = QualityController()
+        self.frame_index = 0
+        self.last_detection_result = None  # Reused on frames where detection is skipped
+
+        # Keyframe inference: detect every Nth frame (1 = off) and move the landmarks
+        # with optical flow in between (see landmark_flow.py)
+        self.keyframe_interval = keyframe_interval
+        self.landmark_flow = LandmarkFlow()
+
+        # Gesture classifier: 'rules' (predicate cascade) or 'learned' (models/gesture_classifier.npz)
+        self.gesture_classifier = 'rules'
+        self.gesture_model = None
+
+        # Rule thresholds fitted to the user's recordings by threshold_tuner.py ('defaults' = class values)
+        self.gesture_profile = 'defaults'
+        self.apply_gesture_profile(gesture_profile or 'defaults')
+
+        # Per-state CPU usage (see execution_policy.STATE_POLICIES for the per-state budget)
+        self.state_cpu_meter = StateCpuMeter()
+
+        # Metrics (always recorded - cheap), served on localhost only when a port is given
+        self.metrics = AppMetrics()
+        self.register_metric_callbacks()
+        self.metrics_server = None
+        if metrics_port:
+            self.metrics_server = MetricsServer(self.metrics, metrics_port)
+            self.metrics_server.start()
+
+        # Gesture event stream for other local applications (opt-in)
+        self.event_publisher = None
+        if event_port:
+            self.event_publisher = GestureEventPublisher(event_port)
+            self.event_publisher.start()
+
+        # Landmark/gesture recording for offline tuning (opt-in), one segment per camera session
+        self.session_log_dir = session_log_dir
+        self.session_log = None
+
+        # Sampling profiler - time-boxed sessions from --profile or the Settings tab
+        self.profiler = SamplingProfiler(profile_dir, duration=profile_seconds or DEFAULT_PROFILE_SECONDS)
+
         # Corner indicator for control status
         self.cursor_indicator = CornerIndicator(self.root)
 
         # Create GUI
         self.create_gui()
+        self.root.bind(FRAME_READY_EVENT, self.on_frame_ready)
+        if profile_seconds:
+            self.profiling_var.set(True)
+            self.update_profiling()
         
         # Disable PyAutoGUI failsafe for smoother control
         pyautogui.FAILSAFE = False
     
-    def download_model_if_needed(self):
-        """Download the hand landmarker model if it doesn't exist"""
+    def register_metric_callbacks(self):
+        """Expose state owned by other components, read only when the endpoint is scraped"""
+        self.metrics.add_callback(
+            "hgmc_control_state_seconds_total", "Time spent in each control state since the camera started",
+            "counter",
+            lambda: {(state,): stats['wall'] for state, stats in self.state_cpu_meter.stats.items()},
+            ('state',)
+        )
+        self.metrics.add_callback(
+            "hgmc_control_state", "Current control state (1 = active)", "gauge",
+            lambda: {(state,): int(state == self.control_state) for state in self.state_cpu_meter.stats},
+            ('state',)
+        )
+        self.metrics.add_callback(
+            "hgmc_camera_fps", "Camera frame rate", "gauge",
+            lambda: self.frame_pacer.stats()['camera_fps'] if self.frame_pacer else 0.0
+        )
+        self.metrics.add_callback(
+            "hgmc_quality_level", "Adaptive quality level (0 = full quality)", "gauge",
+            lambda: self.quality_controller.level
+        )
+        self.metrics.add_callback(
+            "hgmc_keyframe_propagated_frames_total", "Frames whose landmarks came from optical flow", "counter",
+            lambda: self.landmark_flow.propagated
+        )
+        self.metrics.add_callback(
+            "hgmc_keyframe_tracking_losses_total", "Optical-flow propagations that fell back to detection",
+            "counter", lambda: self.landmark_flow.lost
+        )
+        coherence = self.hand_tracker.coherence
+        self.metrics.add_callback(
+            "hgmc_still_hand_memo_results_total", "Gesture predicate results by source (reused = hand held still)",
+            "counter", lambda: {('reused',): coherence.reused, ('computed',): coherence.computed}, ('source',)
+        )
+        self.metrics.add_callback(
+            "hgmc_still_hand_memo_saved_seconds_total", "Classification time saved by reusing predicate results",
+            "counter", lambda: coherence.saved_seconds
+        )
+        self.metrics.add_callback(
+            "hgmc_still_hand_memo_check_seconds_total", "Time spent checking whether hands held still", "counter",
+            lambda: coherence.check_seconds
+        )
+        self.metrics.add_callback(
+            "hgmc_scroll_events_total", "Scroll events emitted by the scroll engine", "counter",
+            lambda: self.scroll_engine.emitted
+        )
+
+    def download_model_if_needed(self, variant=model_registry.DEFAULT_VARIANT):
+        """Download the hand landmarker model variant (or an auxiliary task model) if it doesn't exist"""
+        model_info = model_registry.MODEL_VARIANTS.get(variant) or model_registry.AUXILIARY_MODELS[variant]
         # For PyInstaller, use the bundled models directory
         # For regular execution, use script directory
         if getattr(sys, 'frozen', False):
             # Running as compiled executable - use bundled models
-            model_path = os.path.join(SCRIPT_DIR, "models", "hand_landmarker.task")
+            model_path = os.path.join(SCRIPT_DIR, "models", model_info['filename'])
             if not os.path.exists(model_path):
                 raise FileNotFoundError(f"Model file not found in bundled resources: {model_path}")
         else:
             # Running as script - use script directory
             model_dir = os.path.join(SCRIPT_DIR, "models")
             os.makedirs(model_dir, exist_ok=True)
-            model_path = os.path.join(model_dir, "hand_landmarker.task")
+            model_path = os.path.join(model_dir, model_info['filename'])
             
             if not os.path.exists(model_path):
-                print("Downloading hand landmarker model (this may take a moment)...")
-                model_url = "https://storage.googleapis.com/mediapipe-models/hand_landmarker/hand_landmarker/float16/1/hand_landmarker.task"
+                model_url = model_info['url']
+                self.event_log.emit('model', action='download', variant=variant, url=model_url)
+                # Only complete files appear under the model name (the selection thread may download too)
+                partial_path = f"{model_path}.{threading.get_ident()}.part"
                 try:
-                    urllib.request.urlretrieve(model_url, model_path)
-                    print("Model downloaded successfully!")
+                    urllib.request.urlretrieve(model_url, partial_path)
+                    os.replace(partial_path, model_path)
+                    self.event_log.emit('model', action='downloaded', variant=variant, path=model_path)
                 except Exception as e:
-                    print(f"Error downloading model: {e}")
-                    print("Please download the model manually from:")
-                    print("https://storage.googleapis.com/mediapipe-models/hand_landmarker/hand_landmarker/float16/1/hand_landmarker.task")
-                    print(f"Save it to: {model_path}")
+                    # Don't leave a partial download behind
+                    if os.path.exists(partial_path):
+                        os.remove(partial_path)
+                    self.event_log.error('download_model', IOError(
+                        f"{e} - download {model_url} manually and save it to {model_path}"))
                     raise
         
         return model_path
+
+    def get_available_model_paths(self):
+        """Return {variant: path} for every model variant that is present or can be downloaded"""
+        model_paths = {}
+        for variant in model_registry.MODEL_VARIANTS:
+            try:
+                model_paths[variant] = self.download_model_if_needed(variant)
+            except Exception:
+                # Variant not bundled / not downloadable - skip it
+                pass
+        return model_paths
+
+    def resolve_model_variant(self, force_benchmark=False):
+        """The Settings override or cached benchmark result, without downloading or benchmarking.
+
+        Returns None when a benchmark is needed - it is started on a worker thread and its
+        result applied from the main loop (finish_model_selection).
+        """
+        variant = model_registry.cached_variant(model_registry.MODEL_VARIANTS, self.model_latency_budget_ms,
+                                                force=force_benchmark)
+        if variant is None:
+            self.start_model_selection(force_benchmark)
+        return variant
+
+    def model_selection_running(self):
+        return self.model_selection_thread is not None and self.model_selection_thread.is_alive()
+
+    def start_model_selection(self, force_benchmark=False):
+        """Download every variant and benchmark them on a worker thread"""
+        if self.model_selection_running():
+            return
+        clip_path = os.path.join(SCRIPT_DIR, "models", model_registry.BENCHMARK_CLIP_NAME)
+
+        def select():
+            try:
+                model_paths = self.get_available_model_paths()
+                if not model_paths:
+                    return
+                variant = model_registry.select_variant(
+                    model_paths,
+                    latency_budget_ms=self.model_latency_budget_ms,
+                    clip_path=clip_path,
+                    force=force_benchmark,
+                    emit=self.event_log.emit
+                )
+            except Exception as e:
+                self.event_log.error('model_selection', e)
+                return
+            self.event_log.emit('model', action='selected', variant=variant)
+            try:
+                self.root.after(0, self.finish_model_selection, variant)
+            except (tk.TclError, RuntimeError):
+                pass  # The app was closed meanwhile
+
+        self.model_selection_thread = threading.Thread(target=select, name="ModelSelection", daemon=True)
+        self.model_selection_thread.start()
+
+    def finish_model_selection(self, variant):
+        """Apply the background selection, unless a variant was picked in Settings meanwhile"""
+        if model_registry.load_selection_cache().get('override') in model_registry.MODEL_VARIANTS:
+            return
+        self._apply_model_variant(variant)
+
+    def create_detector(self, model_path):
+        """Create the detection backend for the given model file"""
+        # Remote: detection options are set on the server
+        return create_detector(
+            self.detector_backend,
+            model_path=model_path,
+            address=self.inference_server,
+            min_hand_detection_confidence=self.min_hand_detection_confidence
+        )
+
+    def switch_model_variant(self, variant):
+        """Rebuild the hand landmarker with a different model variant"""
+        model_path = self.download_model_if_needed(variant)
+        old_detector = self.detector
+        self.detector = self.create_detector(model_path)
+        self.model_path = model_path
+        self.model_variant = variant
+        old_detector.close()
         
     def create_gui(self):
         # Control frame
@@ -286,6 +541,31 @@ class HandGestureMouseControl:
         # Video label
         self.video_label = ttk.Label(self.video_frame)
         self.video_label.pack()
+        self.preview = PreviewSurface(self.video_label)
+
+        # Adaptive quality status (controller decisions)
+        self.quality_label = ttk.Label(
+            self.video_tab,
+            text=self.quality_controller.describe(),
+            font=("Arial", 8)
+        )
+        self.quality_label.pack()
+
+        # Per-state CPU comparison
+        self.state_cpu_label = ttk.Label(
+            self.video_tab,
+            text=self.state_cpu_meter.describe(),
+            font=("Arial", 8)
+        )
+        self.state_cpu_label.pack()
+
+        # Frame pacing statistics (processing should follow the camera cadence)
+        self.pacing_label = ttk.Label(
+            self.video_tab,
+            text="Pacing: camera off",
+            font=("Arial", 8)
+        )
+        self.pacing_label.pack()
         
         # Instructions
         instructions = """
@@ -319,8 +599,23 @@ class HandGestureMouseControl:
     
     def create_settings_tab(self):
         """Create settings tab with adjustable parameters"""
-        settings_frame = ttk.Frame(self.settings_tab, padding="20")
-        settings_frame.pack(fill=tk.BOTH, expand=True)
+        # Scrollable container - the settings no longer fit in the window height
+        settings_canvas = tk.Canvas(self.settings_tab, highlightthickness=0)
+        settings_scrollbar = ttk.Scrollbar(self.settings_tab, orient=tk.VERTICAL, command=settings_canvas.yview)
+        settings_canvas.configure(yscrollcommand=settings_scrollbar.set)
+        settings_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        settings_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        settings_frame = ttk.Frame(settings_canvas, padding="20")
+        settings_window = settings_canvas.create_window((0, 0), window=settings_frame, anchor="nw")
+        settings_frame.bind(
+            "<Configure>",
+            lambda e: settings_canvas.configure(scrollregion=settings_canvas.bbox("all"))
+        )
+        settings_canvas.bind(
+            "<Configure>",
+            lambda e: settings_canvas.itemconfigure(settings_window, width=e.width)
+        )
         
         # Scroll Speed
         scroll_frame = ttk.LabelFrame(settings_frame, text="Scroll Speed", padding="10")
@@ -405,6 +700,34 @@ class HandGestureMouseControl:
         
         self.threshold_value_label = ttk.Label(threshold_frame, text=f"{self.movement_threshold:.4f}")
         self.threshold_value_label.pack(side=tk.LEFT, padx=5)
+
+        # Pointer Mode
+        pointer_frame = ttk.LabelFrame(settings_frame, text="Pointer Mode", padding="10")
+        pointer_frame.pack(fill=tk.X, pady=10)
+
+        pointer_label = ttk.Label(pointer_frame, text="Mode:")
+        pointer_label.pack(side=tk.LEFT, padx=5)
+
+        self.pointer_mode_var = tk.StringVar(value=self.pointer_mode)
+        self.pointer_mode_combo = ttk.Combobox(
+            pointer_frame,
+            textvariable=self.pointer_mode_var,
+            values=['relative', 'absolute'],
+            state="readonly",
+            width=10
+        )
+        self.pointer_mode_combo.bind("<<ComboboxSelected>>", self.update_pointer_mode)
+        self.pointer_mode_combo.pack(side=tk.LEFT, padx=5)
+
+        self.calibrate_btn = ttk.Button(
+            pointer_frame,
+            text="Calibrate",
+            command=self.start_pointer_calibration
+        )
+        self.calibrate_btn.pack(side=tk.LEFT, padx=5)
+
+        self.pointer_value_label = ttk.Label(pointer_frame, text=self.describe_pointer_mapping())
+        self.pointer_value_label.pack(side=tk.LEFT, padx=5)
         
         # Click Cooldown
         cooldown_frame = ttk.LabelFrame(settings_frame, text="Click Cooldown", padding="10")
@@ -427,26 +750,170 @@ class HandGestureMouseControl:
         self.cooldown_value_label = ttk.Label(cooldown_frame, text=f"{self.click_cooldown:.2f}s")
         self.cooldown_value_label.pack(side=tk.LEFT, padx=5)
         
-        # Scroll Cooldown
-        scroll_cooldown_frame = ttk.LabelFrame(settings_frame, text="Scroll Cooldown", padding="10")
-        scroll_cooldown_frame.pack(fill=tk.X, pady=10)
+        # Scroll Ramp
+        scroll_ramp_frame = ttk.LabelFrame(settings_frame, text="Scroll Ramp", padding="10")
+        scroll_ramp_frame.pack(fill=tk.X, pady=10)
         
-        self.scroll_cooldown_var = tk.DoubleVar(value=self.scroll_cooldown)
-        scroll_cooldown_label = ttk.Label(scroll_cooldown_frame, text="Cooldown (seconds):")
-        scroll_cooldown_label.pack(side=tk.LEFT, padx=5)
+        self.scroll_ramp_var = tk.DoubleVar(value=self.scroll_ramp_time)
+        scroll_ramp_label = ttk.Label(scroll_ramp_frame, text="Time to full speed (seconds):")
+        scroll_ramp_label.pack(side=tk.LEFT, padx=5)
         
-        self.scroll_cooldown_scale = ttk.Scale(
-            scroll_cooldown_frame,
+        self.scroll_ramp_scale = ttk.Scale(
+            scroll_ramp_frame,
             from_=0.05,
-            to=0.5,
+            to=1.0,
             orient=tk.HORIZONTAL,
-            variable=self.scroll_cooldown_var,
-            command=self.update_scroll_cooldown
+            variable=self.scroll_ramp_var,
+            command=self.update_scroll_ramp
         )
-        self.scroll_cooldown_scale.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        self.scroll_ramp_scale.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
         
-        self.scroll_cooldown_value_label = ttk.Label(scroll_cooldown_frame, text=f"{self.scroll_cooldown:.2f}s")
-        self.scroll_cooldown_value_label.pack(side=tk.LEFT, padx=5)
+        self.scroll_ramp_value_label = ttk.Label(scroll_ramp_frame, text=f"{self.scroll_ramp_time:.2f}s")
+        self.scroll_ramp_value_label.pack(side=tk.LEFT, padx=5)
+
+        # Hand Model
+        model_frame = ttk.LabelFrame(settings_frame, text="Hand Model", padding="10")
+        model_frame.pack(fill=tk.X, pady=10)
+
+        model_label = ttk.Label(model_frame, text="Model:")
+        model_label.pack(side=tk.LEFT, padx=5)
+
+        override = model_registry.load_selection_cache().get('override', model_registry.AUTO_VARIANT)
+        self.model_variant_var = tk.StringVar(value=override)
+        self.model_variant_combo = ttk.Combobox(
+            model_frame,
+            textvariable=self.model_variant_var,
+            values=[model_registry.AUTO_VARIANT] + list(model_registry.MODEL_VARIANTS),
+            state="readonly",
+            width=16
+        )
+        self.model_variant_combo.bind("<<ComboboxSelected>>", self.update_model_variant)
+        self.model_variant_combo.pack(side=tk.LEFT, padx=5)
+
+        self.benchmark_btn = ttk.Button(
+            model_frame,
+            text="Re-run Benchmark",
+            command=self.rerun_model_benchmark
+        )
+        self.benchmark_btn.pack(side=tk.LEFT, padx=5)
+
+        self.model_value_label = ttk.Label(
+            model_frame,
+            text=f"Using inference server {self.inference_server}" if self.inference_server
+            else f"Using {self.model_variant}" + (" (benchmarking...)" if self.model_selection_running() else "")
+        )
+        self.model_value_label.pack(side=tk.LEFT, padx=5)
+
+        # Gesture Classifier
+        classifier_frame = ttk.LabelFrame(settings_frame, text="Gesture Classifier", padding="10")
+        classifier_frame.pack(fill=tk.X, pady=10)
+
+        classifier_label = ttk.Label(classifier_frame, text="Classifier:")
+        classifier_label.pack(side=tk.LEFT, padx=5)
+
+        self.gesture_classifier_var = tk.StringVar(value=self.gesture_classifier)
+        self.gesture_classifier_combo = ttk.Combobox(
+            classifier_frame,
+            textvariable=self.gesture_classifier_var,
+            values=['rules', 'learned'],
+            state="readonly",
+            width=10
+        )
+        self.gesture_classifier_combo.bind("<<ComboboxSelected>>", self.update_gesture_classifier)
+        self.gesture_classifier_combo.pack(side=tk.LEFT, padx=5)
+
+        self.gesture_classifier_value_label = ttk.Label(classifier_frame, text="Hand-tuned rules")
+        self.gesture_classifier_value_label.pack(side=tk.LEFT, padx=5)
+
+        # Gesture Profile
+        gesture_profile_frame = ttk.LabelFrame(settings_frame, text="Gesture Profile", padding="10")
+        gesture_profile_frame.pack(fill=tk.X, pady=10)
+
+        gesture_profile_label = ttk.Label(gesture_profile_frame, text="Thresholds:")
+        gesture_profile_label.pack(side=tk.LEFT, padx=5)
+
+        self.gesture_profile_var = tk.StringVar(value=self.gesture_profile)
+        self.gesture_profile_combo = ttk.Combobox(
+            gesture_profile_frame,
+            textvariable=self.gesture_profile_var,
+            values=['defaults'] + list_gesture_profiles(),
+            state="readonly",
+            width=16
+        )
+        self.gesture_profile_combo.bind("<<ComboboxSelected>>", self.update_gesture_profile)
+        self.gesture_profile_combo.pack(side=tk.LEFT, padx=5)
+
+        self.gesture_profile_value_label = ttk.Label(gesture_profile_frame, text=self.describe_gesture_profile())
+        self.gesture_profile_value_label.pack(side=tk.LEFT, padx=5)
+
+        # Profiling
+        profiling_frame = ttk.LabelFrame(settings_frame, text="Profiling", padding="10")
+        profiling_frame.pack(fill=tk.X, pady=10)
+
+        self.profiling_var = tk.BooleanVar(value=False)
+        profiling_check = ttk.Checkbutton(
+            profiling_frame,
+            text=f"Sample profile ({self.profiler.duration / 60:.0f} min)",
+            variable=self.profiling_var,
+            command=self.update_profiling
+        )
+        profiling_check.pack(side=tk.LEFT, padx=5)
+
+        self.profiling_value_label = ttk.Label(profiling_frame, text=self.profiler.describe())
+        self.profiling_value_label.pack(side=tk.LEFT, padx=5)
+
+        # Adaptive Quality
+        quality_frame = ttk.LabelFrame(settings_frame, text="Adaptive Quality", padding="10")
+        quality_frame.pack(fill=tk.X, pady=10)
+
+        self.adaptive_quality_var = tk.BooleanVar(value=self.quality_controller.enabled)
+        adaptive_quality_check = ttk.Checkbutton(
+            quality_frame,
+            text="Enabled",
+            variable=self.adaptive_quality_var,
+            command=self.update_adaptive_quality
+        )
+        adaptive_quality_check.pack(side=tk.LEFT, padx=5)
+
+        self.target_latency_var = tk.DoubleVar(value=self.quality_controller.target_latency_ms)
+        target_latency_label = ttk.Label(quality_frame, text="Target p95 (ms):")
+        target_latency_label.pack(side=tk.LEFT, padx=5)
+
+        self.target_latency_scale = ttk.Scale(
+            quality_frame,
+            from_=15,
+            to=150,
+            orient=tk.HORIZONTAL,
+            variable=self.target_latency_var,
+            command=self.update_target_latency
+        )
+        self.target_latency_scale.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+
+        self.target_latency_value_label = ttk.Label(
+            quality_frame, text=f"{self.quality_controller.target_latency_ms:.0f}ms"
+        )
+        self.target_latency_value_label.pack(side=tk.LEFT, padx=5)
+
+        # Keyframe Inference
+        keyframe_frame = ttk.LabelFrame(settings_frame, text="Keyframe Inference", padding="10")
+        keyframe_frame.pack(fill=tk.X, pady=10)
+
+        self.keyframe_interval_var = tk.DoubleVar(value=self.keyframe_interval)
+        keyframe_label = ttk.Label(keyframe_frame, text="Detect every N frames (optical flow in between):")
+        keyframe_label.pack(side=tk.LEFT, padx=5)
+
+        self.keyframe_interval_scale = ttk.Scale(
+            keyframe_frame,
+            from_=1,
+            to=6,
+            orient=tk.HORIZONTAL,
+            variable=self.keyframe_interval_var,
+            command=self.update_keyframe_interval
+        )
+        self.keyframe_interval_scale.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+
+        self.keyframe_interval_value_label = ttk.Label(keyframe_frame, text=self.describe_keyframe_interval())
+        self.keyframe_interval_value_label.pack(side=tk.LEFT, padx=5)
     
     def update_scroll_speed(self, value=None):
         """Update scroll speed parameter"""
@@ -468,66 +935,331 @@ class HandGestureMouseControl:
         self.movement_threshold = float(self.threshold_var.get())
         self.threshold_value_label.config(text=f"{self.movement_threshold:.4f}")
     
+    def describe_pointer_mapping(self):
+        calibration = "calibrated" if self.pointer_calibrated else "default area, not calibrated"
+        left, top, width, height = self.pointer_mapping.desktop
+        return f"Desktop {width}x{height}, {calibration}"
+
+    def update_pointer_mode(self, event=None):
+        """Switch between relative and absolute pointing"""
+        self.pointer_mode = self.pointer_mode_var.get()
+        for track in self.hand_tracker.tracks:
+            track.reset_pointer()
+
+    def start_pointer_calibration(self):
+        """Set the interaction rectangle by holding the pointing finger on each corner"""
+        if not self.is_running or self.control_state != 'ON':
+            self.set_status("Status: Start the camera and enable control to calibrate", "orange")
+            return
+        self.pointer_calibration = PointerCalibration()
+        self.pointer_calibration_prompt = self.pointer_calibration.prompt()
+        self.set_status(self.pointer_calibration_prompt, "blue")
+
+    def finish_pointer_calibration(self):
+        corners = self.pointer_calibration.corners
+        self.pointer_calibration = None
+        self.pointer_mapping = PointerMapping(corners, virtual_desktop((self.screen_width, self.screen_height)))
+        self.pointer_calibrated = True
+        save_calibration(self.pointer_calibration_path, corners)
+        self.event_log.emit('pointer_calibration', corners=corners, desktop=self.pointer_mapping.desktop)
+        self.pointer_value_label.config(text=self.describe_pointer_mapping())
+        self.set_status("Status: Pointer calibrated", "blue")
+        for track in self.hand_tracker.tracks:
+            track.reset_pointer()
+
     def update_cooldown(self, value=None):
         """Update click cooldown parameter"""
         self.click_cooldown = float(self.cooldown_var.get())
         self.cooldown_value_label.config(text=f"{self.click_cooldown:.2f}s")
     
-    def update_scroll_cooldown(self, value=None):
-        """Update scroll cooldown parameter"""
-        self.scroll_cooldown = float(self.scroll_cooldown_var.get())
-        self.scroll_cooldown_value_label.config(text=f"{self.scroll_cooldown:.2f}s")
+    def update_scroll_ramp(self, value=None):
+        """Update scroll acceleration/deceleration time"""
+        self.scroll_ramp_time = float(self.scroll_ramp_var.get())
+        self.scroll_engine.ramp_time = self.scroll_ramp_time
+        self.scroll_ramp_value_label.config(text=f"{self.scroll_ramp_time:.2f}s")
+
+    def update_model_variant(self, event=None):
+        """Apply the model override from the Settings tab ('auto' = benchmark selection)"""
+        if self.detector_backend != 'landmarker':
+            return  # Variants only apply to the local hand landmarker
+        choice = self.model_variant_var.get()
+        model_registry.set_variant_override(choice)
+        variant = self.resolve_model_variant() if choice == model_registry.AUTO_VARIANT else choice
+        if variant is None:
+            self.model_value_label.config(text=f"Using {self.model_variant} (benchmarking...)")
+            return
+        self._apply_model_variant(variant)
+
+    def update_gesture_classifier(self, event=None):
+        """Switch between the rule cascade and the learned model"""
+        choice = self.gesture_classifier_var.get()
+        rules_text = "Hand-tuned rules"
+        if choice == 'learned':
+            model_path = os.path.join(SCRIPT_DIR, "models", GESTURE_MODEL_FILENAME)
+            try:
+                self.gesture_model = GestureModel.load(model_path)
+            except Exception as e:
+                self.event_log.error('gesture_model', e)
+                rules_text = "No learned model - train one with learned_classifier.py train"
+                self.gesture_classifier_var.set('rules')
+                choice = 'rules'
+        if choice == 'rules':
+            self.gesture_model = None
+            self.learned_gestures = None
+            self.gesture_classifier_value_label.config(text=rules_text)
+        else:
+            self.gesture_classifier_value_label.config(
+                text=f"Learned model ({len(self.gesture_model.classes)} gestures)"
+            )
+        self.gesture_classifier = choice
+
+    def apply_gesture_profile(self, name):
+        """Use the thresholds of a saved profile (see threshold_tuner.py), or the class defaults"""
+        thresholds = {}
+        if name != 'defaults':
+            thresholds = load_gesture_profile(gesture_profile_path(name))
+            if thresholds is None:
+                if name != getpass.getuser():
+                    self.event_log.emit('gesture_profile', requested=name, profile='defaults',
+                                        message="No usable profile - using the default thresholds")
+                name, thresholds = 'defaults', {}
+        for threshold in GESTURE_THRESHOLDS:
+            setattr(self, threshold, thresholds.get(threshold, getattr(GestureClassifier, threshold)))
+        # Cached classifications were made with the old thresholds
+        for track in self.hand_tracker.tracks:
+            track.classified_landmarks = None
+            track.memo = None
+        if name != 'defaults':
+            self.event_log.emit('gesture_profile', profile=name, thresholds=thresholds)
+        self.gesture_profile = name
+        return name
+
+    def describe_gesture_profile(self):
+        if self.gesture_profile == 'defaults':
+            return "Built-in thresholds"
+        changed = sum(getattr(self, name) != getattr(GestureClassifier, name) for name in GESTURE_THRESHOLDS)
+        return f"Tuned for {self.gesture_profile} ({changed} thresholds changed)"
+
+    def update_gesture_profile(self, event=None):
+        """Switch threshold profiles from the Settings tab"""
+        self.gesture_profile_var.set(self.apply_gesture_profile(self.gesture_profile_var.get()))
+        self.gesture_profile_value_label.config(text=self.describe_gesture_profile())
+
+    def update_profiling(self):
+        """Start or stop a sampling profiler session"""
+        if self.profiling_var.get():
+            self.profiler.start()
+            self.refresh_profiling_status()
+        else:
+            self.profiler.stop()
+            self.profiling_value_label.config(text=self.profiler.describe())
+
+    def refresh_profiling_status(self):
+        """Update the Settings label once a second until the session ends"""
+        self.profiling_value_label.config(text=self.profiler.describe())
+        if self.profiler.running:
+            self.root.after(1000, self.refresh_profiling_status)
+        else:
+            self.profiling_var.set(False)
+
+    def update_adaptive_quality(self):
+        """Turn the adaptive quality controller on or off"""
+        self.quality_controller.set_enabled(self.adaptive_quality_var.get())
+        self.apply_quality_settings()
+        self.quality_label.config(text=self.quality_controller.describe())
+
+    def update_target_latency(self, value=None):
+        """Update the target p95 frame latency"""
+        self.quality_controller.target_latency_ms = float(self.target_latency_var.get())
+        self.quality_controller.reset()
+        self.target_latency_value_label.config(text=f"{self.quality_controller.target_latency_ms:.0f}ms")
+
+    def describe_keyframe_interval(self):
+        return "Off" if self.keyframe_interval <= 1 else str(self.keyframe_interval)
+
+    def update_keyframe_interval(self, value=None):
+        """Update how often full detection runs in keyframe mode"""
+        interval = int(round(float(self.keyframe_interval_var.get())))
+        if interval != self.keyframe_interval:
+            self.keyframe_interval = interval
+            self.landmark_flow.reset()
+        self.keyframe_interval_value_label.config(text=self.describe_keyframe_interval())
+
+    def apply_quality_settings(self):
+        """Apply the controller's current level (rebuilds a local detector if its options changed)"""
+        confidence = self.quality_controller.settings['min_hand_detection_confidence']
+        if confidence != self.min_hand_detection_confidence:
+            self.min_hand_detection_confidence = confidence
+            # Remote options live on the server (rebuilding would drop the connection), stub has none
+            if self.detector_backend in LOCAL_BACKENDS:
+                old_detector = self.detector
+                self.detector = self.create_detector(self.model_path)
+                old_detector.close()
+        self.last_detection_result = None
+        self.landmark_flow.reset()
+
+    def rerun_model_benchmark(self):
+        """Discard the cached selection and benchmark all variants again"""
+        if self.detector_backend != 'landmarker':
+            return  # Variants only apply to the local hand landmarker
+        self.model_variant_var.set(model_registry.AUTO_VARIANT)
+        model_registry.set_variant_override(model_registry.AUTO_VARIANT)
+        self.model_value_label.config(text=f"Using {self.model_variant} (benchmarking...)")
+        self.start_model_selection(force_benchmark=True)
+
+    def _apply_model_variant(self, variant):
+        if variant != self.model_variant:
+            try:
+                self.switch_model_variant(variant)
+            except Exception as e:
+                self.event_log.error('switch_model', e)
+                self.model_value_label.config(text=f"Using {self.model_variant} ({variant} failed to load)")
+                return
+        self.model_value_label.config(text=f"Using {self.model_variant}")
         
+    def open_capture(self):
+        """Open the frame source given with --source (the camera by default)"""
+        try:
+            return open_source(self.frame_source)
+        except ValueError as e:
+            self.event_log.error('open_capture', e)
+            return open_source('camera:0')
+
     def toggle_camera(self):
         if not self.is_running:
-            self.cap = cv2.VideoCapture(0)
+            if self.capture_released is not None and not self.capture_released.is_set():
+                # The last capture thread is still in its final read - open the device once it lets go
+                if self.camera_start_deadline is None:
+                    self.camera_start_deadline = time.perf_counter() + 2.0
+                    self.set_status("Status: Releasing camera...", "orange")
+                    self.root.after(50, self.retry_camera_start)
+                return
+            self.camera_start_deadline = None
+            self.cap = self.open_capture()
             if not self.cap.isOpened():
-                self.status_label.config(text="Status: Camera Error", foreground="red")
+                self.cap.release()
+                self.cap = None
+                self.set_status("Status: Camera Error", "red")
                 return
             self.is_running = True
             self.camera_btn.config(text="Stop Camera")
             self.control_btn.config(state=tk.NORMAL)
-            self.status_label.config(text="Status: Camera On", foreground="green")
+            self.set_status("Status: Camera On", "green")
+            self.quality_controller.reset()
+            self.state_cpu_meter.reset()
+            self.last_detection_result = None
+            self.landmark_flow.reset()
+            self.hand_tracker.reset()
             # Show indicator in SOFT_DISABLED state when camera starts
             self.cursor_indicator.set_state('SOFT_DISABLED')
             self.cursor_indicator.show()
-            self.update_frame()
+            # Capture thread wakes update_frame whenever the camera delivers a frame
+            self.frame_pacer = FramePacer(self.root, self.cap,
+                                          error_fn=lambda e: self.event_log.error('frame_capture', e))
+            self.last_frame_seq = None
+            self.clock_origin = time.time()
+            # Cooldowns and holds start fresh, whichever clock this session runs on
+            self.last_click_time = 0
+            self.last_toggle_time = 0
+            self.both_fists_hold_start_time = None
+            self.scroll_engine.start()
+            if self.session_log_dir:
+                self.session_log = SessionLogWriter(self.session_log_dir)
+            self.frame_pacer.start()
+            self.event_log.emit('camera', running=True, detector=self.detector_backend, model=self.model_variant)
         else:
             self.is_running = False
+            self.pointer_calibration = None  # An unfinished calibration is abandoned
+            self.log_stats()
+            # Session summary - the same lines the Settings tab shows
+            summary = {
+                'state_cpu': self.state_cpu_meter.describe(),
+                'still_hands': self.hand_tracker.coherence.describe(),
+            }
             self.control_state = 'SOFT_DISABLED'
-            if self.cap:
+            self.scroll_engine.stop()
+            if self.frame_pacer:
+                summary['pacing'] = self.frame_pacer.describe()
+                # Returns at once - the capture thread releases the camera when its read returns
+                self.frame_pacer.stop()
+                self.capture_released = self.frame_pacer.released
+                self.frame_pacer = None
+            elif self.cap:
                 self.cap.release()
+            self.cap = None
+            if self.session_log:
+                self.session_log.close()
+                summary['session_log'] = self.session_log.describe()
+                self.session_log = None
+            self.event_log.emit('camera', running=False, **summary)
             self.camera_btn.config(text="Start Camera")
             self.control_btn.config(text="Enable Mouse Control", state=tk.DISABLED)
-            self.status_label.config(text="Status: Camera Off", foreground="red")
-            self.video_label.config(image='')
+            self.detector_outage = None  # Shown again on the next start if it persists
+            self.set_status("Status: Camera Off", "red")
+            self.preview.clear()
             # Hide indicator when camera stops
             self.cursor_indicator.hide()
             
+    def retry_camera_start(self):
+        """Start the camera once the previous capture is released (or give up waiting after 2 s)"""
+        if self.is_running or self.camera_start_deadline is None:
+            return
+        if not self.capture_released.is_set() and time.perf_counter() < self.camera_start_deadline:
+            self.root.after(50, self.retry_camera_start)
+            return
+        self.capture_released = None
+        self.toggle_camera()
+
+    def on_capture_failed(self):
+        """The frame source stopped delivering (camera unplugged, clip ended): stop the session"""
+        self.toggle_camera()
+        self.set_status("Status: Camera Error (no frames)", "red")
+
     def set_control_state(self, new_state):
         """Set control state: 'ON', 'SOFT_DISABLED', 'HARD_DISABLED'"""
+        previous_state = self.control_state
         self.control_state = new_state
+        if new_state != 'ON':
+            self.scroll_engine.halt()
+        self.metrics.state_transitions.inc(new_state)
+        if previous_state != new_state:
+            self.event_log.emit('state', previous=previous_state, state=new_state)
+        if self.event_publisher and previous_state != new_state:
+            self.event_publisher.publish_state(previous_state, new_state)
         if new_state == 'ON':
             self.control_btn.config(text="Disable Mouse Control")
-            self.status_label.config(text="Status: Mouse Control Active", foreground="blue")
+            self.set_status("Status: Mouse Control Active", "blue")
             # Reset finger tracking when enabling control
-            self.last_finger_x = None
-            self.last_finger_y = None
-            self.smoothed_dx = 0.0
-            self.smoothed_dy = 0.0
+            for track in self.hand_tracker.tracks:
+                track.reset_pointer()
             # Update indicator to ON state
             self.cursor_indicator.set_state('ON')
         elif new_state == 'SOFT_DISABLED':
             self.control_btn.config(text="Enable Mouse Control")
-            self.status_label.config(text="Status: Soft Disabled", foreground="orange")
+            self.set_status("Status: Soft Disabled", "orange")
             # Update indicator to SOFT state
             self.cursor_indicator.set_state('SOFT_DISABLED')
         else:  # HARD_DISABLED
             self.control_btn.config(text="Enable Mouse Control")
-            self.status_label.config(text="Status: Hard Disabled (use both fists)", foreground="red")
+            self.set_status("Status: Hard Disabled (use both fists)", "red")
             # Update indicator to HARD state
             self.cursor_indicator.set_state('HARD_DISABLED')
 
+    def set_status(self, text, color):
+        """Show a status bar message (held back while a detector outage is shown)"""
+        self.status = (text, color)
+        if not self.detector_outage:
+            self.status_label.config(text=text, foreground=color)
+
+    def show_detector_outage(self, outage):
+        """Show why the detector gives no hands (e.g. inference server down), or restore the status"""
+        self.detector_outage = outage
+        self.event_log.emit('detector', backend=self.detector_backend, available=outage is None, message=outage)
+        if outage:
+            self.status_label.config(text=f"Status: {outage}", foreground="red")
+        else:
+            self.status_label.config(text=self.status[0], foreground=self.status[1])
+
     def toggle_control(self):
         """Legacy toggle - toggles between ON and SOFT_DISABLED"""
         if self.control_state == 'ON':
@@ -535,318 +1267,78 @@ class HandGestureMouseControl:
         else:
             self.set_control_state('ON')
     
-    def calculate_distance(self, point1, point2):
-        """Calculate 3D distance between two points"""
-        dx = point1.x - point2.x
-        dy = point1.y - point2.y
-        dz = point1.z - point2.z if hasattr(point1, 'z') and hasattr(point2, 'z') else 0
-        return np.sqrt(dx*dx + dy*dy + dz*dz)
-    
-    def is_pinch(self, landmarks):
-        """Check if thumb and index finger are pinched together"""
-        thumb_tip = landmarks[4]
-        index_tip = landmarks[8]
-        distance = self.calculate_distance(thumb_tip, index_tip)
-        return distance < self.click_threshold
-    
-    def is_fist(self, landmarks):
-        """Check if all fingers are closed (fist gesture)
-        Uses two methods to handle different hand orientations:
-        1. Y-coordinate: tip at or below PIP (works for side view)
-        2. Distance: tip close to MCP (works for forward-facing fist)
-        """
-        # Check fingers (Index, Middle, Ring, Pinky)
-        finger_tips = [8, 12, 16, 20]
-        finger_pips = [6, 10, 14, 18]
-        finger_mcps = [5, 9, 13, 17]
-
-        for tip_idx, pip_idx, mcp_idx in zip(finger_tips, finger_pips, finger_mcps):
-            tip = landmarks[tip_idx]
-            pip = landmarks[pip_idx]
-            mcp = landmarks[mcp_idx]
-
-            # Method 1: Y-coordinate check (tip at or below PIP)
-            y_closed = tip.y >= pip.y
-
-            # Method 2: Distance check (tip close to MCP = curled finger)
-            # Use strict threshold to avoid detecting claw gesture as fist
-            dx = tip.x - mcp.x
-            dy = tip.y - mcp.y
-            dz = (tip.z - mcp.z) if hasattr(tip, 'z') else 0
-            distance = (dx*dx + dy*dy + dz*dz) ** 0.5
-            distance_closed = distance < 0.09  # Stricter: was 0.13
-
-            # Finger is closed if EITHER method indicates closed
-            if not (y_closed or distance_closed):
-                return False
-
-        # Check thumb separately
-        thumb_tip = landmarks[4]
-        thumb_ip = landmarks[3]
-        thumb_mcp = landmarks[2]
-        wrist = landmarks[0]
-        index_mcp = landmarks[5]
-
-        # First check: if thumb is clearly extended outward, this is NOT a fist
-        # Calculate thumb extension distance
-        dx = thumb_tip.x - thumb_mcp.x
-        dy = thumb_tip.y - thumb_mcp.y
-        dz = (thumb_tip.z - thumb_mcp.z) if hasattr(thumb_tip, 'z') else 0
-        thumb_distance = (dx*dx + dy*dy + dz*dz) ** 0.5
-
-        # Check if thumb tip is farther from palm center than thumb IP (extended outward)
-        palm_x = (wrist.x + index_mcp.x) / 2
-        palm_y = (wrist.y + index_mcp.y) / 2
-        thumb_tip_to_palm = ((thumb_tip.x - palm_x)**2 + (thumb_tip.y - palm_y)**2) ** 0.5
-        thumb_ip_to_palm = ((thumb_ip.x - palm_x)**2 + (thumb_ip.y - palm_y)**2) ** 0.5
-
-        # If thumb is extended (long and tip farther from palm), NOT a fist
-        if thumb_distance >= 0.08 and thumb_tip_to_palm > thumb_ip_to_palm * 1.05:
-            return False
-
-        # Method 1: Y-check for thumb
-        thumb_y_closed = thumb_tip.y >= thumb_ip.y
-
-        # Method 2: Distance check for thumb
-        # Use strict threshold to avoid detecting claw gesture as fist
-        thumb_distance_closed = thumb_distance < 0.11  # Stricter: was 0.15
-
-        if not (thumb_y_closed or thumb_distance_closed):
-            return False
-
-        return True
-    
-    def is_open_palm(self, landmarks):
-        """Check if all fingers are extended (open palm)"""
-        finger_tips = [8, 12, 16, 20]  # Index, Middle, Ring, Pinky
-        finger_pips = [6, 10, 14, 18]
-
-        for tip, pip in zip(finger_tips, finger_pips):
-            if landmarks[tip].y >= landmarks[pip].y:  # Finger not extended
-                return False
-
-        return True
-
-    def is_palm_facing_camera(self, landmarks, is_right_hand=True):
-        """Detect if palm is facing toward the camera (front) or away (back).
-
-        Uses the cross product of palm plane vectors to determine the normal direction.
-        For a right hand with palm facing camera, the normal points toward the camera (positive z).
-
-        Args:
-            landmarks: Hand landmarks from MediaPipe
-            is_right_hand: True if this is a right hand, False for left hand
-
-        Returns:
-            True if palm faces camera (front), False if back of hand faces camera (back)
-        """
-        wrist = landmarks[0]
-        index_mcp = landmarks[5]   # Base of index finger
-        pinky_mcp = landmarks[17]  # Base of pinky finger
-
-        # Calculate vectors from wrist to finger MCPs
-        # Vector A: wrist -> index MCP
-        ax = index_mcp.x - wrist.x
-        ay = index_mcp.y - wrist.y
-        az = index_mcp.z - wrist.z if hasattr(index_mcp, 'z') else 0
-
-        # Vector B: wrist -> pinky MCP
-        bx = pinky_mcp.x - wrist.x
-        by = pinky_mcp.y - wrist.y
-        bz = pinky_mcp.z - wrist.z if hasattr(pinky_mcp, 'z') else 0
-
-        # Cross product A × B gives palm normal
-        # We only need the z-component to determine facing direction
-        normal_z = ax * by - ay * bx
-
-        # For right hand: negative normal_z = palm facing camera
-        # For left hand: positive normal_z = palm facing camera
-        if is_right_hand:
-            return normal_z < 0
-        else:
-            return normal_z > 0
-
-    def _get_finger_curl(self, landmarks):
-        """Calculate how much the fingers are curled (0.0 = straight, 1.0 = fully bent).
-        Used for dynamic scroll speed - more curl = faster scroll."""
-        finger_tips = [8, 12, 16, 20]  # Index, Middle, Ring, Pinky
-        finger_pips = [6, 10, 14, 18]
-        finger_mcps = [5, 9, 13, 17]
-
-        total_curl = 0.0
-        for tip_idx, pip_idx, mcp_idx in zip(finger_tips, finger_pips, finger_mcps):
-            tip = landmarks[tip_idx]
-            pip = landmarks[pip_idx]
-            mcp = landmarks[mcp_idx]
-
-            # Measure how close tip is to MCP relative to fully extended
-            # When straight: tip is far from MCP (low curl)
-            # When bent: tip is close to MCP (high curl)
-            dx = tip.x - mcp.x
-            dy = tip.y - mcp.y
-            tip_to_mcp = (dx*dx + dy*dy) ** 0.5
-
-            # Normalize: ~0.2 is extended, ~0.08 is bent
-            # Map to 0-1 range (inverted: smaller distance = more curl)
-            curl = max(0.0, min(1.0, (0.18 - tip_to_mcp) / 0.10))
-            total_curl += curl
-
-        # Average curl across 4 fingers
-        return total_curl / 4.0
-
-    
-    def is_victory(self, landmarks):
-        """Check if index and middle fingers are extended (victory/peace sign)"""
-        # Index and middle should be extended
-        if landmarks[8].y >= landmarks[6].y or landmarks[12].y >= landmarks[10].y:
-            return False
-        
-        # Ring and pinky should be closed
-        if landmarks[16].y < landmarks[14].y or landmarks[20].y < landmarks[18].y:
-            return False
-        
-        return True
-    
-    def is_ok_sign(self, landmarks):
-        """Check if thumb and index form a circle (OK sign)"""
-        thumb_tip = landmarks[4]
-        index_tip = landmarks[8]
-        thumb_ip = landmarks[3]
-        index_pip = landmarks[6]
-        
-        # Check if thumb and index are close together (forming circle)
-        distance = self.calculate_distance(thumb_tip, index_tip)
-        if distance > 0.04:  # Too far apart
-            return False
-        
-        # Other fingers should be extended
-        if landmarks[12].y >= landmarks[10].y or landmarks[16].y >= landmarks[14].y or landmarks[20].y >= landmarks[18].y:
-            return False
-        
-        return True
-    
-    def is_rock(self, landmarks):
-        """Check if index and pinky are extended (rock/devil horns gesture)"""
-        # Index and pinky should be extended
-        if landmarks[8].y >= landmarks[6].y or landmarks[20].y >= landmarks[18].y:
-            return False
-        
-        # Middle and ring should be closed
-        if landmarks[12].y < landmarks[10].y or landmarks[16].y < landmarks[14].y:
-            return False
-        
-        return True
-    
-    def get_gesture_name(self, landmarks):
-        """Get the name of the detected gesture"""
-        if self.is_thumb_up(landmarks):
-            return "THUMB OUT"
-        elif self.is_fist(landmarks):
+    def get_budgeted_gesture_name(self, landmarks, track):
+        """Get the gesture name using only the predicates the current state's policy runs"""
+        gestures = get_state_policy(self.control_state)['gestures']
+        if gestures == 'all':
+            return track.gesture(landmarks, self.get_gesture_name)
+        if self.is_fist(landmarks):
             return "FIST"
-        elif self.is_pointing(landmarks):
-            return "POINTING"
-        elif self.is_pinch(landmarks):
-            return "PINCH"
-        elif self.is_open_palm(landmarks):
-            return "OPEN PALM"
-        elif self.is_victory(landmarks):
-            return "VICTORY"
-        elif self.is_ok_sign(landmarks):
-            return "OK SIGN"
-        elif self.is_rock(landmarks):
-            return "ROCK"
-        else:
-            return "UNKNOWN"
-        
-    def is_thumb_up(self, landmarks):
-        """Check if thumb is extended (any direction) while other fingers are closed"""
-        thumb_tip = landmarks[4]
-        thumb_ip = landmarks[3]
-        thumb_mcp = landmarks[2]
-        wrist = landmarks[0]
-        index_mcp = landmarks[5]  # Base of index finger
-
-        # Calculate thumb extension (distance from thumb tip to thumb MCP)
-        dx = thumb_tip.x - thumb_mcp.x
-        dy = thumb_tip.y - thumb_mcp.y
-        thumb_length = (dx*dx + dy*dy) ** 0.5
-
-        # Thumb must be extended (tip far from MCP)
-        if thumb_length < 0.08:  # Thumb not extended enough
-            return False
-
-        # Calculate palm center (average of wrist and index MCP)
-        palm_x = (wrist.x + index_mcp.x) / 2
-        palm_y = (wrist.y + index_mcp.y) / 2
-
-        # Thumb tip should be farther from palm center than thumb IP
-        # (indicates thumb is extended outward)
-        thumb_tip_to_palm = ((thumb_tip.x - palm_x)**2 + (thumb_tip.y - palm_y)**2) ** 0.5
-        thumb_ip_to_palm = ((thumb_ip.x - palm_x)**2 + (thumb_ip.y - palm_y)**2) ** 0.5
-        if thumb_tip_to_palm < thumb_ip_to_palm * 1.1:  # Thumb not extended outward
-            return False
-
-        # Index finger must be closed (not extended) for thumb out
-        # Otherwise pointing with thumb extended would be detected as thumb out
-        if landmarks[8].y < landmarks[6].y:  # Index tip above PIP = extended
-            return False
-
-        # Other fingers should be closed (at least 2 of 4)
-        finger_tips = [8, 12, 16, 20]  # Index, Middle, Ring, Pinky
-        finger_pips = [6, 10, 14, 18]
-        closed_count = 0
-        for tip, pip in zip(finger_tips, finger_pips):
-            if landmarks[tip].y >= landmarks[pip].y:  # Tip at or below PIP (closed)
-                closed_count += 1
-
-        if closed_count < 2:
-            return False
-
-        return True
-    
-    def is_pointing(self, landmarks):
-        """Check if only index finger is extended (pointing gesture)"""
-        # Index finger should be extended
-        if landmarks[8].y > landmarks[6].y:  # Index tip below PIP (closed)
-            return False
-        
-        # Other fingers should be closed
-        finger_tips = [12, 16, 20]  # Middle, Ring, Pinky
-        finger_pips = [10, 14, 18]
-        
-        for tip, pip in zip(finger_tips, finger_pips):
-            if landmarks[tip].y < landmarks[pip].y:  # Tip is above PIP (extended)
-                return False
-        
-        # Thumb can be in any position for pointing
-        return True
-    
-    def process_hand_gestures(self, landmarks, handedness, frame_width, frame_height):
+        if gestures == 'enable':
+            if self.is_pointing(landmarks):
+                return "POINTING"
+            elif self.is_open_palm(landmarks):
+                return "OPEN PALM"
+        return "IDLE"
+
+    def get_scroll_velocity(self, curl):
+        """Scroll units per second for a finger curl (0.0 straight - 1.0 bent)"""
+        # Speed multiplier: 1.0 (straight) to 3.0 (more bent)
+        speed_multiplier = 1.0 + curl * 2.0
+        # Same average speed as the former bursts of scroll_speed units every 0.1s
+        return self.scroll_speed * speed_multiplier * 10.0
+
+    def emit_scroll(self, units):
+        """Scroll engine output (runs on the scroll engine thread)"""
+        # No PyAutoGUI pause after each event - the engine paces itself
+        pyautogui.scroll(units, _pause=False)
+
+    def record_action(self, action, track):
+        """Count a gesture action; discrete actions also go to the event log (moves only to metrics)"""
+        self.metrics.gesture_actions.inc(action)
+        if action != 'move':
+            self.event_log.emit('action', action=action, hand=track.side, track=track.track_id)
+
+    def log_stats(self):
+        """Periodic 'stats' event with the numbers otherwise only shown in the GUI"""
+        stats = self.frame_pacer.stats() if self.frame_pacer else {}
+        stats.update(
+            control_state=self.control_state,
+            quality_level=self.quality_controller.level,
+            latency_p95_ms=round(self.quality_controller.last_p95, 2),
+            frames=self.metrics.frames_processed.values[()],
+            errors=sum(self.metrics.errors.values.values()),
+            still_hand_reuse=round(self.hand_tracker.coherence.hit_rate(), 3),
+            events_dropped=self.event_log.dropped,
+        )
+        self.event_log.emit('stats', **stats)
+
+    def process_hand_gestures(self, track, landmarks, frame_width, frame_height):
         """Process hand landmarks and control mouse based on hand type"""
-        # Determine if this is left or right hand
-        # MediaPipe returns handedness as a list with category_name
-        is_left_hand = False
-        is_right_hand = False
-
-        if handedness and len(handedness) > 0:
-            # Handedness is a list of ClassificationResult objects
-            category_name = handedness[0].category_name if hasattr(handedness[0], 'category_name') else str(handedness[0])
-            if 'Left' in category_name or 'left' in str(category_name).lower():
-                is_left_hand = True
-            elif 'Right' in category_name or 'right' in str(category_name).lower():
-                is_right_hand = True
-
-        # If we can't determine, use hand position as fallback
-        # Left hand typically has wrist on the left side of the frame
-        if not is_left_hand and not is_right_hand:
-            wrist_x = landmarks[0].x if len(landmarks) > 0 else 0.5
-            is_left_hand = wrist_x < 0.5  # Left side of frame
-            is_right_hand = not is_left_hand
+        # Handedness is the track's vote, stable through single-frame flicker
+        is_right_hand = track.is_right
+        is_left_hand = not is_right_hand
+
+        # State-aware budget: outside ON only run the predicates that can change the state
+        gestures = get_state_policy(self.control_state)['gestures']
+        if gestures != 'all':
+            # Hold timers only run while ON
+            track.reset_holds()
+            if gestures == 'unlock' or not is_right_hand:
+                return  # Only the both-fists unlock in update_frame applies
+            # SOFT_DISABLED: right hand pointing / open palm re-enables control
+            # (a fist - with or without thumb out - never does, same as the full cascade)
+            if (self.is_pointing(landmarks) or self.is_open_palm(landmarks)) and not self.is_fist(landmarks):
+                current_time = self.frame_time
+                if current_time - self.last_toggle_time > self.toggle_cooldown:
+                    self.set_control_state('ON')
+                    self.last_toggle_time = current_time
+            return
 
         try:
             # RIGHT HAND GESTURES - some work even when control is inactive
             if is_right_hand:
-                current_time = time.time()
+                current_time = self.frame_time
 
                 # Right hand fist - Soft disable mouse control (requires holding for 2 seconds)
                 # Exclude thumb-out gesture (fist detection is too lenient on thumb)
@@ -854,18 +1346,18 @@ class HandGestureMouseControl:
                 if self.is_fist(landmarks) and not self.is_thumb_up(landmarks):
                     if self.control_state == 'ON':
                         # Start tracking fist hold time if not already
-                        if self.fist_hold_start_time is None:
-                            self.fist_hold_start_time = current_time
+                        if track.fist_hold_start_time is None:
+                            track.fist_hold_start_time = current_time
                         # Check if held long enough
-                        elif current_time - self.fist_hold_start_time >= self.fist_hold_duration:
+                        elif current_time - track.fist_hold_start_time >= self.fist_hold_duration:
                             if current_time - self.last_toggle_time > self.toggle_cooldown:
                                 self.set_control_state('SOFT_DISABLED')
                                 self.last_toggle_time = current_time
-                                self.fist_hold_start_time = None  # Reset after disabling
+                                track.fist_hold_start_time = None  # Reset after disabling
                     return  # Don't process other gestures when fist
 
                 # Reset fist hold timer when not making a fist
-                self.fist_hold_start_time = None
+                track.fist_hold_start_time = None
 
                 # Order matches get_gesture_name() to ensure consistent behavior
 
@@ -874,6 +1366,7 @@ class HandGestureMouseControl:
                     if self.control_state == 'ON':
                         if current_time - self.last_click_time > self.click_cooldown:
                             pyautogui.click()
+                            self.record_action('click', track)
                             self.last_click_time = current_time
 
                 # Right hand pointing - Enable control if soft-disabled, then move mouse
@@ -891,41 +1384,32 @@ class HandGestureMouseControl:
                     # Flip x coordinate to match mirrored display
                     finger_x = 1.0 - index_tip.x
                     finger_y = index_tip.y
-                    
-                    # Initialize previous position if first time
-                    if self.last_finger_x is None or self.last_finger_y is None:
-                        self.last_finger_x = finger_x
-                        self.last_finger_y = finger_y
-                        return  # Skip first frame
-                    
-                    # Calculate movement delta in normalized coordinates
-                    dx = finger_x - self.last_finger_x
-                    dy = finger_y - self.last_finger_y
-                    
-                    # Apply smoothing to movement delta
-                    self.smoothed_dx = self.smoothed_dx * self.smoothing_factor + dx * (1 - self.smoothing_factor)
-                    self.smoothed_dy = self.smoothed_dy * self.smoothing_factor + dy * (1 - self.smoothing_factor)
-                    
-                    # Check if movement is significant enough
-                    movement_magnitude = abs(self.smoothed_dx) + abs(self.smoothed_dy)
-                    
-                    if movement_magnitude > self.movement_threshold:
-                        # Scale the movement delta to screen pixels
-                        # Apply sensitivity multiplier
-                        mouse_dx = int(self.smoothed_dx * self.screen_width * self.sensitivity)
-                        mouse_dy = int(self.smoothed_dy * self.screen_height * self.sensitivity)
-                        
-                        # Move mouse relative to current position
-                        if mouse_dx != 0 or mouse_dy != 0:
-                            pyautogui.moveRel(mouse_dx, mouse_dy, duration=0.01)
+
+                    if self.pointer_calibration is not None:
+                        # Calibrating - the finger sets the corners instead of moving the cursor
+                        if self.pointer_calibration.feed(finger_x, finger_y, current_time):
+                            self.finish_pointer_calibration()
+                        elif self.pointer_calibration.prompt() != self.pointer_calibration_prompt:
+                            self.pointer_calibration_prompt = self.pointer_calibration.prompt()
+                            self.set_status(self.pointer_calibration_prompt, "blue")
+                        return
+
+                    if self.pointer_mode == 'absolute':
+                        # One homography product and a single absolute move
+                        target = absolute_move(track, finger_x, finger_y, self.pointer_mapping,
+                                               self.smoothing_factor, self.movement_threshold)
+                        if target is not None:
+                            pyautogui.moveTo(target[0], target[1], _pause=False)
+                            self.record_action('move', track)
                     else:
-                        # Movement too small - reset smoothed deltas to prevent drift
-                        self.smoothed_dx = 0.0
-                        self.smoothed_dy = 0.0
-                    
-                    # Update previous finger position
-                    self.last_finger_x = finger_x
-                    self.last_finger_y = finger_y
+                        # Smoothed delta scaled to screen pixels with the sensitivity multiplier
+                        move = relative_move(track, finger_x, finger_y, self.smoothing_factor,
+                                             self.movement_threshold, self.screen_width * self.sensitivity,
+                                             self.screen_height * self.sensitivity)
+                        if move is not None:
+                            # Move mouse relative to current position
+                            pyautogui.moveRel(move[0], move[1], duration=0.01)
+                            self.record_action('move', track)
 
                 # Right hand open palm - Enable control if soft-disabled, then scroll
                 # Front-facing: scroll down, Back-facing: scroll up
@@ -938,39 +1422,34 @@ class HandGestureMouseControl:
                         return  # Skip scrolling on the enabling frame
                     elif self.control_state != 'ON':
                         return  # Hard-disabled, can't enable with palm
-                    # Scroll when control is active
-                    if current_time - self.last_scroll_time > self.scroll_cooldown:
-                        # Calculate finger curl amount (how bent the fingers are)
-                        curl = self._get_finger_curl(landmarks)
-                        # Speed multiplier: 1.0 (straight) to 3.0 (more bent)
-                        speed_multiplier = 1.0 + curl * 2.0
-                        scroll_amount = int(self.scroll_speed * speed_multiplier)
-                        # Determine scroll direction based on palm orientation
-                        if self.is_palm_facing_camera(landmarks, is_right_hand=True):
-                            pyautogui.scroll(-scroll_amount)  # Front-facing: scroll down
-                        else:
-                            pyautogui.scroll(scroll_amount)   # Back-facing: scroll up
-                        self.last_scroll_time = current_time
+                    # Scroll when control is active - the scroll engine emits the events
+                    # Calculate finger curl amount (how bent the fingers are)
+                    velocity = self.get_scroll_velocity(self._get_finger_curl(landmarks))
+                    # Determine scroll direction based on palm orientation
+                    if self.is_palm_facing_camera(landmarks, is_right_hand=True):
+                        velocity = -velocity  # Front-facing: scroll down
+                    self.scroll_engine.set_target(velocity)  # Back-facing: scroll up
 
                 # Right hand victory (two fingers) - Open Task View (requires control active, 1s hold)
                 elif self.is_victory(landmarks):
                     if self.control_state == 'ON':
                         # Start tracking victory hold time if not already
-                        if self.victory_hold_start_time is None:
-                            self.victory_hold_start_time = current_time
+                        if track.victory_hold_start_time is None:
+                            track.victory_hold_start_time = current_time
                         # Check if held long enough
-                        elif current_time - self.victory_hold_start_time >= self.victory_hold_duration:
+                        elif current_time - track.victory_hold_start_time >= self.victory_hold_duration:
                             if current_time - self.last_click_time > self.click_cooldown:
                                 pyautogui.hotkey('win', 'tab')  # Open Task View
+                                self.record_action('task_view', track)
                                 self.last_click_time = current_time
-                                self.victory_hold_start_time = None  # Reset after triggering
+                                track.victory_hold_start_time = None  # Reset after triggering
                 else:
                     # Reset victory hold timer when not making victory gesture
-                    self.victory_hold_start_time = None
+                    track.victory_hold_start_time = None
 
             # LEFT HAND GESTURES (require control to be active)
             elif is_left_hand and self.control_state == 'ON':
-                current_time = time.time()
+                current_time = self.frame_time
 
                 # Left hand thumb up - Nothing
                 if self.is_thumb_up(landmarks):
@@ -980,60 +1459,134 @@ class HandGestureMouseControl:
                 elif self.is_pointing(landmarks):
                     if current_time - self.last_click_time > self.click_cooldown:
                         pyautogui.click()  # Left click
+                        self.record_action('click', track)
                         self.last_click_time = current_time
 
                 # Left hand victory - Open Task View
                 elif self.is_victory(landmarks):
                     if current_time - self.last_click_time > self.click_cooldown:
                         pyautogui.hotkey('win', 'tab')  # Open Task View
+                        self.record_action('task_view', track)
                         self.last_click_time = current_time
 
                 # Left hand open palm - Scroll up (speed increases as fingers bend)
                 elif self.is_open_palm(landmarks):
-                    if current_time - self.last_scroll_time > self.scroll_cooldown:
-                        curl = self._get_finger_curl(landmarks)
-                        speed_multiplier = 1.0 + curl * 2.0
-                        scroll_amount = int(self.scroll_speed * speed_multiplier)
-                        pyautogui.scroll(scroll_amount)  # Scroll up
-                        self.last_scroll_time = current_time
+                    # Scroll up
+                    self.scroll_engine.set_target(self.get_scroll_velocity(self._get_finger_curl(landmarks)))
 
                 # Left hand pinch - Nothing
                 elif self.is_pinch(landmarks):
                     pass  # No action
         except Exception as e:
-            print(f"Error in process_hand_gestures: {e}")
+            self.metrics.errors.inc('process_hand_gestures')
+            self.event_log.error('process_hand_gestures', e)
     
-    def update_frame(self):
-        if not self.is_running:
+    def on_frame_ready(self, event=None):
+        """Handle a new camera frame from the capture thread"""
+        if not self.is_running or not self.frame_pacer:
             return
-        
+        item = self.frame_pacer.take_frame()
+        if item is None:
+            if self.frame_pacer.failed:
+                self.on_capture_failed()
+            return
+        frame, captured_at, seq, timestamp = item
+
+        # Frames the camera delivered that were overwritten before we got to them
+        if self.last_frame_seq is not None and seq > self.last_frame_seq + 1:
+            self.metrics.frames_skipped.inc('dropped', amount=seq - self.last_frame_seq - 1)
+        self.last_frame_seq = seq
+
+        # Disabled states process at a reduced rate (see execution_policy)
+        now = time.perf_counter()
+        min_interval = get_state_policy(self.control_state)['frame_interval_ms'] / 1000.0
+        # Lossless sources deliver every frame on purpose - only live ones are rate limited
+        if not self.frame_pacer.lossless and now - self.last_processed_time < min_interval:
+            self.frame_pacer.mark_skipped()
+            self.metrics.frames_skipped.inc('rate_limited')
+            return
+        self.last_processed_time = now
+
+        if self.frame_pacer.lossless and timestamp is not None:
+            frame_time = self.clock_origin + timestamp
+        else:
+            frame_time = time.time()
+        self.update_frame(frame, captured_at, frame_time)
+
+    def update_frame(self, frame, captured_at, frame_time=None):
+        """Process one camera frame.
+
+        captured_at is its time.perf_counter() capture timestamp (latency measurement), frame_time
+        the pipeline clock (time.time() scale) that hold timers and cooldowns run on.
+        """
+        self.frame_time = time.time() if frame_time is None else frame_time
         try:
-            ret, frame = self.cap.read()
-            if not ret:
-                return
-            
-            # Process original frame with MediaPipe (don't flip for detection)
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            
-            # Convert to MediaPipe Image
-            mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=frame_rgb)
-            
-            # Process with MediaPipe (on original, unflipped frame)
-            detection_result = self.hand_landmarker.detect(mp_image)
+            self.state_cpu_meter.tick(self.control_state)
+
+            quality = self.quality_controller.settings
+            policy = get_state_policy(self.control_state)
+            # Disabled states run at reduced resolution on top of the adaptive quality level
+            input_scale = min(quality['input_scale'], policy['input_scale'])
+            self.frame_index += 1
+            render_preview = self.frame_index % quality['preview_every'] == 0
+
+            # Between detections: the previous landmarks, moved with optical flow in keyframe mode
+            detection_result = None
+            detect_every = max(quality['detect_every'], self.keyframe_interval)
+            if self.last_detection_result is not None and self.frame_index % detect_every != 0:
+                if self.keyframe_interval > 1:
+                    # None when tracking quality dropped - detect on this frame instead
+                    detection_result = self.landmark_flow.propagate(frame)
+                else:
+                    # Skipped detection - reuse the previous landmarks
+                    detection_result = self.last_detection_result
+
+            if detection_result is None:
+                # Downscale for detection only - landmarks are normalized so nothing else changes
+                detect_frame = frame
+                if input_scale < 1.0:
+                    detect_frame = cv2.resize(frame, None, fx=input_scale, fy=input_scale,
+                                              interpolation=cv2.INTER_AREA)
+
+                # Process original frame (don't flip for detection)
+                frame_rgb = cv2.cvtColor(detect_frame, cv2.COLOR_BGR2RGB)
+
+                # Run the detection backend (on original, unflipped frame)
+                detect_start = time.perf_counter()
+                detection_result = self.detector.detect(frame_rgb)
+                self.metrics.inference_latency.observe(time.perf_counter() - detect_start)
+                if self.detector.outage != self.detector_outage:
+                    self.show_detector_outage(self.detector.outage)
+                self.last_detection_result = detection_result
+                if self.keyframe_interval > 1:
+                    self.landmark_flow.keyframe(frame, detection_result)
             
+            # Learned classifier: every hand in one matrix multiply up front,
+            # the gesture predicates then answer from these results.
+            # Otherwise use gestures the backend recognized itself (GestureRecognizer).
+            self.learned_gestures = None
+            if self.gesture_model is not None and detection_result.hand_landmarks:
+                self.learned_gestures = self.gesture_model.classify_result(detection_result)
+            elif any(detection_result.gestures):
+                self.learned_gestures = {
+                    id(hand_landmarks): gesture
+                    for hand_landmarks, gesture in zip(detection_result.hand_landmarks, detection_result.gestures)
+                    if gesture
+                }
+
             # Flip frame horizontally for mirror effect (only for display)
             frame = cv2.flip(frame, 1)
             
             # Check for dual-fist toggle gesture (both hands showing fists AND far apart)
             both_fists_detected = False
             if detection_result.hand_landmarks and len(detection_result.hand_landmarks) == 2:
-                current_time = time.time()
+                current_time = self.frame_time
                 both_fists = all(self.is_fist(hand_landmarks) for hand_landmarks in detection_result.hand_landmarks)
 
                 # Check if hands are far apart (wrists on opposite sides of frame)
                 wrist1_x = detection_result.hand_landmarks[0][0].x
                 wrist2_x = detection_result.hand_landmarks[1][0].x
-                hands_far_apart = abs(wrist1_x - wrist2_x) > 0.4  # At least 40% of frame width apart
+                hands_far_apart = abs(wrist1_x - wrist2_x) > self.both_fists_separation
 
                 if both_fists and hands_far_apart:
                     both_fists_detected = True
@@ -1056,81 +1609,69 @@ class HandGestureMouseControl:
                     self.both_fists_hold_start_time = None
 
             # Display toggle indicator if both fists detected
-            if both_fists_detected:
+            if both_fists_detected and render_preview:
                 if self.control_state == 'ON':
                     toggle_text = "LOCK"
                 elif self.both_fists_hold_start_time is not None:
-                    held_time = time.time() - self.both_fists_hold_start_time
+                    held_time = self.frame_time - self.both_fists_hold_start_time
                     remaining = max(0, self.both_fists_hold_duration - held_time)
                     toggle_text = f"UNLOCK: Hold {remaining:.1f}s"
                 else:
                     toggle_text = f"UNLOCK: Hold {self.both_fists_hold_duration:.0f}s"
-                cv2.putText(frame, toggle_text, (frame.shape[1] // 2 - 100, 30),
-                          cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2)
+                self.overlay.draw_label(frame, toggle_text, (frame.shape[1] // 2 - 100, 30),
+                                        (0, 255, 255), scale=0.8)
+
+            # Hands for the event stream and session log - only classified when someone is listening
+            streaming = self.event_publisher is not None and self.event_publisher.has_subscribers()
+            recording = self.session_log is not None
+            stream_hands = []
+
+            # Match hands to their tracks from previous frames (also ages tracks of hands that left)
+            tracks = self.hand_tracker.update(detection_result.hand_landmarks, detection_result.handedness)
+            # Hands holding still reuse their predicate results (learned gestures are per frame already)
+            self.feature_memos = None
+            if not self.learned_gestures:
+                self.feature_memos = self.hand_tracker.feature_memos(detection_result.hand_landmarks, tracks)
 
             # Draw hand landmarks and process gestures
             if detection_result.hand_landmarks:
                 for idx, hand_landmarks in enumerate(detection_result.hand_landmarks):
-                    # Get handedness for this hand
-                    handedness = []
-                    if detection_result.handedness and idx < len(detection_result.handedness):
-                        handedness = detection_result.handedness[idx]
-                    
-                    # Determine hand type for display
-                    is_left_hand = False
-                    is_right_hand = False
-                    hand_label = "Unknown"
-                    
-                    if handedness and len(handedness) > 0:
-                        category_name = handedness[0].category_name if hasattr(handedness[0], 'category_name') else str(handedness[0])
-                        if 'Left' in category_name or 'left' in str(category_name).lower():
-                            is_left_hand = True
-                            hand_label = "Left"
-                        elif 'Right' in category_name or 'right' in str(category_name).lower():
-                            is_right_hand = True
-                            hand_label = "Right"
-                    
-                    # Fallback to position-based detection
-                    if not is_left_hand and not is_right_hand:
-                        wrist_x = hand_landmarks[0].x if len(hand_landmarks) > 0 else 0.5
-                        is_left_hand = wrist_x < 0.5
-                        is_right_hand = not is_left_hand
-                        hand_label = "Left" if is_left_hand else "Right"
+                    track = tracks[idx]
+
+                    # Hand type for display - the track's handedness, not this frame's raw guess
+                    is_right_hand = track.is_right
+                    is_left_hand = not is_right_hand
+                    hand_label = track.side
                     
                     # Choose color based on hand type
                     hand_color = (255, 0, 0) if is_left_hand else (0, 255, 0)  # Blue for left, Green for right
                     
-                    # Draw landmarks using OpenCV
-                    # Flip x coordinates since frame is flipped for display
-                    frame_width = frame.shape[1]
-                    for landmark in hand_landmarks:
-                        x = int((1.0 - landmark.x) * frame_width)  # Flip x coordinate
-                        y = int(landmark.y * frame.shape[0])
-                        cv2.circle(frame, (x, y), 5, hand_color, -1)
-                    
-                    # Draw connections
-                    for connection in self.HAND_CONNECTIONS:
-                        start_idx = connection[0]
-                        end_idx = connection[1]
-                        if start_idx < len(hand_landmarks) and end_idx < len(hand_landmarks):
-                            start_point = hand_landmarks[start_idx]
-                            end_point = hand_landmarks[end_idx]
-                            start_x = int((1.0 - start_point.x) * frame_width)  # Flip x coordinate
-                            start_y = int(start_point.y * frame.shape[0])
-                            end_x = int((1.0 - end_point.x) * frame_width)  # Flip x coordinate
-                            end_y = int(end_point.y * frame.shape[0])
-                            cv2.line(frame, (start_x, start_y), (end_x, end_y), hand_color, 2)
-                    
                     # Process gestures (right hand can enable/disable control even when inactive)
-                    self.process_hand_gestures(hand_landmarks, handedness, frame.shape[1], frame.shape[0])
-                    
+                    self.process_hand_gestures(track, hand_landmarks, frame.shape[1], frame.shape[0])
+
+                    if streaming or recording:
+                        # Full classification regardless of state - consumers may act while control is off
+                        stream_hands.append((
+                            is_right_hand,
+                            track.gesture(hand_landmarks, self.get_gesture_name),
+                            self.is_palm_facing_camera(hand_landmarks, is_right_hand),
+                            hand_landmarks
+                        ))
+
+                    # Preview skipped on this frame - nothing to draw
+                    if not render_preview:
+                        continue
+
+                    # Draw landmarks and connections (x is flipped since frame is flipped for display)
+                    self.overlay.draw_hand(frame, hand_landmarks, hand_color)
+
                     # Draw gesture indicators
                     try:
                         gesture_text = ""
                         text_y = 30 + (idx * 30)  # Offset for multiple hands
                         
                         # Get gesture name
-                        gesture_name = self.get_gesture_name(hand_landmarks)
+                        gesture_name = self.get_budgeted_gesture_name(hand_landmarks, track)
 
                         # Add palm orientation for open palm gesture
                         if gesture_name == "OPEN PALM":
@@ -1144,8 +1685,8 @@ class HandGestureMouseControl:
                             if base_gesture == "FIST":
                                 if self.control_state == 'ON':
                                     # Show hold progress for soft-disable
-                                    if self.fist_hold_start_time is not None:
-                                        held_time = time.time() - self.fist_hold_start_time
+                                    if track.fist_hold_start_time is not None:
+                                        held_time = self.frame_time - track.fist_hold_start_time
                                         remaining = max(0, self.fist_hold_duration - held_time)
                                         action_text = f" - Hold {remaining:.1f}s to Soft Disable"
                                     else:
@@ -1164,8 +1705,8 @@ class HandGestureMouseControl:
                                     action_text = " - Left Click"
                             elif base_gesture == "VICTORY":
                                 if self.control_state == 'ON':
-                                    if self.victory_hold_start_time is not None:
-                                        held_time = time.time() - self.victory_hold_start_time
+                                    if track.victory_hold_start_time is not None:
+                                        held_time = self.frame_time - track.victory_hold_start_time
                                         remaining = max(0, self.victory_hold_duration - held_time)
                                         action_text = f" - Hold {remaining:.1f}s for Task View"
                                     else:
@@ -1189,36 +1730,165 @@ class HandGestureMouseControl:
                         gesture_text = f"{hand_label} Hand: {gesture_name}{action_text}"
                         
                         if gesture_text:
-                            cv2.putText(frame, gesture_text, (10, text_y), 
-                                      cv2.FONT_HERSHEY_SIMPLEX, 0.6, hand_color, 2)
+                            self.overlay.draw_label(frame, gesture_text, (10, text_y), hand_color)
                     except Exception as e:
-                        print(f"Error drawing gesture indicator: {e}")
+                        self.metrics.errors.inc('gesture_indicator')
+                        self.event_log.error('gesture_indicator', e)
             
-            # Convert to PhotoImage
-            frame_pil = Image.fromarray(frame)
-            frame_tk = ImageTk.PhotoImage(image=frame_pil)
-            
-            # Update label
-            self.video_label.config(image=frame_tk)
-            self.video_label.image = frame_tk  # Keep a reference
+            if streaming:
+                # Published every frame, also with no hands, so consumers see hands leave
+                self.event_publisher.publish_frame(self.control_state, stream_hands)
+            if recording:
+                self.session_log.append(self.control_state, stream_hands, self.frame_time)
+
+            if render_preview:
+                # Update the persistent PhotoImage in place
+                self.preview.show(frame)
+
+            # Feed the measured capture-to-display latency back into the quality controller
+            latency_ms = (time.perf_counter() - captured_at) * 1000.0
+            self.metrics.frames_processed.inc()
+            self.metrics.frame_latency.observe(latency_ms / 1000.0)
+            if detection_result.hand_landmarks:
+                self.metrics.hands_detected.inc(amount=len(detection_result.hand_landmarks))
+            # Lossless sources have no real-time budget - adapting to wall latency would make runs differ
+            if not self.frame_pacer.lossless and self.quality_controller.record(latency_ms):
+                self.apply_quality_settings()
+            if time.perf_counter() - self.last_stats_log_time >= self.stats_log_interval:
+                self.last_stats_log_time = time.perf_counter()
+                self.log_stats()
+            if self.frame_index % 15 == 0:
+                self.quality_label.config(text=self.quality_controller.describe())
+                self.state_cpu_label.config(text=self.state_cpu_meter.describe())
+                self.pacing_label.config(text=self.frame_pacer.describe())
         except Exception as e:
-            print(f"Error updating frame: {e}")
-            return
-        
-        # Schedule next update
-        self.root.after(10, self.update_frame)
+            self.metrics.errors.inc('update_frame')
+            self.event_log.error('update_frame', e)
     
     def __del__(self):
         if hasattr(self, 'cursor_indicator'):
             self.cursor_indicator.destroy()
-        if hasattr(self, 'cap') and self.cap:
+        if getattr(self, 'frame_pacer', None):
+            self.frame_pacer.stop()  # Releases the capture from its thread
+        elif getattr(self, 'cap', None):
             self.cap.release()
+        if getattr(self, 'metrics_server', None):
+            self.metrics_server.stop()
+        if getattr(self, 'event_publisher', None):
+            self.event_publisher.stop()
+        if getattr(self, 'session_log', None):
+            self.session_log.close()
+        if getattr(self, 'profiler', None):
+            self.profiler.stop()
+        if getattr(self, 'scroll_engine', None):
+            self.scroll_engine.stop()
+        if getattr(self, 'event_log', None):
+            self.event_log.stop()
         cv2.destroyAllWindows()
 
+def run_startup_trace(root, app, path, main_started):
+    """Record startup milestones (time.time()) to path as JSON, then exit - see startup_benchmark.py"""
+    # Runs from the main loop: the window has been built, wait until it is on screen
+    root.wait_visibility()
+    milestones = {'main': main_started, 'window': time.time()}
+    # First detection: model graph initialization plus one inference
+    app.detector.detect(np.zeros((480, 640, 3), dtype=np.uint8))
+    milestones['first_detection'] = time.time()
+    try:
+        with open(path, 'w') as f:
+            json.dump(milestones, f)
+    except OSError as e:
+        print(f"Error writing startup trace: {e}")
+    root.destroy()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Hand Gesture Mouse Control")
+    parser.add_argument(
+        '--metrics-port', type=int, default=None,
+        help="Serve Prometheus metrics on http://127.0.0.1:PORT/metrics (off by default)"
+    )
+    parser.add_argument(
+        '--event-port', type=int, default=None,
+        help="Publish gesture events to local subscribers on udp://127.0.0.1:PORT (off by default)"
+    )
+    parser.add_argument(
+        '--inference-server', default=None, metavar='HOST:PORT',
+        help="Send frames to a remote inference server instead of running the model locally"
+    )
+    parser.add_argument(
+        '--detector', default='landmarker', choices=('landmarker', 'gesture_recognizer', 'stub'),
+        help="Hand detection backend (stub plays scripted hands, for testing without a camera model)"
+    )
+    parser.add_argument(
+        '--profile', type=float, nargs='?', const=120.0, default=None, metavar='SECONDS',
+        help="Sample-profile the app from startup for SECONDS (default 120), see profiler.py"
+    )
+    parser.add_argument(
+        '--profile-dir', default='profiles',
+        help="Where profiles are written (collapsed stacks + summary)"
+    )
+    parser.add_argument(
+        '--session-log', default=None, metavar='DIR',
+        help="Record landmarks, gestures and control state of every camera session to DIR"
+    )
+    parser.add_argument(
+        '--model-loading', default=model_assets.DEFAULT_LOADING_MODE, choices=model_assets.LOADING_MODES,
+        help="Let every detector instance open the model file (path), or pass it the file's bytes "
+             "(buffer - measure with model_assets.py bench first)"
+    )
+    parser.add_argument(
+        '--source', default='camera:0',
+        help="Frame source: camera[:INDEX], video:PATH, video-fast:PATH, images:DIR, images-fast:DIR, "
+             "synthetic[-fast] or shm:NAME (see frame_sources.py)"
+    )
+    parser.add_argument(
+        '--pointer-mode', default='relative', choices=('relative', 'absolute'),
+        help="Relative (finger delta) or absolute (calibrated area mapped onto all monitors) pointing"
+    )
+    parser.add_argument(
+        '--gesture-profile', default=getpass.getuser(), metavar='USER',
+        help="Gesture thresholds fitted by threshold_tuner.py (default: the OS user's profile if one exists, "
+             "'defaults' for the built-in values)"
+    )
+    parser.add_argument(
+        '--event-log-dir', default='logs',
+        help="Where the structured event log (rotating events.jsonl files) is written"
+    )
+    parser.add_argument(
+        '--keyframe-interval', type=int, default=1, metavar='N',
+        help="Run hand detection every N frames and track landmarks with optical flow in between (1 = off)"
+    )
+    parser.add_argument(
+        '--startup-trace', default=None, metavar='FILE',
+        help="Write startup timings to FILE and exit once the first detection is done (startup_benchmark.py)"
+    )
+    return parser.parse_args()
+
 def main():
+    main_started = time.time()  # Module imports (and one-file extraction) are done by now
+    args = parse_args()
+    model_assets.set_loading_mode(args.model_loading)
     root = tk.Tk()
-    app = HandGestureMouseControl(root)
+    app = HandGestureMouseControl(
+        root,
+        metrics_port=args.metrics_port,
+        event_port=args.event_port,
+        inference_server=args.inference_server,
+        session_log_dir=args.session_log,
+        detector=args.detector,
+        profile_seconds=args.profile,
+        profile_dir=args.profile_dir,
+        keyframe_interval=max(1, args.keyframe_interval),
+        event_log_dir=args.event_log_dir,
+        pointer_mode=args.pointer_mode,
+        frame_source=args.source,
+        gesture_profile=args.gesture_profile
+    )
+    if args.startup_trace:
+        root.after(0, run_startup_trace, root, app, args.startup_trace, main_started)
     root.mainloop()
+    # Write out queued events before the interpreter exits
+    app.event_log.stop()
 
 if __name__ == "__main__":
     main()
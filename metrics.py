@@ -0,0 +1,216 @@
+"""
+Opt-in Prometheus metrics endpoint.
+
+Counters and histograms are plain Python objects updated by the frame loop
+(the only writer), so recording a value is a few attribute updates with no
+locking. The HTTP server runs on its own daemon thread, bound to localhost,
+and renders the text exposition format only when scraped - there is no
+per-request work on the frame loop.
+"""
+import bisect
+import ctypes
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Seconds - covers 1 ms (cheap frames) to 0.5 s (badly overloaded machines)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.02, 0.03, 0.04, 0.05, 0.075, 0.1, 0.15, 0.25, 0.5)
+
+
+def rss_bytes():
+    """Resident set size of this process (0 when the platform is not supported)"""
+    if sys.platform == 'win32':
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD)] + [
+                (name, ctypes.c_size_t) for name in (
+                    'PeakWorkingSetSize', 'WorkingSetSize', 'QuotaPeakPagedPoolUsage', 'QuotaPagedPoolUsage',
+                    'QuotaPeakNonPagedPoolUsage', 'QuotaNonPagedPoolUsage', 'PagefileUsage', 'PeakPagefileUsage')]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        kernel32 = ctypes.windll.kernel32
+        kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+        psapi = ctypes.windll.psapi
+        psapi.GetProcessMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.c_void_p, wintypes.DWORD]
+        if psapi.GetProcessMemoryInfo(kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize
+        return 0
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return 0
+
+
+def _format_labels(label_names, label_values):
+    if not label_names:
+        return ""
+    pairs = ",".join(f'{name}="{value}"' for name, value in zip(label_names, label_values))
+    return "{" + pairs + "}"
+
+
+class Counter:
+    """Monotonic counter, optionally with labels (single writer, no locking)."""
+
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.values = {}  # label values tuple -> count
+        if not self.label_names:
+            self.values[()] = 0  # Unlabelled counters are exported as 0 before the first inc()
+
+    def inc(self, *label_values, amount=1):
+        self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        # list() copies the items atomically under the GIL
+        for label_values, value in list(self.values.items()):
+            lines.append(f"{self.name}{_format_labels(self.label_names, label_values)} {value}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram (single writer, no locking)."""
+
+    def __init__(self, name, help_text, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        counts = list(self.counts)
+        cumulative = 0
+        for bound, count in zip(self.buckets, counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{bound}"}} {cumulative}')
+        cumulative += counts[-1]
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {cumulative}')
+        lines.append(f"{self.name}_sum {self.sum}")
+        lines.append(f"{self.name}_count {cumulative}")
+        return lines
+
+
+class CallbackMetric:
+    """Metric whose samples are read from app state at scrape time."""
+
+    def __init__(self, name, help_text, metric_type, callback, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.metric_type = metric_type
+        self.callback = callback  # Returns a number, or {label values tuple: number} when labelled
+        self.label_names = tuple(label_names)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.metric_type}"]
+        try:
+            value = self.callback()
+        except Exception:
+            return lines
+        if self.label_names:
+            for label_values, sample in value.items():
+                lines.append(f"{self.name}{_format_labels(self.label_names, label_values)} {sample}")
+        else:
+            lines.append(f"{self.name} {value}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class AppMetrics:
+    """The app's metrics. Frame loop code updates these attributes directly."""
+
+    def __init__(self):
+        self.registry = MetricsRegistry()
+        register = self.registry.register
+
+        self.frames_processed = register(Counter(
+            "hgmc_frames_processed_total", "Frames run through the processing pipeline"))
+        self.frame_latency = register(Histogram(
+            "hgmc_frame_latency_seconds", "Capture to preview latency per processed frame"))
+        self.inference_latency = register(Histogram(
+            "hgmc_inference_latency_seconds", "HandLandmarker.detect latency"))
+        self.frames_skipped = register(Counter(
+            "hgmc_frames_skipped_total", "Camera frames not processed", ('reason',)))
+        self.hands_detected = register(Counter(
+            "hgmc_hands_detected_total", "Hands detected, summed over processed frames"))
+        self.gesture_actions = register(Counter(
+            "hgmc_gesture_actions_total", "Actions fired by gestures", ('action',)))
+        self.state_transitions = register(Counter(
+            "hgmc_control_state_transitions_total", "Control state changes by new state", ('state',)))
+        self.errors = register(Counter(
+            "hgmc_errors_total", "Exceptions caught in the frame loop", ('where',)))
+
+    def add_callback(self, name, help_text, metric_type, callback, label_names=()):
+        """Expose a value owned by another component (read only when scraped)"""
+        return self.registry.register(CallbackMetric(name, help_text, metric_type, callback, label_names))
+
+    def render(self):
+        return self.registry.render()
+
+
+class MetricsServer:
+    """Serve /metrics on localhost from a daemon thread."""
+
+    def __init__(self, metrics, port, host='127.0.0.1'):
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self.httpd = None
+        self.thread = None
+
+    def start(self):
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Scrapes would otherwise spam the console
+
+        self.httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="MetricsServer", daemon=True)
+        self.thread.start()
+        print(f"Metrics available at http://{self.host}:{self.port}/metrics")
+
+    def stop(self):
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
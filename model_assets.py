@@ -0,0 +1,161 @@
+"""
+Model asset loading shared by every MediaPipe task instance in a process.
+
+By default ('path' mode) each HandLandmarker / GestureRecognizer opens and
+reads the .task file itself. In the opt-in 'buffer' mode the file is read in
+Python and handed to the instance as model_asset_buffer. The bytes are only
+kept while several instances are created back to back - inference server
+workers (InferenceServer.start) and evaluation workers, which inherit them
+through fork after preload(). Those callers forget() the model afterwards;
+everything else drops the bytes once its instance exists, so nothing stays
+in memory for the life of the process.
+
+The Tasks API only accepts the buffer as bytes, so a memory-mapped file
+cannot be passed through as is - mapping it would just add a second copy on
+the way to bytes. What is shared is the Python-side read. Whether that
+saves anything over 'path' depends on the native library and the disk, so
+measure before switching modes on a machine:
+    python model_assets.py bench --instances 4
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from metrics import rss_bytes
+
+LOADING_MODES = ('path', 'buffer')
+DEFAULT_LOADING_MODE = 'path'
+
+_lock = threading.Lock()
+_buffers = {}  # real path -> (size, mtime, bytes) of models kept for several instances (until forget())
+loading_mode = DEFAULT_LOADING_MODE
+
+
+def set_loading_mode(mode):
+    """'path' (every instance opens the file) or 'buffer' (pass the bytes, shared while kept)"""
+    global loading_mode
+    if mode not in LOADING_MODES:
+        raise ValueError(f"Unknown model loading mode '{mode}' ({', '.join(LOADING_MODES)})")
+    loading_mode = mode
+
+
+def load(model_path, keep=True):
+    """The model file's bytes. Kept (until forget()) with keep=True, reused while the file is unchanged."""
+    path = os.path.realpath(model_path)
+    stat = os.stat(path)
+    with _lock:
+        cached = _buffers.get(path)
+        if cached is not None and cached[0] == stat.st_size and cached[1] == stat.st_mtime:
+            return cached[2]
+        with open(path, 'rb') as f:
+            data = f.read()
+        if keep:
+            _buffers[path] = (stat.st_size, stat.st_mtime, data)
+        return data
+
+
+def forget(model_path):
+    """Drop a model that is no longer used (instances created from it keep working)"""
+    with _lock:
+        _buffers.pop(os.path.realpath(model_path), None)
+
+
+def preload(model_path):
+    """Load before forking workers so they inherit the pages instead of reading the file again"""
+    if loading_mode == 'buffer':
+        try:
+            load(model_path)
+        except OSError as e:
+            print(f"Could not preload model {model_path}: {e}")
+
+
+def base_options(model_path, keep=False):
+    """python.BaseOptions for model_path in the current loading mode.
+
+    keep=True keeps the bytes for further instances (call forget() when done creating them).
+    """
+    from mediapipe.tasks import python
+
+    if loading_mode == 'buffer':
+        try:
+            return python.BaseOptions(model_asset_buffer=load(model_path, keep))
+        except OSError as e:
+            # Let the task report a missing file the way it always has
+            print(f"Could not load model {model_path} into memory: {e}")
+    return python.BaseOptions(model_asset_path=model_path)
+
+
+def _measure(model_path, mode, instances):
+    """Create landmarkers one by one in this process. Prints JSON timings and RSS."""
+    from mediapipe.tasks.python import vision
+
+    set_loading_mode(mode)
+    landmarkers = []
+    rows = [{'instance': 0, 'create_ms': 0.0, 'rss_bytes': rss_bytes()}]
+    try:
+        for index in range(instances):
+            start = time.perf_counter()
+            options = vision.HandLandmarkerOptions(base_options=base_options(model_path, keep=True), num_hands=2)
+            landmarkers.append(vision.HandLandmarker.create_from_options(options))
+            rows.append({'instance': index + 1, 'create_ms': (time.perf_counter() - start) * 1000.0,
+                         'rss_bytes': rss_bytes()})
+    finally:
+        for landmarker in landmarkers:
+            landmarker.close()
+    print(json.dumps(rows))
+
+
+def bench(model_path, instances, modes):
+    """Run each mode in a fresh interpreter, so neither inherits the other's caches"""
+    import numpy as np
+
+    print(f"Model {model_path} ({os.path.getsize(model_path) / 2 ** 20:.1f} MB), {instances} instances per mode")
+    print(f"\n{'mode':<8} {'first ms':>9} {'extra ms':>9} {'first MB':>9} {'extra MB':>9}")
+    for mode in modes:
+        result = subprocess.run([sys.executable, os.path.abspath(__file__), '_measure', model_path, mode,
+                                 str(instances)], capture_output=True, text=True)
+        if result.returncode != 0:
+            print(f"{mode:<8} failed: {result.stderr.strip().splitlines()[-1:] or result.returncode}")
+            continue
+        rows = json.loads(result.stdout.strip().splitlines()[-1])
+        rss = [row['rss_bytes'] / 2 ** 20 for row in rows]
+        extra_ms = float(np.median([row['create_ms'] for row in rows[2:]])) if len(rows) > 2 else 0.0
+        extra_mb = float(np.median(np.diff(rss[1:]))) if len(rows) > 2 else 0.0
+        print(f"{mode:<8} {rows[1]['create_ms']:>9.1f} {extra_ms:>9.1f} {rss[1] - rss[0]:>9.1f} {extra_mb:>9.1f}")
+    print("\n'first' is the first instance in a fresh process (including the file read), "
+          "'extra' the median cost of each further one. RSS counts shared file pages too.")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare model loading by path and by shared buffer")
+    sub = parser.add_subparsers(dest='command', required=True)
+    bench_parser = sub.add_parser('bench', help="Instance creation time and RSS per extra instance")
+    bench_parser.add_argument('--model', default=None, help="Default: the bundled hand landmarker")
+    bench_parser.add_argument('--instances', type=int, default=4)
+    bench_parser.add_argument('--mode', action='append', choices=LOADING_MODES,
+                              help="Mode to measure (repeatable, default: both)")
+    measure_parser = sub.add_parser('_measure')  # Internal: one mode in a fresh process
+    measure_parser.add_argument('model')
+    measure_parser.add_argument('mode', choices=LOADING_MODES)
+    measure_parser.add_argument('instances', type=int)
+    args = parser.parse_args()
+
+    if args.command == '_measure':
+        _measure(args.model, args.mode, args.instances)
+        return 0
+    if args.model is None:
+        from inference_server import default_model_path
+        args.model = default_model_path()
+    if not os.path.exists(args.model):
+        print(f"Model not found: {args.model} - run the app once to download it")
+        return 1
+    return bench(args.model, max(args.instances, 2), args.mode or list(LOADING_MODES))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
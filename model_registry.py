@@ -0,0 +1,255 @@
+"""
+Hand landmarker model variants and per-machine automatic selection.
+
+The registry lists the published hand landmarker models. On first run the
+app micro-benchmarks every variant that is available locally against a
+recorded clip and picks the highest-ranked one whose per-frame latency fits
+the configured budget. The ranking (accuracy_rank) is declared here from
+the model versions, not measured. The choice is cached per machine so the
+benchmark only runs once.
+"""
+import json
+import os
+import platform
+import sys
+import time
+
+import cv2
+import numpy as np
+import mediapipe as mp
+from mediapipe.tasks.python import vision
+
+import model_assets
+
+MODEL_URL_BASE = "https://storage.googleapis.com/mediapipe-models/hand_landmarker/hand_landmarker"
+
+# Known hand landmarker variants.
+# accuracy_rank: declared preference, higher = newer / expected more accurate (not measured -
+# used to pick among the variants within the latency budget)
+MODEL_VARIANTS = {
+    'float16/1': {
+        'url': f"{MODEL_URL_BASE}/float16/1/hand_landmarker.task",
+        'filename': "hand_landmarker.task",  # Original file name, bundled by build_exe.py
+        'accuracy_rank': 1,
+        'description': "Float16 v1 (original)",
+    },
+    'float16/latest': {
+        'url': f"{MODEL_URL_BASE}/float16/latest/hand_landmarker.task",
+        'filename': "hand_landmarker_float16_latest.task",
+        'accuracy_rank': 2,
+        'description': "Float16 latest",
+    },
+}
+
+# Other task models, downloaded on demand (not part of the variant selection)
+AUXILIARY_MODELS = {
+    'gesture_recognizer': {
+        'url': "https://storage.googleapis.com/mediapipe-models/gesture_recognizer/gesture_recognizer/float16/1/gesture_recognizer.task",
+        'filename': "gesture_recognizer.task",
+        'description': "GestureRecognizer float16 v1 (detectors.GestureRecognizerDetector)",
+    },
+}
+
+DEFAULT_VARIANT = 'float16/1'
+AUTO_VARIANT = 'auto'
+
+DEFAULT_LATENCY_BUDGET_MS = 30.0  # Per-frame detect() budget at p95
+BENCHMARK_FRAMES = 60  # Frames timed per variant
+BENCHMARK_WARMUP_FRAMES = 5  # Untimed frames per variant (graph init, caches)
+BENCHMARK_CLIP_NAME = "benchmark_clip.mp4"  # Looked up next to the models
+
+APP_NAME = "HandGestureMouseControl"
+
+
+def get_cache_dir():
+    """Per-user cache directory for machine-specific settings"""
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Caches')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    path = os.path.join(base, APP_NAME)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def get_selection_cache_path():
+    return os.path.join(get_cache_dir(), "model_selection.json")
+
+
+def machine_fingerprint():
+    """Identify the machine so a cached benchmark result is not reused elsewhere"""
+    return "|".join([
+        platform.node(),
+        platform.machine(),
+        platform.processor() or "",
+        str(os.cpu_count()),
+    ])
+
+
+def load_selection_cache():
+    """Load the cached model selection (empty dict if missing or unreadable)"""
+    try:
+        with open(get_selection_cache_path(), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_selection_cache(cache):
+    try:
+        with open(get_selection_cache_path(), 'w', encoding='utf-8') as f:
+            json.dump(cache, f, indent=2)
+    except OSError as e:
+        print(f"Could not save model selection cache: {e}")
+
+
+def set_variant_override(variant):
+    """Persist the Settings tab override ('auto' clears it)"""
+    cache = load_selection_cache()
+    if variant == AUTO_VARIANT:
+        cache.pop('override', None)
+    else:
+        cache['override'] = variant
+    save_selection_cache(cache)
+
+
+def load_benchmark_frames(clip_path=None, max_frames=BENCHMARK_FRAMES):
+    """Load RGB frames from the recorded clip.
+
+    Falls back to synthetic noise frames when no clip is available. Those
+    still exercise the palm detector, which dominates the cost when no hand
+    is being tracked, but the clip gives far more representative numbers.
+    """
+    frames = []
+    if clip_path and os.path.exists(clip_path):
+        cap = cv2.VideoCapture(clip_path)
+        while len(frames) < max_frames:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        cap.release()
+
+    if not frames:
+        rng = np.random.default_rng(0)
+        frames = [rng.integers(0, 256, (480, 640, 3), dtype=np.uint8) for _ in range(max_frames)]
+
+    return frames
+
+
+def benchmark_variant(model_path, frames, num_hands=2):
+    """Time detect() on each frame, returns latency stats in milliseconds"""
+    options = vision.HandLandmarkerOptions(
+        base_options=model_assets.base_options(model_path),
+        num_hands=num_hands,
+    )
+    landmarker = vision.HandLandmarker.create_from_options(options)
+    try:
+        mp_frames = [mp.Image(image_format=mp.ImageFormat.SRGB, data=frame) for frame in frames]
+        for mp_image in mp_frames[:BENCHMARK_WARMUP_FRAMES]:
+            landmarker.detect(mp_image)
+
+        latencies = []
+        for mp_image in mp_frames:
+            start = time.perf_counter()
+            landmarker.detect(mp_image)
+            latencies.append((time.perf_counter() - start) * 1000.0)
+    finally:
+        landmarker.close()
+
+    latencies = np.array(latencies)
+    return {
+        'mean_ms': float(latencies.mean()),
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p95_ms': float(np.percentile(latencies, 95)),
+    }
+
+
+def choose_variant(results, latency_budget_ms):
+    """Pick the highest accuracy_rank variant whose p95 latency fits the budget.
+
+    If nothing fits, the fastest variant wins.
+    """
+    if not results:
+        return DEFAULT_VARIANT
+
+    fitting = [name for name, stats in results.items() if stats['p95_ms'] <= latency_budget_ms]
+    if fitting:
+        return max(fitting, key=lambda name: MODEL_VARIANTS[name]['accuracy_rank'])
+    return min(results, key=lambda name: results[name]['p95_ms'])
+
+
+def cached_variant(variants, latency_budget_ms=DEFAULT_LATENCY_BUDGET_MS, force=False):
+    """The Settings override or this machine's cached selection among `variants`, without downloading
+    or benchmarking anything. None when a benchmark is needed."""
+    cache = load_selection_cache()
+
+    # Settings tab override wins if that variant is still available
+    override = cache.get('override')
+    if override in variants:
+        return override
+
+    cached = cache.get('selection')
+    # Valid while every variant it chose from is still a candidate and no variant was added to the
+    # registry since (`variants` may be all known ones - the selection only saw the available ones)
+    if (not force and cached
+            and cached.get('machine') == machine_fingerprint()
+            and cached.get('latency_budget_ms') == latency_budget_ms
+            and cached.get('variant') in variants
+            and all(name in variants for name in cached.get('variants', ()))
+            and cached.get('registry') == sorted(MODEL_VARIANTS)):
+        return cached['variant']
+    return None
+
+
+def _print_event(event, **fields):
+    print(f"{event}: " + ", ".join(f"{key}={value}" for key, value in fields.items()))
+
+
+def select_variant(model_paths, latency_budget_ms=DEFAULT_LATENCY_BUDGET_MS, clip_path=None, force=False,
+                   emit=_print_event):
+    """Resolve which model variant to use on this machine.
+
+    Args:
+        model_paths: dict of variant name -> local .task path for every available variant
+        latency_budget_ms: per-frame p95 latency budget for detect()
+        clip_path: recorded clip used for the benchmark
+        force: re-run the benchmark even if a cached result exists
+        emit: progress reporting, EventLog.emit signature ('model' events)
+
+    Returns:
+        The selected variant name
+    """
+    variant = cached_variant(model_paths, latency_budget_ms, force)
+    if variant is not None:
+        return variant
+
+    results = {}
+    if len(model_paths) == 1:
+        # Nothing to compare (e.g. only the bundled model) - cached all the same, so it isn't redone every launch
+        variant = next(iter(model_paths))
+    else:
+        emit('model', action='benchmark', variants=sorted(model_paths))
+        frames = load_benchmark_frames(clip_path)
+        for name, path in model_paths.items():
+            try:
+                results[name] = benchmark_variant(path, frames)
+                emit('model', action='benchmarked', variant=name, **results[name])
+            except Exception as e:
+                emit('model', action='benchmark_failed', variant=name, message=str(e))
+        variant = choose_variant(results, latency_budget_ms)
+
+    cache = load_selection_cache()
+    cache['selection'] = {
+        'machine': machine_fingerprint(),
+        'variant': variant,
+        'latency_budget_ms': latency_budget_ms,
+        'variants': sorted(model_paths),  # The candidates this selection chose from
+        'registry': sorted(MODEL_VARIANTS),
+        'results': results,
+        'timestamp': time.time(),
+    }
+    save_selection_cache(cache)
+    return variant
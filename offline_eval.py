@@ -0,0 +1,345 @@
+"""
+Offline evaluation of recorded webcam videos.
+
+Runs every video in a directory through HandLandmarker (VIDEO mode) and the
+rule-based gesture classifier on a process pool. Videos are split into
+segments of --segment-frames frames so the work spreads evenly over the
+workers even when a few recordings are much longer than the rest.
+
+VIDEO mode tracks hands from one frame to the next, so every segment gets a
+fresh landmarker and starts WARMUP_FRAMES early (those frames are tracked but
+not reported). Results then don't depend on which worker ran which segment,
+and segment starts see the same tracking history as a sequential run would,
+give or take the warm-up length.
+
+Outputs (in --output):
+    <video>.timeline.csv   frame, timestamp_ms, hand, gesture, palm_facing, label
+    <video>.landmarks.npz  per detected hand: frame, hand (0 left, 1 right), landmarks (21, 3),
+                           predicted gesture and label - training input for the learned classifier
+    summary.json           per-gesture precision/recall and per-worker throughput
+
+Labels are optional, one CSV per video next to it (<video>.labels.csv):
+    start_frame,end_frame,hand,gesture
+    120,245,Right,FIST
+end_frame is exclusive; hand is Left, Right or * (every detected hand).
+Frames without a label are classified but not scored.
+
+Usage:
+    python offline_eval.py recordings/ --output eval_out --workers 8
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+import numpy as np
+
+import model_assets
+from gestures import GestureClassifier, hand_side
+from inference_server import default_model_path
+
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.webm')
+NO_HAND = "NO HAND"  # Prediction when a labelled hand was not detected
+DEFAULT_SEGMENT_FRAMES = 900  # ~30s at 30 fps per task
+WARMUP_FRAMES = 30  # Frames tracked before a segment starts, so tracking has settled by its first frame
+
+# Per-worker state, created once by the pool initializer
+_worker = {}
+
+
+def find_videos(directory):
+    videos = []
+    for name in sorted(os.listdir(directory)):
+        if name.lower().endswith(VIDEO_EXTENSIONS):
+            videos.append(os.path.join(directory, name))
+    return videos
+
+
+def load_labels(video_path):
+    """Returns [(start_frame, end_frame, hand, gesture)] from <video>.labels.csv, or [] if none"""
+    labels_path = os.path.splitext(video_path)[0] + '.labels.csv'
+    if not os.path.exists(labels_path):
+        return []
+    labels = []
+    with open(labels_path, newline='') as f:
+        for row in csv.DictReader(f):
+            labels.append((int(row['start_frame']), int(row['end_frame']), row['hand'].strip(), row['gesture'].strip()))
+    return labels
+
+
+def label_for(labels, frame, hand):
+    for start, end, label_hand, gesture in labels:
+        if start <= frame < end and label_hand in (hand, '*'):
+            return gesture
+    return ""
+
+
+def _init_worker(model_path, num_hands):
+    # The pool provides the parallelism - keep OpenCV from spawning its own threads per worker
+    cv2.setNumThreads(1)
+    import mediapipe as mp
+    from mediapipe.tasks.python import vision
+
+    _worker['mp'] = mp
+    _worker['vision'] = vision
+    # Landmarkers are created per segment from these options (VIDEO mode carries tracking state)
+    _worker['options'] = vision.HandLandmarkerOptions(
+        # Forked workers find the file already loaded by run() - spawned ones read it once each
+        base_options=model_assets.base_options(model_path),
+        running_mode=vision.RunningMode.VIDEO,
+        num_hands=num_hands,
+        min_hand_detection_confidence=0.7,
+    )
+    _worker['classifier'] = GestureClassifier()
+
+
+def open_at(video_path, frame):
+    """VideoCapture whose next read() returns `frame` (None if the video ends before it)"""
+    cap = cv2.VideoCapture(video_path)
+    if frame:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, frame)
+        position = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+        if position > frame or position < 0:
+            # Seeking is keyframe based on some codecs and can land past the frame - decode up to it instead
+            cap.release()
+            cap = cv2.VideoCapture(video_path)
+            position = 0
+        while position < frame:
+            if not cap.grab():
+                cap.release()
+                return None
+            position += 1
+    return cap
+
+
+def _evaluate_segment(video_path, start_frame, end_frame, labels):
+    """Process frames [start_frame, end_frame) of one video in this worker"""
+    mp = _worker['mp']
+    classifier = _worker['classifier']
+
+    first_frame = max(0, start_frame - WARMUP_FRAMES)
+    cap = open_at(video_path, first_frame)
+    if cap is None:
+        raise IOError(f"{video_path} ends before frame {first_frame}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    frame_ms = 1000.0 / fps
+    landmarker = _worker['vision'].HandLandmarker.create_from_options(_worker['options'])
+
+    timeline = []
+    hand_frames = []
+    hand_sides = []
+    hand_points = []
+    busy = 0.0
+    frame = first_frame
+    try:
+        while frame < end_frame:
+            ret, image = cap.read()
+            if not ret:
+                break
+            started = time.perf_counter()
+            rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+            timestamp_ms = int(frame * frame_ms)
+            result = landmarker.detect_for_video(mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb), timestamp_ms)
+            if frame < start_frame:
+                # Warm-up: only there to give the tracker the preceding frames
+                busy += time.perf_counter() - started
+                frame += 1
+                continue
+
+            seen = set()
+            for idx, landmarks in enumerate(result.hand_landmarks or []):
+                handedness = result.handedness[idx] if result.handedness and idx < len(result.handedness) else []
+                side = hand_side(handedness, landmarks)
+                gesture = classifier.get_gesture_name(landmarks)
+                palm_facing = classifier.is_palm_facing_camera(landmarks, side == 'Right')
+                label = label_for(labels, frame, side)
+                timeline.append((frame, timestamp_ms, side, gesture, int(palm_facing), label))
+                hand_frames.append(frame)
+                hand_sides.append(1 if side == 'Right' else 0)
+                hand_points.append([(lm.x, lm.y, lm.z) for lm in landmarks])
+                seen.add(side)
+            # Labelled hands the landmarker missed count against recall
+            for start, end, label_hand, label in labels:
+                if start <= frame < end and label_hand not in seen and (label_hand != '*' or not seen):
+                    timeline.append((frame, timestamp_ms, label_hand, NO_HAND, -1, label))
+            busy += time.perf_counter() - started
+            frame += 1
+    finally:
+        cap.release()
+        landmarker.close()
+
+    return {
+        'video': video_path,
+        'start_frame': start_frame,
+        'frames': max(0, frame - start_frame),
+        'busy_seconds': busy,
+        'worker': os.getpid(),
+        'timeline': timeline,
+        'hand_frames': np.array(hand_frames, dtype=np.int64),
+        'hand_sides': np.array(hand_sides, dtype=np.uint8),
+        'hand_points': np.array(hand_points, dtype=np.float32).reshape(-1, 21, 3),
+    }
+
+
+def plan_segments(videos, segment_frames):
+    """Split videos into (video, start, end) tasks, longest first for better load balancing"""
+    tasks = []
+    for video in videos:
+        cap = cv2.VideoCapture(video)
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        cap.release()
+        if total <= 0:
+            # Unknown length (some containers) - process as one task
+            tasks.append((video, 0, sys.maxsize))
+            continue
+        for start in range(0, total, segment_frames):
+            tasks.append((video, start, min(start + segment_frames, total)))
+    tasks.sort(key=lambda task: task[2] - task[1], reverse=True)
+    return tasks
+
+
+def score(timelines):
+    """Per-gesture precision/recall over labelled hand-frames"""
+    true_positive = defaultdict(int)
+    false_positive = defaultdict(int)
+    false_negative = defaultdict(int)
+    scored = 0
+    for rows in timelines:
+        for _frame, _ts, _hand, gesture, _palm, label in rows:
+            if not label:
+                continue
+            scored += 1
+            if gesture == label:
+                true_positive[label] += 1
+            else:
+                false_negative[label] += 1
+                false_positive[gesture] += 1
+
+    report = {}
+    for gesture in sorted(set(true_positive) | set(false_positive) | set(false_negative)):
+        tp, fp, fn = true_positive[gesture], false_positive[gesture], false_negative[gesture]
+        report[gesture] = {
+            'precision': tp / (tp + fp) if tp + fp else None,
+            'recall': tp / (tp + fn) if tp + fn else None,
+            'support': tp + fn,
+        }
+    return report, scored
+
+
+def write_video_outputs(output_dir, video, segments):
+    """Merge a video's segments (in frame order) into its timeline CSV and landmark archive"""
+    segments = sorted(segments, key=lambda segment: segment['start_frame'])
+    stem = os.path.splitext(os.path.basename(video))[0]
+    rows = [row for segment in segments for row in segment['timeline']]
+    with open(os.path.join(output_dir, stem + '.timeline.csv'), 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(('frame', 'timestamp_ms', 'hand', 'gesture', 'palm_facing', 'label'))
+        writer.writerows(rows)
+
+    detected = [row for row in rows if row[3] != NO_HAND]
+    np.savez_compressed(
+        os.path.join(output_dir, stem + '.landmarks.npz'),
+        frame=np.concatenate([segment['hand_frames'] for segment in segments]),
+        hand=np.concatenate([segment['hand_sides'] for segment in segments]),
+        landmarks=np.concatenate([segment['hand_points'] for segment in segments]),
+        predicted=np.array([row[3] for row in detected]),
+        label=np.array([row[5] for row in detected]),
+    )
+    return rows
+
+
+def run(directory, output_dir, workers, model_path, segment_frames=DEFAULT_SEGMENT_FRAMES, num_hands=2):
+    videos = find_videos(directory)
+    if not videos:
+        print(f"No videos found in {directory}")
+        return None
+    os.makedirs(output_dir, exist_ok=True)
+    labels = {video: load_labels(video) for video in videos}
+    tasks = plan_segments(videos, segment_frames)
+    print(f"{len(videos)} videos, {len(tasks)} segments, {workers} workers")
+
+    started = time.perf_counter()
+    by_video = defaultdict(list)
+    model_assets.preload(model_path)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(model_path, num_hands)) as pool:
+        futures = [pool.submit(_evaluate_segment, video, start, end, labels[video]) for video, start, end in tasks]
+        for done, future in enumerate(as_completed(futures), 1):
+            try:
+                segment = future.result()
+            except Exception as e:
+                print(f"Error evaluating segment: {e}")
+                continue
+            by_video[segment['video']].append(segment)
+            print(f"[{done}/{len(tasks)}] {os.path.basename(segment['video'])} "
+                  f"frames {segment['start_frame']}-{segment['start_frame'] + segment['frames']}")
+    wall = time.perf_counter() - started
+    model_assets.forget(model_path)
+
+    timelines = [write_video_outputs(output_dir, video, segments) for video, segments in by_video.items()]
+    report, scored = score(timelines)
+
+    per_worker = defaultdict(lambda: {'frames': 0, 'busy_seconds': 0.0})
+    for segments in by_video.values():
+        for segment in segments:
+            stats = per_worker[segment['worker']]
+            stats['frames'] += segment['frames']
+            stats['busy_seconds'] += segment['busy_seconds']
+    for stats in per_worker.values():
+        stats['fps'] = stats['frames'] / stats['busy_seconds'] if stats['busy_seconds'] else 0.0
+    total_frames = sum(stats['frames'] for stats in per_worker.values())
+
+    summary = {
+        'videos': len(by_video),
+        'frames': total_frames,
+        'wall_seconds': wall,
+        'throughput_fps': total_frames / wall if wall else 0.0,
+        'workers': workers,
+        'per_worker': {str(pid): stats for pid, stats in per_worker.items()},
+        'scored_hand_frames': scored,
+        'gestures': report,
+    }
+    with open(os.path.join(output_dir, 'summary.json'), 'w') as f:
+        json.dump(summary, f, indent=2)
+    print_summary(summary)
+    return summary
+
+
+def print_summary(summary):
+    print(f"\n{summary['frames']} frames in {summary['wall_seconds']:.1f}s "
+          f"= {summary['throughput_fps']:.1f} fps with {summary['workers']} workers")
+    for pid, stats in sorted(summary['per_worker'].items()):
+        print(f"  worker {pid}: {stats['frames']} frames, {stats['fps']:.1f} fps")
+    if summary['scored_hand_frames']:
+        print(f"\n{'gesture':<12} {'precision':>10} {'recall':>8} {'support':>8}")
+        for gesture, stats in summary['gestures'].items():
+            precision = '-' if stats['precision'] is None else f"{stats['precision']:.3f}"
+            recall = '-' if stats['recall'] is None else f"{stats['recall']:.3f}"
+            print(f"{gesture:<12} {precision:>10} {recall:>8} {stats['support']:>8}")
+    else:
+        print("No labels found - timelines written without scores")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate recorded videos with HandLandmarker and the gesture classifier")
+    parser.add_argument('directory', help="Directory of video files (with optional <video>.labels.csv)")
+    parser.add_argument('--output', default='eval_output')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--model', default=default_model_path())
+    parser.add_argument('--segment-frames', type=int, default=DEFAULT_SEGMENT_FRAMES)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.model):
+        print(f"Model not found at {args.model} - run the app once to download it")
+        return 1
+    run(args.directory, args.output, args.workers, args.model, args.segment_frames)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
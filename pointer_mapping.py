@@ -0,0 +1,333 @@
+"""
+Pointer mapping: relative (mouse-like) and absolute (touch-like) pointing.
+
+Relative mode moves the cursor by the smoothed fingertip delta scaled by
+the screen size and sensitivity - crossing a large desk takes several
+re-clutches and the hand-to-cursor offset drifts.
+
+Absolute mode maps a camera-space interaction rectangle, calibrated once
+by pointing at its four corners, onto the whole virtual desktop (every
+monitor, including ones left of or above the primary). The homography is
+computed when the mapping is built, so each frame is one 3x3
+matrix-vector product and a single absolute move. Only the camera corners
+are saved; the transform is rebuilt against the current desktop on load,
+so rearranging monitors does not need a new calibration.
+
+Compare the two modes on recorded sessions (see session_log.py):
+    python pointer_mapping.py replay sessions --desktop 7680x2160
+"""
+import argparse
+import json
+import os
+import sys
+
+import cv2
+import numpy as np
+
+from hand_tracker import HandTrack
+
+# GetSystemMetrics indices of the virtual screen (bounding box of all monitors)
+SM_XVIRTUALSCREEN = 76
+SM_YVIRTUALSCREEN = 77
+SM_CXVIRTUALSCREEN = 78
+SM_CYVIRTUALSCREEN = 79
+
+CORNERS = ('top-left', 'top-right', 'bottom-right', 'bottom-left')
+# Mirrored camera coordinates used until the user calibrates: the central part of the frame
+DEFAULT_CAMERA_RECT = ((0.2, 0.15), (0.8, 0.15), (0.8, 0.85), (0.2, 0.85))
+DEFAULT_HOLD_TIME = 0.8  # Seconds the finger must stay on a corner
+DEFAULT_HOLD_RADIUS = 0.015  # Normalized movement still counted as holding
+DEFAULT_MIN_SEPARATION = 0.1  # Corners closer than this to an earlier one are ignored
+EDGE_INSET = 1  # Pixels kept off the desktop edges - the corners are pyautogui fail-safe points
+POINTING_CODE = 3  # gesture_stream.GESTURES.index('POINTING')
+
+
+def virtual_desktop(fallback_size):
+    """(left, top, width, height) of the desktop spanning all monitors.
+
+    On Windows this is the virtual screen, in the physical pixels pyautogui
+    moves in (pyautogui makes the process DPI aware). Elsewhere fallback_size
+    (pyautogui.size()) is used - on X11 that already spans every monitor.
+    """
+    if sys.platform == 'win32':
+        try:
+            import ctypes
+            metrics = ctypes.windll.user32.GetSystemMetrics
+            width, height = metrics(SM_CXVIRTUALSCREEN), metrics(SM_CYVIRTUALSCREEN)
+            if width > 0 and height > 0:
+                return (metrics(SM_XVIRTUALSCREEN), metrics(SM_YVIRTUALSCREEN), width, height)
+        except (AttributeError, OSError) as e:
+            print(f"Could not query the virtual screen: {e}")
+    width, height = fallback_size
+    return (0, 0, int(width), int(height))
+
+
+class PointerMapping:
+    """Precomputed homography from a camera-space quad to desktop pixels."""
+
+    def __init__(self, camera_corners, desktop):
+        self.camera_corners = [tuple(corner) for corner in camera_corners]
+        self.desktop = desktop
+        left, top, width, height = desktop
+        right, bottom = left + width - 1, top + height - 1
+        screen_corners = ((left, top), (right, top), (right, bottom), (left, bottom))
+        matrix = cv2.getPerspectiveTransform(np.float32(self.camera_corners), np.float32(screen_corners))
+        # Plain floats: for a single point this beats a numpy product by an order of magnitude
+        self.h = [float(value) for value in matrix.ravel()]
+        self.min_x, self.max_x = left + EDGE_INSET, right - EDGE_INSET
+        self.min_y, self.max_y = top + EDGE_INSET, bottom - EDGE_INSET
+
+    def map(self, x, y):
+        """Desktop pixel for mirrored normalized camera coordinates, clamped to the desktop"""
+        h = self.h
+        w = h[6] * x + h[7] * y + h[8]
+        screen_x = (h[0] * x + h[1] * y + h[2]) / w
+        screen_y = (h[3] * x + h[4] * y + h[5]) / w
+        return (min(max(int(round(screen_x)), self.min_x), self.max_x),
+                min(max(int(round(screen_y)), self.min_y), self.max_y))
+
+    def describe(self):
+        left, top, width, height = self.desktop
+        return f"Absolute pointer: desktop {width}x{height} at ({left}, {top})"
+
+
+def load_calibration(path):
+    """Saved camera corners, or None when there is no usable calibration"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            corners = json.load(f)['camera_corners']
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    if len(corners) != len(CORNERS):
+        return None
+    return [tuple(corner) for corner in corners]
+
+
+def save_calibration(path, corners):
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'camera_corners': [list(corner) for corner in corners]}, f, indent=2)
+    except OSError as e:
+        print(f"Could not save pointer calibration: {e}")
+
+
+class PointerCalibration:
+    """Collect the interaction rectangle: hold the pointing finger on each corner in turn."""
+
+    def __init__(self, hold_time=DEFAULT_HOLD_TIME, hold_radius=DEFAULT_HOLD_RADIUS,
+                 min_separation=DEFAULT_MIN_SEPARATION):
+        self.hold_time = hold_time
+        self.hold_radius = hold_radius
+        self.min_separation = min_separation
+        self.corners = []
+        self.anchor = None  # Where the current hold started
+        self.hold_start = None
+        self.samples = []
+        self.message = None  # Why the last attempt was rejected
+
+    @property
+    def done(self):
+        return len(self.corners) == len(CORNERS)
+
+    def prompt(self):
+        if self.done:
+            return "Calibration done"
+        prompt = f"Calibration: point at the {CORNERS[len(self.corners)]} corner and hold still"
+        return f"{self.message} - {prompt}" if self.message else prompt
+
+    def feed(self, x, y, now):
+        """Add one fingertip position (mirrored, normalized). Returns True once all corners are set."""
+        if self.done:
+            return True
+        if any(abs(x - cx) + abs(y - cy) < self.min_separation for cx, cy in self.corners):
+            self.anchor = None  # Still on a corner that was already taken
+            return False
+        if self.anchor is None or max(abs(x - self.anchor[0]), abs(y - self.anchor[1])) > self.hold_radius:
+            self.anchor = (x, y)
+            self.hold_start = now
+            self.samples = []
+        self.samples.append((x, y))
+        if now - self.hold_start < self.hold_time:
+            return False
+
+        self.corners.append(tuple(float(value) for value in np.mean(self.samples, axis=0)))
+        self.anchor = None
+        if self.done:
+            quad = np.float32(self.corners)
+            if not cv2.isContourConvex(quad) or cv2.contourArea(quad) < 0.02:
+                # Crossed or tiny quads give an unusable transform - start over
+                self.corners = []
+                self.message = "Corners did not form a rectangle"
+                return False
+        return self.done
+
+
+def relative_move(track, finger_x, finger_y, smoothing, threshold, scale_x, scale_y):
+    """Relative mode: (dx, dy) cursor pixels for this fingertip position, or None for no move"""
+    # Initialize previous position if first time
+    if track.last_finger_x is None or track.last_finger_y is None:
+        track.last_finger_x = finger_x
+        track.last_finger_y = finger_y
+        return None  # Skip first frame
+
+    # Calculate movement delta in normalized coordinates
+    dx = finger_x - track.last_finger_x
+    dy = finger_y - track.last_finger_y
+    track.last_finger_x = finger_x
+    track.last_finger_y = finger_y
+
+    # Apply smoothing to movement delta
+    track.smoothed_dx = track.smoothed_dx * smoothing + dx * (1 - smoothing)
+    track.smoothed_dy = track.smoothed_dy * smoothing + dy * (1 - smoothing)
+
+    # Check if movement is significant enough
+    if abs(track.smoothed_dx) + abs(track.smoothed_dy) <= threshold:
+        # Movement too small - reset smoothed deltas to prevent drift
+        track.smoothed_dx = 0.0
+        track.smoothed_dy = 0.0
+        return None
+    # Scale the movement delta to screen pixels (scale includes the sensitivity)
+    mouse_dx = int(track.smoothed_dx * scale_x)
+    mouse_dy = int(track.smoothed_dy * scale_y)
+    if mouse_dx == 0 and mouse_dy == 0:
+        return None
+    return mouse_dx, mouse_dy
+
+
+def absolute_move(track, finger_x, finger_y, mapping, smoothing, threshold):
+    """Absolute mode: desktop (x, y) for this fingertip position, or None for no move"""
+    if track.pointer_x is None:
+        track.pointer_x = finger_x
+        track.pointer_y = finger_y
+    else:
+        # Smooth the position itself - there are no deltas to accumulate drift
+        track.pointer_x = track.pointer_x * smoothing + finger_x * (1 - smoothing)
+        track.pointer_y = track.pointer_y * smoothing + finger_y * (1 - smoothing)
+
+    # Dead zone around the last position moved to, so jitter does not shake the cursor
+    if track.moved_x is not None and \
+            abs(track.pointer_x - track.moved_x) + abs(track.pointer_y - track.moved_y) <= threshold:
+        return None
+    track.moved_x = track.pointer_x
+    track.moved_y = track.pointer_y
+    return mapping.map(track.pointer_x, track.pointer_y)
+
+
+def pointing_runs(segment, hand, min_frames):
+    """Runs of the pointing gesture long enough to be a pointer movement"""
+    runs = segment.runs(hand)
+    return runs[(runs['gesture'] == POINTING_CODE) & (runs['length'] >= min_frames)]
+
+
+def acquisition_time(times, positions, radius):
+    """Seconds from the first frame until the cursor stays within radius of where it ends up"""
+    final = positions[-1]
+    settled = len(positions) - 1
+    while settled > 0 and np.abs(positions[settled - 1] - final).max() <= radius:
+        settled -= 1
+    return times[settled] - times[0]
+
+
+def replay(log, mapping, hand='Right', smoothing=0.85, threshold=0.001, sensitivity=3.0, radius=20,
+           min_frames=5):
+    """Replay recorded pointing runs through both modes.
+
+    Returns {mode: list of (acquisition seconds, travel pixels, edge-pinned frames)}.
+    Each segment starts with the cursor at the desktop centre; pointer state
+    carries over between runs as it does in the app.
+    """
+    slot = 1 if hand == 'Right' else 0
+    left, top, width, height = mapping.desktop
+    results = {'relative': [], 'absolute': []}
+    for segment in log.segments:
+        runs = pointing_runs(segment, hand, min_frames)
+        if not len(runs):
+            continue
+        tracks = {mode: HandTrack(0, hand, None) for mode in results}
+        cursors = {mode: np.array([left + width / 2, top + height / 2]) for mode in results}
+        for run in runs:
+            start, stop = int(run['start']), int(run['start'] + run['length'])
+            times = np.asarray(segment['timestamp'][start:stop], dtype=np.float64)
+            tips = np.asarray(segment['landmarks'][start:stop, slot, 8, :2], dtype=np.float64)
+            for mode, track in tracks.items():
+                cursor = cursors[mode]
+                origin = cursor.copy()
+                positions = np.empty((len(tips), 2))
+                pinned = 0
+                for index, (tip_x, tip_y) in enumerate(tips):
+                    finger_x, finger_y = 1.0 - tip_x, tip_y  # Mirrored like the preview
+                    if mode == 'relative':
+                        move = relative_move(track, finger_x, finger_y, smoothing, threshold,
+                                             width * sensitivity, height * sensitivity)
+                        if move is not None:
+                            target = cursor + move
+                            cursor[:] = np.clip(target, (left, top), (left + width - 1, top + height - 1))
+                            pinned += bool((cursor != target).any())
+                    else:
+                        move = absolute_move(track, finger_x, finger_y, mapping, smoothing, threshold)
+                        if move is not None:
+                            cursor[:] = move
+                    positions[index] = cursor
+                travel = float(np.hypot(*(positions[-1] - origin)))
+                results[mode].append((acquisition_time(times, positions, radius), travel, pinned))
+    return results
+
+
+def parse_desktop(value):
+    """WIDTHxHEIGHT[+LEFT+TOP] -> (left, top, width, height)"""
+    size, _, offset = value.partition('+')
+    width, height = (int(part) for part in size.lower().split('x'))
+    left, top = (int(part) for part in offset.split('+')) if offset else (0, 0)
+    return (left, top, width, height)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Absolute pointer mapping tools")
+    sub = parser.add_subparsers(dest='command', required=True)
+    replay_parser = sub.add_parser('replay', help="Target acquisition of relative vs. absolute mode on sessions")
+    replay_parser.add_argument('directory', help="Session log directory (main.py --session-log)")
+    replay_parser.add_argument('--desktop', type=parse_desktop, default=None,
+                               help="WIDTHxHEIGHT[+LEFT+TOP] (default: this machine's virtual desktop)")
+    replay_parser.add_argument('--calibration', default=None, help="Calibration file (default: the saved one)")
+    replay_parser.add_argument('--hand', default='Right', choices=('Left', 'Right'))
+    replay_parser.add_argument('--sensitivity', type=float, default=3.0)
+    replay_parser.add_argument('--smoothing', type=float, default=0.85)
+    replay_parser.add_argument('--threshold', type=float, default=0.001)
+    replay_parser.add_argument('--radius', type=int, default=20, help="Pixels around the end point that count as on target")
+    args = parser.parse_args()
+
+    from session_log import SessionLog
+    corners = None
+    if args.calibration:
+        corners = load_calibration(args.calibration)
+    else:
+        import model_registry
+        corners = load_calibration(os.path.join(model_registry.get_cache_dir(), 'pointer_calibration.json'))
+    if corners is None:
+        print("No calibration found - using the default interaction rectangle")
+        corners = DEFAULT_CAMERA_RECT
+    desktop = args.desktop or virtual_desktop((1920, 1080))
+    mapping = PointerMapping(corners, desktop)
+    print(mapping.describe())
+
+    results = replay(SessionLog(args.directory), mapping, args.hand, args.smoothing, args.threshold,
+                     args.sensitivity, args.radius)
+    if not results['relative']:
+        print("No pointing runs in the recordings")
+        return 1
+    print(f"\n{'mode':<10} {'runs':>6} {'acq p50 s':>10} {'acq p90 s':>10} {'travel p50 px':>14} "
+          f"{'travel p90 px':>14} {'edge-pinned':>12}")
+    for mode, rows in results.items():
+        rows = np.array(rows, dtype=np.float64)
+        print(f"{mode:<10} {len(rows):>6} {np.percentile(rows[:, 0], 50):>10.2f} {np.percentile(rows[:, 0], 90):>10.2f} "
+              f"{np.percentile(rows[:, 1], 50):>14.0f} {np.percentile(rows[:, 1], 90):>14.0f} "
+              f"{np.mean(rows[:, 2] > 0):>12.0%}")
+    print("\nAcquisition is the time from the start of a pointing run until the cursor stays within "
+          f"{args.radius}px of where the run ends. Edge-pinned runs hit the desktop edge and would need a "
+          "re-clutch. The recorded hand motion was made under the mode it was recorded with, so the other "
+          "mode's figures are a replay, not a user study.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
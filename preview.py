@@ -0,0 +1,50 @@
+"""
+Reusable Tk preview surface.
+
+Creating a new ImageTk.PhotoImage (and a new PIL image) on every frame
+allocates a Tk image and forces Tcl-side image recreation each time, which
+shows up as allocator churn over long sessions. The surface keeps one PIL
+image and one PhotoImage per resolution and updates their pixels in place.
+"""
+import numpy as np
+from PIL import Image, ImageTk
+
+
+class PreviewSurface:
+    """Show frames in a Tk label by updating a persistent PhotoImage in place."""
+
+    def __init__(self, label):
+        self.label = label
+        self.surfaces = {}  # (width, height) -> (PIL image, PhotoImage)
+        self.current_size = None
+
+    def _get_surface(self, size):
+        surface = self.surfaces.get(size)
+        if surface is None:
+            image = Image.new('RGB', size)
+            photo = ImageTk.PhotoImage(image=image)
+            surface = (image, photo)
+            self.surfaces[size] = surface
+        return surface
+
+    def show(self, frame):
+        """Display a (height, width, 3) uint8 frame"""
+        height, width = frame.shape[:2]
+        size = (width, height)
+        image, photo = self._get_surface(size)
+
+        # Copy the pixels into the existing buffers - no new PIL or Tk image
+        image.frombytes(np.ascontiguousarray(frame))
+        photo.paste(image)
+
+        # Only touch the label when the resolution (and so the PhotoImage) changes
+        if size != self.current_size:
+            self.label.config(image=photo)
+            self.label.image = photo  # Keep a reference
+            self.current_size = size
+
+    def clear(self):
+        """Blank the label (surfaces are kept for the next start)"""
+        self.label.config(image='')
+        self.label.image = None
+        self.current_size = None
@@ -0,0 +1,113 @@
+"""
+Closed-loop quality controller that holds a target frame latency.
+
+The controller watches the measured end-to-end frame latency (frame grabbed
+to preview shown) and steps through a ladder of quality levels, from full
+quality to the cheapest settings, to keep the p95 latency at or below the
+user-set target. Weak hardware settles on a cheap level, strong hardware
+stays at full quality.
+"""
+from collections import deque
+
+import numpy as np
+
+# Quality ladder, best first. Each level is cheaper than the previous one.
+# - input_scale: resize factor applied to the frame before detection
+# - detect_every: run the landmarker every N frames, reuse the last result in between
+# - preview_every: draw and show the preview every N frames
+# - min_hand_detection_confidence: higher rejects weak palm candidates early,
+#   so fewer landmark passes run (changing it rebuilds the HandLandmarker)
+QUALITY_LEVELS = [
+    {'input_scale': 1.0, 'detect_every': 1, 'preview_every': 1, 'min_hand_detection_confidence': 0.7},
+    {'input_scale': 0.75, 'detect_every': 1, 'preview_every': 1, 'min_hand_detection_confidence': 0.7},
+    {'input_scale': 0.75, 'detect_every': 1, 'preview_every': 2, 'min_hand_detection_confidence': 0.7},
+    {'input_scale': 0.5, 'detect_every': 1, 'preview_every': 2, 'min_hand_detection_confidence': 0.7},
+    {'input_scale': 0.5, 'detect_every': 2, 'preview_every': 2, 'min_hand_detection_confidence': 0.7},
+    {'input_scale': 0.5, 'detect_every': 2, 'preview_every': 3, 'min_hand_detection_confidence': 0.8},
+    {'input_scale': 0.35, 'detect_every': 3, 'preview_every': 3, 'min_hand_detection_confidence': 0.8},
+]
+
+DEFAULT_TARGET_LATENCY_MS = 40.0
+
+
+class QualityController:
+    """Adjust quality levels to hold a p95 frame latency target."""
+
+    def __init__(self, target_latency_ms=DEFAULT_TARGET_LATENCY_MS, window=60, evaluate_every=30):
+        self.target_latency_ms = target_latency_ms
+        self.enabled = True
+        self.level = 0
+        self.latencies = deque(maxlen=window)  # Recent end-to-end latencies (ms)
+        self.evaluate_every = evaluate_every  # Frames between decisions
+        self.frames_since_decision = 0
+        self.headroom_windows = 0  # Consecutive windows well under target
+        self.upgrade_after_windows = 3  # Require sustained headroom before raising quality
+        self.headroom_ratio = 0.6  # "Well under target" = p95 below 60% of target
+        self.last_decision = "Holding full quality"
+        self.last_p95 = 0.0  # p95 of the last evaluated window (shown in the GUI)
+
+    @property
+    def settings(self):
+        """Settings for the current level (full quality when disabled)"""
+        if not self.enabled:
+            return QUALITY_LEVELS[0]
+        return QUALITY_LEVELS[self.level]
+
+    def p95(self):
+        if not self.latencies:
+            return 0.0
+        return float(np.percentile(self.latencies, 95))
+
+    def set_enabled(self, enabled):
+        self.enabled = enabled
+        self.reset()
+        self.level = 0
+        self.last_decision = "Adaptive quality on" if enabled else "Adaptive quality off (full quality)"
+
+    def reset(self):
+        """Forget measurements, e.g. after the camera restarts or the target changes"""
+        self.latencies.clear()
+        self.frames_since_decision = 0
+        self.headroom_windows = 0
+
+    def record(self, latency_ms):
+        """Record one frame's latency. Returns True if the quality level changed."""
+        self.latencies.append(latency_ms)
+        if not self.enabled:
+            return False
+
+        self.frames_since_decision += 1
+        if self.frames_since_decision < self.evaluate_every:
+            return False
+        self.frames_since_decision = 0
+
+        p95 = self.p95()
+        self.last_p95 = p95
+        if p95 > self.target_latency_ms and self.level < len(QUALITY_LEVELS) - 1:
+            self.level += 1
+            self.headroom_windows = 0
+            self.last_decision = f"p95 {p95:.0f}ms > {self.target_latency_ms:.0f}ms: lowered to level {self.level}"
+            # Old measurements describe the previous level
+            self.latencies.clear()
+            return True
+
+        if p95 < self.target_latency_ms * self.headroom_ratio and self.level > 0:
+            self.headroom_windows += 1
+            if self.headroom_windows >= self.upgrade_after_windows:
+                self.level -= 1
+                self.headroom_windows = 0
+                self.last_decision = f"p95 {p95:.0f}ms has headroom: raised to level {self.level}"
+                self.latencies.clear()
+                return True
+        else:
+            self.headroom_windows = 0
+
+        return False
+
+    def describe(self):
+        """One-line status for the GUI"""
+        s = self.settings
+        return (f"Quality L{self.level if self.enabled else 0}: scale {s['input_scale']:.2f}, "
+                f"detect 1/{s['detect_every']}, preview 1/{s['preview_every']}, "
+                f"conf {s['min_hand_detection_confidence']:.1f} | p95 {self.last_p95:.0f}ms "
+                f"(target {self.target_latency_ms:.0f}ms) | {self.last_decision}")
@@ -0,0 +1,111 @@
+"""
+Continuous, velocity-based scrolling.
+
+The frame loop only sets a target velocity (scroll units per second). A
+timer thread moves the actual velocity towards the target with
+acceleration/deceleration ramps and emits small scroll events at a steady
+rate, carrying the fractional remainder between ticks so slow speeds still
+scroll smoothly. The (blocking) scroll call runs on the timer thread, never
+on the frame loop.
+
+A target that is not refreshed within `hold_time` is treated as zero, so
+scrolling winds down by itself when the palm disappears or frames stop.
+"""
+import threading
+import time
+
+DEFAULT_RATE_HZ = 60
+DEFAULT_RAMP_TIME = 0.25  # Seconds from standstill to full speed (and back)
+DEFAULT_HOLD_TIME = 0.15  # Seconds a target stays valid without being refreshed
+
+
+class ScrollEngine:
+    """Emit scroll events from a target velocity on a steady timer."""
+
+    def __init__(self, scroll_fn, rate_hz=DEFAULT_RATE_HZ, ramp_time=DEFAULT_RAMP_TIME, hold_time=DEFAULT_HOLD_TIME,
+                 error_fn=None):
+        self.scroll_fn = scroll_fn  # Called with a non-zero int (positive = up)
+        self.error_fn = error_fn  # Called with the exception when scroll_fn fails (default: print)
+        self.rate_hz = rate_hz
+        self.ramp_time = ramp_time
+        self.hold_time = hold_time
+
+        self.target = 0.0  # Units per second, set by the frame loop
+        self.target_time = 0.0
+        self.velocity = 0.0
+        self.full_speed = 0.0  # Magnitude of the last non-zero target - sets the ramp slope
+        self.remainder = 0.0  # Fraction of a unit not yet emitted
+        self.emitted = 0  # Scroll calls made (for stats)
+
+        self.thread = None
+        self.stop_event = threading.Event()
+
+    def start(self):
+        if self.thread is not None:
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="ScrollEngine", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(1.0)
+            self.thread = None
+        self.halt()
+
+    def set_target(self, velocity):
+        """Set the desired scroll velocity (units/s, positive = up). Call every frame while scrolling."""
+        self.target = float(velocity)
+        self.target_time = time.perf_counter()
+
+    def halt(self):
+        """Stop immediately, without a deceleration ramp"""
+        self.target = 0.0
+        self.velocity = 0.0
+        self.remainder = 0.0
+
+    def step(self, dt, now):
+        """Advance by dt seconds. Returns the whole units to emit (0 for none)."""
+        target = self.target if now - self.target_time <= self.hold_time else 0.0
+
+        # Linear ramps: going from standstill to full speed (or back) takes ramp_time
+        if target:
+            self.full_speed = abs(target)
+        max_change = self.full_speed * dt / max(self.ramp_time, 1e-3)
+        delta = target - self.velocity
+        if abs(delta) <= max_change:
+            self.velocity = target
+        else:
+            self.velocity += max_change if delta > 0 else -max_change
+
+        if self.velocity == 0.0:
+            self.remainder = 0.0
+            return 0
+        self.remainder += self.velocity * dt
+        units = int(self.remainder)  # Truncates towards zero for both directions
+        self.remainder -= units
+        return units
+
+    def _run(self):
+        interval = 1.0 / self.rate_hz
+        last = time.perf_counter()
+        next_tick = last + interval
+        while not self.stop_event.is_set():
+            delay = next_tick - time.perf_counter()
+            if delay > 0 and self.stop_event.wait(delay):
+                break
+            now = time.perf_counter()
+            units = self.step(now - last, now)
+            last = now
+            # Fixed schedule (no drift), but don't try to catch up after a stall
+            next_tick = max(next_tick + interval, now)
+            if units:
+                try:
+                    self.scroll_fn(units)
+                    self.emitted += 1
+                except Exception as e:
+                    if self.error_fn:
+                        self.error_fn(e)
+                    else:
+                        print(f"Error scrolling: {e}")
@@ -0,0 +1,431 @@
+"""
+Compact session log for tuning data.
+
+Every camera session is written as one segment directory of append-only
+column files plus a small sidecar index:
+
+    session-YYYYmmdd-HHMMSS-ffffff-<pid>[-<n>]/
+        meta.json          column dtypes/shapes, frame count, time range
+        timestamp.bin      float64 (N,)         time.time() per frame
+        state.bin          uint8   (N,)         control state code
+        hand_count.bin     uint8   (N,)
+        gesture.bin        uint8   (N, 2)       per hand slot (0 left, 1 right), NO_HAND if absent
+        palm.bin           int8    (N, 2)       1 front, 0 back, -1 n/a
+        landmarks.bin      float16 (N, 2, 21, 3)
+        gesture_runs.bin   index: runs of equal gesture per hand slot
+        transitions.bin    index: control state changes
+        time_index.bin     index: every TIME_INDEX_STRIDE-th timestamp
+
+Columns are raw little-endian arrays, so readers map them with numpy.memmap
+and never load a file into RAM. Gesture and state codes are the ones used by
+the gesture event stream. Landmarks are stored as float16 (normalized
+coordinates, ~0.0005 resolution) to keep weeks of sessions at ~260 bytes per
+frame.
+
+Queries that only need the index (state transitions, gesture flicker) touch
+a few bytes per run instead of every frame; anything else can scan columns
+chunk by chunk with SessionLog.scan().
+"""
+import json
+import os
+import time
+
+import numpy as np
+
+from gesture_stream import CONTROL_STATES, GESTURES, NUM_LANDMARKS, _GESTURE_CODES, _STATE_CODES
+
+FORMAT_VERSION = 1
+NO_HAND = 255  # Gesture code for an empty hand slot
+HAND_SLOTS = 2  # 0 = left, 1 = right
+TIME_INDEX_STRIDE = 4096
+FLUSH_FRAMES = 256  # Rows buffered in memory before they are appended to the column files
+
+COLUMNS = {
+    'timestamp': ('<f8', ()),
+    'state': ('u1', ()),
+    'hand_count': ('u1', ()),
+    'gesture': ('u1', (HAND_SLOTS,)),
+    'palm': ('i1', (HAND_SLOTS,)),
+    'landmarks': ('<f2', (HAND_SLOTS, NUM_LANDMARKS, 3)),
+}
+
+GESTURE_RUN_DTYPE = np.dtype([('start', '<u8'), ('length', '<u4'), ('hand', 'u1'), ('gesture', 'u1')])
+TRANSITION_DTYPE = np.dtype([('frame', '<u8'), ('timestamp', '<f8'), ('previous', 'u1'), ('state', 'u1')])
+
+
+def gesture_code(name):
+    return _GESTURE_CODES[name]
+
+
+def state_code(name):
+    return _STATE_CODES[name]
+
+
+class SessionLogWriter:
+    """Append frames to a new segment. Single writer (the frame loop); close() finalizes the index."""
+
+    def __init__(self, root_dir):
+        self.root_dir = root_dir
+        self.path = self._create_segment_dir(root_dir)
+
+        # 'xb': a segment is never appended to by a second writer
+        self.files = {column: open(os.path.join(self.path, column + '.bin'), 'xb') for column in COLUMNS}
+        self.runs_file = open(os.path.join(self.path, 'gesture_runs.bin'), 'xb')
+        self.transitions_file = open(os.path.join(self.path, 'transitions.bin'), 'xb')
+        self.time_index_file = open(os.path.join(self.path, 'time_index.bin'), 'xb')
+
+        # Row buffers, flushed every FLUSH_FRAMES frames
+        self.buffers = {column: np.zeros((FLUSH_FRAMES,) + shape, dtype=dtype)
+                        for column, (dtype, shape) in COLUMNS.items()}
+        self.buffered = 0
+        self.frame_count = 0
+        self.first_timestamp = None
+        self.last_timestamp = None
+
+        # Open gesture run per hand slot: [start frame, gesture code]
+        self.open_runs = [None] * HAND_SLOTS
+        self.last_state = None
+        self.closed = False
+        self._write_meta()
+
+    @staticmethod
+    def _create_segment_dir(root_dir):
+        """New, empty segment directory - sessions restarted within the same microsecond get a counter"""
+        os.makedirs(root_dir, exist_ok=True)
+        now = time.time()
+        base = time.strftime("session-%Y%m%d-%H%M%S", time.localtime(now))
+        base += f"-{int(now % 1 * 1e6):06d}-{os.getpid()}"
+        attempt = 0
+        while True:
+            path = os.path.join(root_dir, base if attempt == 0 else f"{base}-{attempt}")
+            try:
+                os.mkdir(path)
+                return path
+            except FileExistsError:
+                attempt += 1
+
+    def _write_meta(self):
+        meta = {
+            'version': FORMAT_VERSION,
+            'columns': {column: {'dtype': dtype, 'shape': list(shape)} for column, (dtype, shape) in COLUMNS.items()},
+            'control_states': list(CONTROL_STATES),
+            'gestures': list(GESTURES),
+            'frames': self.frame_count,
+            'first_timestamp': self.first_timestamp,
+            'last_timestamp': self.last_timestamp,
+            'time_index_stride': TIME_INDEX_STRIDE,
+            'closed': self.closed,
+        }
+        tmp_path = os.path.join(self.path, 'meta.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp_path, os.path.join(self.path, 'meta.json'))
+
+    def append(self, control_state, hands, timestamp=None):
+        """Record one frame.
+
+        Args:
+            hands: list of (is_right_hand, gesture_name, palm_facing, landmarks) - the
+                   gesture event stream's hand tuple. A second hand with the same
+                   handedness as an earlier one is dropped.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        frame = self.frame_count
+        row = self.buffered
+        buffers = self.buffers
+
+        buffers['timestamp'][row] = timestamp
+        state = _STATE_CODES[control_state]
+        buffers['state'][row] = state
+        gestures = buffers['gesture'][row]
+        palms = buffers['palm'][row]
+        points = buffers['landmarks'][row]
+        gestures[:] = NO_HAND
+        palms[:] = -1
+        points[:] = 0
+        count = 0
+        for is_right_hand, gesture_name, palm_facing, landmarks in hands:
+            slot = 1 if is_right_hand else 0
+            if gestures[slot] != NO_HAND:
+                continue
+            gestures[slot] = _GESTURE_CODES.get(gesture_name, 0)
+            palms[slot] = -1 if palm_facing is None else int(bool(palm_facing))
+            points[slot] = [(lm.x, lm.y, lm.z) for lm in landmarks]
+            count += 1
+        buffers['hand_count'][row] = count
+
+        # Index maintenance - only changes are written
+        if state != self.last_state:
+            if self.last_state is not None:
+                record = np.array([(frame, timestamp, self.last_state, state)], dtype=TRANSITION_DTYPE)
+                self.transitions_file.write(record.tobytes())
+            self.last_state = state
+        for slot in range(HAND_SLOTS):
+            code = int(gestures[slot])
+            run = self.open_runs[slot]
+            if run is None:
+                self.open_runs[slot] = [frame, code]
+            elif run[1] != code:
+                self._write_run(slot, run[0], frame - run[0], run[1])
+                self.open_runs[slot] = [frame, code]
+        if frame % TIME_INDEX_STRIDE == 0:
+            self.time_index_file.write(np.array([timestamp], dtype='<f8').tobytes())
+
+        if self.first_timestamp is None:
+            self.first_timestamp = timestamp
+        self.last_timestamp = timestamp
+        self.frame_count += 1
+        self.buffered += 1
+        if self.buffered == FLUSH_FRAMES:
+            self.flush()
+
+    def _write_run(self, slot, start, length, code):
+        record = np.array([(start, length, slot, code)], dtype=GESTURE_RUN_DTYPE)
+        self.runs_file.write(record.tobytes())
+
+    def flush(self):
+        if self.buffered:
+            for column, f in self.files.items():
+                f.write(self.buffers[column][:self.buffered].tobytes())
+            self.buffered = 0
+        for f in self.files.values():
+            f.flush()
+        self.runs_file.flush()
+        self.transitions_file.flush()
+        self.time_index_file.flush()
+
+    def close(self):
+        if self.closed:
+            return
+        # Close the open runs so the index covers every frame
+        for slot, run in enumerate(self.open_runs):
+            if run is not None:
+                self._write_run(slot, run[0], self.frame_count - run[0], run[1])
+        self.open_runs = [None] * HAND_SLOTS
+        self.flush()
+        for f in list(self.files.values()) + [self.runs_file, self.transitions_file, self.time_index_file]:
+            f.close()
+        self.closed = True
+        self._write_meta()
+
+    def describe(self):
+        return f"Session log: {self.frame_count} frames -> {self.path}"
+
+
+def _map(path, dtype, shape, rows=None):
+    """Read-only memmap of a column/index file (empty array for empty files)"""
+    dtype = np.dtype(dtype)
+    row_size = dtype.itemsize * int(np.prod(shape, dtype=np.int64))
+    available = os.path.getsize(path) // row_size if os.path.exists(path) else 0
+    if rows is None or rows > available:
+        rows = available
+    if rows == 0:
+        return np.zeros((0,) + tuple(shape), dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', shape=(rows,) + tuple(shape))
+
+
+def build_gesture_runs(gesture, chunk_frames=1 << 22):
+    """Recompute the gesture run index from a (N, HAND_SLOTS) gesture column, chunk by chunk"""
+    runs = []
+    frames = len(gesture)
+    for slot in range(HAND_SLOTS):
+        run_start = 0
+        run_code = None
+        for chunk_start in range(0, frames, chunk_frames):
+            codes = np.asarray(gesture[chunk_start:chunk_start + chunk_frames, slot])
+            if run_code is None:
+                run_code = int(codes[0])
+            # Frames (relative to the chunk) where the code differs from the one before
+            previous = np.concatenate(([run_code], codes[:-1]))
+            changes = np.flatnonzero(codes != previous)
+            for change in changes:
+                frame = chunk_start + int(change)
+                runs.append((run_start, frame - run_start, slot, run_code))
+                run_start = frame
+                run_code = int(codes[change])
+        if run_code is not None:
+            runs.append((run_start, frames - run_start, slot, run_code))
+    result = np.array(runs, dtype=GESTURE_RUN_DTYPE)
+    return result[np.lexsort((result['start'], result['hand']))] if len(result) else result
+
+
+class Segment:
+    """Zero-copy view of one recorded session."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'meta.json')) as f:
+            self.meta = json.load(f)
+        if self.meta.get('version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported session log version in {path}")
+
+        columns = self.meta['columns']
+        # A crash can leave columns with different lengths - only whole frames count
+        frames = min(os.path.getsize(os.path.join(path, column + '.bin')) //
+                     (np.dtype(spec['dtype']).itemsize * int(np.prod(spec['shape'], dtype=np.int64)))
+                     for column, spec in columns.items())
+        self.frames = frames
+        self.columns = {column: _map(os.path.join(path, column + '.bin'), spec['dtype'], spec['shape'], frames)
+                        for column, spec in columns.items()}
+
+        self.transitions = _map(os.path.join(path, 'transitions.bin'), TRANSITION_DTYPE, ())
+        if self.meta.get('closed'):
+            self.gesture_runs = _map(os.path.join(path, 'gesture_runs.bin'), GESTURE_RUN_DTYPE, ())
+        else:
+            # Runs still open when the app stopped were never written - rebuild from the column
+            self.gesture_runs = build_gesture_runs(self.columns['gesture'])
+        self.time_index = _map(os.path.join(path, 'time_index.bin'), '<f8', ())
+        self.stride = self.meta.get('time_index_stride', TIME_INDEX_STRIDE)
+
+        timestamps = self.columns['timestamp']
+        self.first_timestamp = float(timestamps[0]) if frames else None
+        self.last_timestamp = float(timestamps[frames - 1]) if frames else None
+
+    def __len__(self):
+        return self.frames
+
+    def __getitem__(self, column):
+        return self.columns[column]
+
+    def frame_range(self, start_time=None, end_time=None):
+        """(first, stop) frame indices with start_time <= timestamp < end_time"""
+        return self._time_to_frame(start_time, 0), self._time_to_frame(end_time, self.frames)
+
+    def _time_to_frame(self, timestamp, default):
+        if timestamp is None:
+            return default
+        # Narrow with the sparse index, then search one stride of the column
+        block = max(int(np.searchsorted(self.time_index, timestamp, side='left')) - 1, 0)
+        lo = block * self.stride
+        hi = min(lo + 2 * self.stride, self.frames)
+        return lo + int(np.searchsorted(self.columns['timestamp'][lo:hi], timestamp, side='left'))
+
+    def runs(self, hand=None):
+        """Gesture runs, optionally for one hand slot ('Left'/'Right' or 0/1)"""
+        if hand is None:
+            return self.gesture_runs
+        slot = hand if isinstance(hand, int) else (1 if hand == 'Right' else 0)
+        return self.gesture_runs[self.gesture_runs['hand'] == slot]
+
+
+class SessionLog:
+    """All segments under a directory, queried without loading column data."""
+
+    def __init__(self, root_dir):
+        self.root_dir = root_dir
+        self.segments = []
+        for name in sorted(os.listdir(root_dir)):
+            path = os.path.join(root_dir, name)
+            if os.path.isfile(os.path.join(path, 'meta.json')):
+                try:
+                    self.segments.append(Segment(path))
+                except (ValueError, OSError) as e:
+                    print(f"Skipping session log segment {path}: {e}")
+
+    @property
+    def frames(self):
+        return sum(segment.frames for segment in self.segments)
+
+    def _segments_between(self, start_time, end_time):
+        for segment in self.segments:
+            if not segment.frames:
+                continue
+            if start_time is not None and segment.last_timestamp < start_time:
+                continue
+            if end_time is not None and segment.first_timestamp >= end_time:
+                continue
+            yield segment
+
+    def state_transitions(self, to_state=None, from_state=None, start_time=None, end_time=None):
+        """Yield (segment, transitions array) for matching control state changes, e.g. to_state='HARD_DISABLED'"""
+        for segment in self._segments_between(start_time, end_time):
+            transitions = segment.transitions
+            mask = np.ones(len(transitions), dtype=bool)
+            if to_state is not None:
+                mask &= transitions['state'] == _STATE_CODES[to_state]
+            if from_state is not None:
+                mask &= transitions['previous'] == _STATE_CODES[from_state]
+            if start_time is not None:
+                mask &= transitions['timestamp'] >= start_time
+            if end_time is not None:
+                mask &= transitions['timestamp'] < end_time
+            if mask.any():
+                yield segment, transitions[mask]
+
+    def gesture_runs(self, gesture, hand=None, max_length=None):
+        """Yield (segment, runs array) of runs of one gesture, optionally no longer than max_length frames"""
+        code = _GESTURE_CODES[gesture]
+        for segment in self.segments:
+            runs = segment.runs(hand)
+            mask = runs['gesture'] == code
+            if max_length is not None:
+                mask &= runs['length'] <= max_length
+            if mask.any():
+                yield segment, runs[mask]
+
+    def gesture_flips(self, gesture, hand='Right', within=3):
+        """Yield (segment, frame indices) where a gesture flipped on and back off (or off and back
+        on) within `within` frames - e.g. gesture_flips('FIST', within=3) for unstable is_fist.
+
+        Works from the run index only: a flip is a run shorter than `within` frames whose
+        neighbours on both sides differ from it, where one side of the flip is the gesture.
+        """
+        code = _GESTURE_CODES[gesture]
+        for segment in self.segments:
+            runs = segment.runs(hand)
+            if len(runs) < 3:
+                continue
+            is_gesture = runs['gesture'] == code
+            middle = slice(1, -1)
+            short = runs['length'][middle] <= within
+            # Fist blip inside a non-fist stretch, or a non-fist blip inside a fist stretch
+            blip_on = is_gesture[middle] & ~is_gesture[:-2] & ~is_gesture[2:]
+            blip_off = ~is_gesture[middle] & is_gesture[:-2] & is_gesture[2:]
+            mask = short & (blip_on | blip_off)
+            if mask.any():
+                yield segment, runs['start'][middle][mask]
+
+    def scan(self, columns, start_time=None, end_time=None, chunk_frames=1 << 20):
+        """Yield (segment, first frame, {column: chunk}) over frames in the time range.
+
+        Chunks are memmap slices - only the pages a predicate touches are read.
+        """
+        for segment in self._segments_between(start_time, end_time):
+            first, stop = segment.frame_range(start_time, end_time)
+            for chunk_start in range(first, stop, chunk_frames):
+                chunk_stop = min(chunk_start + chunk_frames, stop)
+                yield segment, chunk_start, {column: segment[column][chunk_start:chunk_stop] for column in columns}
+
+
+def main():
+    """Summarize a session log directory: python session_log.py DIR"""
+    import argparse
+    parser = argparse.ArgumentParser(description="Query recorded gesture sessions")
+    parser.add_argument('directory')
+    parser.add_argument('--transitions', metavar='STATE', help="List transitions into STATE (e.g. HARD_DISABLED)")
+    parser.add_argument('--flips', metavar='GESTURE', help="Count frames where GESTURE flipped within --within frames")
+    parser.add_argument('--hand', default='Right', choices=('Left', 'Right'))
+    parser.add_argument('--within', type=int, default=3)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    log = SessionLog(args.directory)
+    print(f"{len(log.segments)} segments, {log.frames} frames")
+    if args.transitions:
+        total = 0
+        for segment, transitions in log.state_transitions(to_state=args.transitions):
+            total += len(transitions)
+            for record in transitions[:5]:
+                when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(record['timestamp']))
+                print(f"  {os.path.basename(segment.path)} frame {record['frame']} at {when}: "
+                      f"{CONTROL_STATES[record['previous']]} -> {CONTROL_STATES[record['state']]}")
+        print(f"{total} transitions into {args.transitions}")
+    if args.flips:
+        total = sum(len(frames) for _segment, frames in log.gesture_flips(args.flips, args.hand, args.within))
+        print(f"{total} {args.hand} {args.flips} flips within {args.within} frames")
+    print(f"Query time {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""
+Long-session soak test.
+
+Runs the real app - Tk window, frame pacing, detection, gesture processing,
+preview rendering - for hours from a looping recorded clip or synthetic
+frames, delivered faster than real time, and samples over the run:
+- process RSS
+- tracemalloc traced memory, and the lines whose allocations grew most
+- live (gc-tracked) object counts by type
+- capture-to-processed frame latency percentiles per sample window
+- exceptions caught by the frame loop (hgmc_errors_total)
+
+The first minutes are a warm-up (caches, model, allocator pools) and are
+excluded. Drift is the least-squares slope per hour over the remaining
+samples, and the p95 latency of the last quarter of the run relative to the
+first quarter. The exit status is 1 when any drift exceeds its bound.
+
+Mouse and keyboard output is counted instead of performed unless
+--live-input is given, so the desktop stays usable during a soak.
+
+Results go to the output directory:
+    soak-<time>.csv   one row per sample
+    soak-<time>.txt   drift verdicts, top growing allocators and object types
+
+Tk needs a display; on a headless Linux box run it under xvfb-run.
+
+Usage:
+    python soak_test.py --hours 8 --speed 3
+    python soak_test.py --video clip.mp4 --detector landmarker --hours 2
+"""
+import argparse
+import csv
+import gc
+import os
+import sys
+import time
+import tkinter as tk
+import tracemalloc
+from collections import Counter
+
+import numpy as np
+import pyautogui
+
+from frame_sources import SyntheticSource, VideoFileSource
+from main import HandGestureMouseControl
+from metrics import rss_bytes
+
+CSV_COLUMNS = ('elapsed_s', 'frames', 'rss_mb', 'traced_mb', 'objects',
+               'latency_p50_ms', 'latency_p95_ms', 'latency_p99_ms', 'errors')
+
+
+class InputRecorder:
+    """Count pyautogui output instead of performing it."""
+
+    FUNCTIONS = ('click', 'moveRel', 'moveTo', 'scroll', 'hotkey')
+
+    def __init__(self):
+        self.calls = Counter()
+
+    def install(self):
+        for name in self.FUNCTIONS:
+            setattr(pyautogui, name, self._recorder(name))
+
+    def _recorder(self, name):
+        def record(*args, **kwargs):
+            self.calls[name] += 1
+        return record
+
+
+def slope_per_hour(elapsed, values):
+    """Least-squares growth per hour"""
+    if len(elapsed) < 2:
+        return 0.0
+    return float(np.polyfit(np.asarray(elapsed) / 3600.0, np.asarray(values, dtype=np.float64), 1)[0])
+
+
+class SoakRun:
+    """Drive the app from a capture source and sample it until the duration is up."""
+
+    def __init__(self, root, app, capture, args):
+        self.root = root
+        self.app = app
+        self.capture = capture
+        self.args = args
+        self.samples = []
+        self.latencies = []  # Seconds, current sample window
+        self.frames = 0
+        self.started = None
+        self.baseline_snapshot = None
+        self.baseline_types = None
+        self.last_snapshot = None
+        self.last_types = None
+
+        # Measure every processed frame on its way through the real update_frame
+        update_frame = app.update_frame
+
+        def timed_update_frame(frame, captured_at, frame_time=None):
+            update_frame(frame, captured_at, frame_time)
+            self.latencies.append(time.perf_counter() - captured_at)
+            self.frames += 1
+
+        app.update_frame = timed_update_frame
+        app.open_capture = lambda: capture
+
+    def start(self):
+        if self.args.trace_frames:
+            tracemalloc.start(self.args.trace_frames)
+        self.started = time.perf_counter()
+        self.app.toggle_camera()
+        self.root.after(int(self.args.sample_every * 1000), self.sample)
+        self.root.after(int(self.args.hours * 3600 * 1000), self.finish)
+
+    def sample(self):
+        elapsed = time.perf_counter() - self.started
+        gc.collect()
+        types = Counter(type(obj).__name__ for obj in gc.get_objects())
+        traced = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+        latencies = np.asarray(self.latencies) * 1000.0
+        self.latencies = []
+        p50, p95, p99 = np.percentile(latencies, (50, 95, 99)) if len(latencies) else (0.0, 0.0, 0.0)
+        row = {
+            'elapsed_s': round(elapsed, 1),
+            'frames': self.frames,
+            'rss_mb': round(rss_bytes() / 2 ** 20, 2),
+            'traced_mb': round(traced / 2 ** 20, 2),
+            'objects': sum(types.values()),
+            'latency_p50_ms': round(float(p50), 2),
+            'latency_p95_ms': round(float(p95), 2),
+            'latency_p99_ms': round(float(p99), 2),
+            'errors': sum(self.app.metrics.errors.values.values()),
+        }
+        self.samples.append(row)
+        print(f"[soak {elapsed / 60:.0f} min] rss {row['rss_mb']:.1f} MB, traced {row['traced_mb']:.1f} MB, "
+              f"{row['objects']} objects, p95 {row['latency_p95_ms']:.1f} ms, {row['errors']} errors")
+
+        # Only the post-warm-up baseline and the newest snapshot are kept
+        if elapsed >= self.args.warmup * 60:
+            snapshot = None
+            if tracemalloc.is_tracing():
+                # Leave out tracemalloc's own bookkeeping
+                snapshot = tracemalloc.take_snapshot().filter_traces(
+                    (tracemalloc.Filter(False, tracemalloc.__file__),))
+            if self.baseline_types is None:
+                self.baseline_snapshot, self.baseline_types = snapshot, types
+            self.last_snapshot, self.last_types = snapshot, types
+        self.root.after(int(self.args.sample_every * 1000), self.sample)
+
+    def finish(self):
+        if self.app.is_running:
+            self.app.toggle_camera()
+        self.root.quit()
+
+    def verdicts(self):
+        """(name, measured, bound, unit, passed) per drift check, judged after the warm-up"""
+        judged = [row for row in self.samples if row['elapsed_s'] >= self.args.warmup * 60]
+        if len(judged) < 4:
+            return None
+        elapsed = [row['elapsed_s'] for row in judged]
+        quarter = max(len(judged) // 4, 1)
+        first_p95 = np.mean([row['latency_p95_ms'] for row in judged[:quarter]])
+        last_p95 = np.mean([row['latency_p95_ms'] for row in judged[-quarter:]])
+        checks = [
+            ('rss growth', slope_per_hour(elapsed, [row['rss_mb'] for row in judged]),
+             self.args.max_rss_growth, 'MB/h'),
+            ('traced growth', slope_per_hour(elapsed, [row['traced_mb'] for row in judged]),
+             self.args.max_traced_growth, 'MB/h'),
+            ('object growth', slope_per_hour(elapsed, [row['objects'] for row in judged]),
+             self.args.max_object_growth, 'objects/h'),
+            ('p95 latency drift', last_p95 / max(first_p95, 1e-6),
+             self.args.max_latency_drift, 'x'),
+            ('frame loop errors', (judged[-1]['errors'] - judged[0]['errors']) * 3600.0 /
+             max(elapsed[-1] - elapsed[0], 1e-6), self.args.max_error_rate, 'errors/h'),
+        ]
+        return [(name, measured, bound, unit, measured <= bound) for name, measured, bound, unit in checks]
+
+    def report(self, input_calls):
+        lines = [f"{self.frames} frames processed, {self.capture.seq} delivered, "
+                 f"{len(self.samples)} samples"]
+        if input_calls is not None:
+            lines.append("Input calls (recorded, not performed): " +
+                         (", ".join(f"{name} {count}" for name, count in sorted(input_calls.items())) or "none"))
+        if not rss_bytes():
+            lines.append("RSS is not available on this platform")
+
+        verdicts = self.verdicts()
+        lines.append("")
+        if verdicts is None:
+            lines.append(f"FAIL: too few samples after the {self.args.warmup:g} min warm-up to judge drift")
+        else:
+            for name, measured, bound, unit, passed in verdicts:
+                lines.append(f"{'PASS' if passed else 'FAIL'}  {name:<18} {measured:10.2f} {unit:<10} "
+                             f"(bound {bound:g})")
+
+        if self.baseline_snapshot is not None and self.last_snapshot is not self.baseline_snapshot:
+            lines.append("\nTop allocation growth since warm-up")
+            for stat in self.last_snapshot.compare_to(self.baseline_snapshot, 'lineno')[:self.args.top]:
+                lines.append(f"  {stat.size_diff / 1024:+10.1f} KiB {stat.count_diff:+8d} blocks  "
+                             f"{stat.traceback[0]}")
+        if self.baseline_types is not None:
+            growth = Counter(self.last_types)
+            growth.subtract(self.baseline_types)
+            lines.append("\nTop object type growth since warm-up")
+            for name, count in growth.most_common(self.args.top):
+                if count <= 0:
+                    break
+                lines.append(f"  {count:+10d}  {name}")
+        passed = verdicts is not None and all(verdict[-1] for verdict in verdicts)
+        return "\n".join(lines), passed
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the app for hours and fail on memory or latency drift")
+    parser.add_argument('--hours', type=float, default=8.0)
+    parser.add_argument('--video', default=None, help="Looping clip to feed (default: synthetic frames)")
+    parser.add_argument('--detector', default=None, choices=('landmarker', 'gesture_recognizer', 'stub'),
+                        help="Detection backend (default: stub for synthetic frames, landmarker for a clip)")
+    parser.add_argument('--speed', type=float, default=3.0,
+                        help="Frame delivery rate as a multiple of the clip's frame rate")
+    parser.add_argument('--sample-every', type=float, default=60.0, help="Seconds between samples")
+    parser.add_argument('--warmup', type=float, default=10.0, help="Minutes excluded from drift judgement")
+    parser.add_argument('--trace-frames', type=int, default=1,
+                        help="tracemalloc traceback depth (0 disables tracemalloc - it slows allocation)")
+    parser.add_argument('--top', type=int, default=15, help="Allocators / object types listed in the report")
+    parser.add_argument('--max-rss-growth', type=float, default=20.0, help="MB per hour")
+    parser.add_argument('--max-traced-growth', type=float, default=10.0, help="MB per hour")
+    parser.add_argument('--max-object-growth', type=float, default=5000.0, help="Objects per hour")
+    parser.add_argument('--max-latency-drift', type=float, default=1.5,
+                        help="Allowed ratio of late to early p95 latency")
+    parser.add_argument('--max-error-rate', type=float, default=0.0, help="Frame loop exceptions per hour")
+    parser.add_argument('--live-input', action='store_true', help="Really move the mouse / click / scroll")
+    parser.add_argument('--output-dir', default='soak_results')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    detector = args.detector or ('landmarker' if args.video else 'stub')
+    if args.video:
+        capture = VideoFileSource(args.video, speed=args.speed, loop=True)
+        if not capture.isOpened():
+            print(f"Could not open {args.video}")
+            return 1
+    else:
+        capture = SyntheticSource(speed=args.speed)
+
+    recorder = None
+    if not args.live_input:
+        recorder = InputRecorder()
+        recorder.install()
+
+    root = tk.Tk()
+    app = HandGestureMouseControl(root, detector=detector)
+    run = SoakRun(root, app, capture, args)
+    print(f"Soak test: {args.hours:g} h, {detector} detector, "
+          f"{'clip ' + args.video if args.video else 'synthetic frames'} at {args.speed:g}x")
+    root.after(0, run.start)
+    root.mainloop()
+
+    report, passed = run.report(recorder.calls if recorder else None)
+    os.makedirs(args.output_dir, exist_ok=True)
+    base = os.path.join(args.output_dir, f"soak-{time.strftime('%Y%m%d-%H%M%S')}")
+    with open(base + '.csv', 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
+        writer.writeheader()
+        writer.writerows(run.samples)
+    with open(base + '.txt', 'w') as f:
+        f.write(report + "\n")
+    print(report)
+    print(f"Results written to {base}.csv / .txt")
+    root.destroy()
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+Startup benchmark for the packaged builds.
+
+Launches each build variant repeatedly with --startup-trace and reports,
+from process launch:
+    main             imports done, main() entered (includes one-file extraction)
+    window           main window on screen
+    first_detection  model loaded and one hand detection run
+
+The first launch of each variant is reported separately as "cold" (empty
+OS file cache, first-run model selection); the median of the remaining
+launches is the "warm" figure.
+
+Usage:
+    python build_exe.py --mode onefile
+    python build_exe.py --mode onedir
+    python build_exe.py --mode onedir --trim
+    python startup_benchmark.py
+    python startup_benchmark.py --runs 10 --variant source --variant onedir
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+MILESTONES = ('main', 'window', 'first_detection')
+APP_NAME = 'HandGestureMouseControl'
+EXE_SUFFIX = '.exe' if sys.platform == 'win32' else ''
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# name -> command (without the trace argument)
+VARIANTS = {
+    'source': [sys.executable, os.path.join(SCRIPT_DIR, 'main.py')],
+    'onefile': [os.path.join(SCRIPT_DIR, 'dist', APP_NAME + EXE_SUFFIX)],
+    'onedir': [os.path.join(SCRIPT_DIR, 'dist', 'onedir', APP_NAME, APP_NAME + EXE_SUFFIX)],
+    # build_exe.py --trim
+    'onefile-trim': [os.path.join(SCRIPT_DIR, 'dist', 'trim', APP_NAME + EXE_SUFFIX)],
+    'onedir-trim': [os.path.join(SCRIPT_DIR, 'dist', 'trim', 'onedir', APP_NAME, APP_NAME + EXE_SUFFIX)],
+}
+
+
+def launch(command, timeout):
+    """Run one traced launch. Returns {milestone: seconds since launch} or None on failure."""
+    fd, trace_path = tempfile.mkstemp(suffix='.json', prefix='startup-')
+    os.close(fd)
+    os.remove(trace_path)  # The app creates it when it is done
+    try:
+        launched = time.time()
+        process = subprocess.Popen(command + ['--startup-trace', trace_path])
+        try:
+            process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+            print(f"  timed out after {timeout:.0f}s")
+            return None
+        try:
+            with open(trace_path) as f:
+                trace = json.load(f)
+        except (OSError, ValueError):
+            print(f"  no startup trace (exit code {process.returncode})")
+            return None
+        return {name: trace[name] - launched for name in MILESTONES}
+    finally:
+        if os.path.exists(trace_path):
+            os.remove(trace_path)
+
+
+def run_variant(command, runs, timeout):
+    """(cold timings, [warm timings]) for one variant"""
+    cold = launch(command, timeout)
+    warm = []
+    for _ in range(runs):
+        timings = launch(command, timeout)
+        if timings is not None:
+            warm.append(timings)
+    return cold, warm
+
+
+def format_row(name, kind, timings):
+    return f"{name:<12} {kind:<12}" + "".join(f" {timings[milestone]:>16.2f}" for milestone in MILESTONES)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure launch-to-window and launch-to-first-detection")
+    parser.add_argument('--variant', action='append', choices=sorted(VARIANTS),
+                        help="Variant to measure (repeatable, default: every one that is built)")
+    parser.add_argument('--runs', type=int, default=5, help="Warm launches per variant")
+    parser.add_argument('--timeout', type=float, default=120.0, help="Seconds before a launch counts as failed")
+    parser.add_argument('--json', default=None, help="Also write the raw timings to this file")
+    args = parser.parse_args()
+
+    names = args.variant or [name for name, command in VARIANTS.items() if os.path.exists(command[-1])]
+    results = {}
+    for name in names:
+        command = VARIANTS[name]
+        if not os.path.exists(command[-1]):
+            build = name.replace('-trim', ' --trim')
+            print(f"{name}: {command[-1]} not found - build it with build_exe.py --mode {build}")
+            continue
+        print(f"{name}: 1 cold + {args.runs} warm launches")
+        cold, warm = run_variant(command, args.runs, args.timeout)
+        results[name] = {'cold': cold, 'warm': warm}
+
+    print(f"\nSeconds from launch{'':<6}" + "".join(f" {milestone:>16}" for milestone in MILESTONES))
+    for name, result in results.items():
+        if result['cold'] is not None:
+            print(format_row(name, 'cold', result['cold']))
+        if result['warm']:
+            median = {milestone: float(np.median([t[milestone] for t in result['warm']]))
+                      for milestone in MILESTONES}
+            print(format_row(name, f"warm (x{len(result['warm'])})", median))
+        if result['cold'] is None and not result['warm']:
+            print(f"{name:<12} failed")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0 if results and all(result['warm'] for result in results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
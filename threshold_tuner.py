@@ -0,0 +1,367 @@
+"""
+Gesture threshold auto-tuner.
+
+Fits the rule classifier's thresholds (GestureClassifier class attributes:
+pinch distance, fist finger/thumb distances, thumb length, the two
+thumb-to-palm ratios and the both-fists separation) to one user's labelled
+recordings - the <video>.landmarks.npz files written by offline_eval.py.
+
+Everything that does not depend on a threshold (landmark distances, the
+y-order tests) is measured once per hand. A candidate set of thresholds
+then only needs a few comparisons, so a batch of candidates is evaluated
+as (candidates x hands) boolean arrays, run through the same cascade order
+as get_gesture_name, and turned into one confusion matrix per candidate
+with a single bincount. There is no per-hand or per-candidate Python loop.
+
+The hand thresholds are searched jointly (random search or a full grid);
+the both-fists separation is swept afterwards on frames with two labelled
+hands, using the tuned fist thresholds. The result is written as a profile
+the app loads at startup (main.py --gesture-profile, default: the OS user).
+
+Usage:
+    python threshold_tuner.py eval_out/*.landmarks.npz --user alice
+    python threshold_tuner.py eval_out/*.landmarks.npz --grid 5 --objective accuracy
+"""
+import argparse
+import getpass
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from gestures import GestureClassifier
+from learned_classifier import split
+
+# get_gesture_name's order - the first predicate that holds wins
+CASCADE = ('THUMB OUT', 'FIST', 'POINTING', 'PINCH', 'OPEN PALM', 'VICTORY', 'OK SIGN', 'ROCK')
+UNKNOWN = "UNKNOWN"
+UNKNOWN_CODE = len(CASCADE)
+
+# Tuned per-hand thresholds -> search range
+SEARCH_SPACE = {
+    'click_threshold': (0.015, 0.06),
+    'fist_finger_distance': (0.05, 0.14),
+    'fist_thumb_distance': (0.06, 0.16),
+    'thumb_length_threshold': (0.04, 0.12),
+    'fist_thumb_out_ratio': (0.95, 1.25),
+    'thumb_out_ratio': (1.0, 1.3),
+}
+SEPARATION_RANGE = (0.1, 0.7)
+THRESHOLDS = tuple(SEARCH_SPACE) + ('both_fists_separation',)
+
+MAX_CELLS = 1 << 24  # Candidate x hand elements per batch (bounds memory)
+PROFILE_VERSION = 1
+
+
+def default_thresholds():
+    return {name: float(getattr(GestureClassifier, name)) for name in THRESHOLDS}
+
+
+def profile_dir():
+    import model_registry
+    return os.path.join(model_registry.get_cache_dir(), "gesture_profiles")
+
+
+def profile_path(user):
+    return os.path.join(profile_dir(), f"{user}.json")
+
+
+def list_profiles():
+    """Users with a saved profile"""
+    try:
+        return sorted(name[:-len('.json')] for name in os.listdir(profile_dir()) if name.endswith('.json'))
+    except OSError:
+        return []
+
+
+def load_profile(path):
+    """{threshold: value} from a profile file, or None when there is no usable profile"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            profile = json.load(f)
+        if profile.get('version') != PROFILE_VERSION:
+            return None
+        return {name: float(value) for name, value in profile['thresholds'].items() if name in THRESHOLDS}
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def save_profile(path, profile):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(profile, f, indent=2)
+
+
+def load_recordings(paths):
+    """Labelled hands of offline_eval archives: (points, labels, pairs).
+
+    pairs holds index pairs of hands detected together in a frame with
+    exactly two hands, both labelled - the both-fists unlock cases.
+    """
+    points, labels, pairs = [], [], []
+    offset = 0
+    for path in paths:
+        data = np.load(path)
+        names = data['label']
+        keep = np.flatnonzero(names != '')
+        frames = data['frame'][keep]
+        # Frames with exactly two labelled hands
+        unique, counts = np.unique(frames, return_counts=True)
+        order = np.argsort(frames, kind='stable')
+        starts = np.searchsorted(frames[order], unique[counts == 2])
+        pairs.append(np.stack([order[starts], order[starts + 1]], axis=1) + offset)
+        points.append(data['landmarks'][keep])
+        labels.append(names[keep])
+        offset += len(keep)
+    if not points:
+        return np.zeros((0, 21, 3), np.float32), np.zeros(0, str), np.zeros((0, 2), np.intp)
+    return np.concatenate(points), np.concatenate(labels), np.concatenate(pairs)
+
+
+def hand_features(points):
+    """Threshold-independent measurements of each hand: (N, 21, 3) -> {name: (N,) array}"""
+    p = np.asarray(points, dtype=np.float64)
+    y = p[:, :, 1]
+
+    def distance(a, b, dims=3):
+        return np.sqrt(((p[:, a, :dims] - p[:, b, :dims]) ** 2).sum(axis=-1))
+
+    tips, pips, mcps = [8, 12, 16, 20], [6, 10, 14, 18], [5, 9, 13, 17]
+    y_closed = y[:, tips] >= y[:, pips]  # Tip at or below PIP
+    tip_to_mcp = np.sqrt(((p[:, tips] - p[:, mcps]) ** 2).sum(axis=-1))
+    palm = (p[:, 0, :2] + p[:, 5, :2]) / 2
+    extended = ~y_closed
+    return {
+        'pinch': distance(4, 8),
+        # A finger counts as closed by its y order or by its tip-to-MCP distance, so the hand
+        # passes the finger part of is_fist when the farthest finger not closed by y is close enough
+        'curl_needed': np.where(y_closed, -np.inf, tip_to_mcp).max(axis=1),
+        'thumb_distance': distance(4, 2),
+        'thumb_length': distance(4, 2, dims=2),
+        'tip_to_palm': np.sqrt(((p[:, 4, :2] - palm) ** 2).sum(axis=-1)),
+        'ip_to_palm': np.sqrt(((p[:, 3, :2] - palm) ** 2).sum(axis=-1)),
+        'thumb_y_closed': y[:, 4] >= y[:, 3],
+        'thumb_up_fingers': y_closed[:, 0] & (y_closed.sum(axis=1) >= 2),
+        'pointing': (y[:, 8] <= y[:, 6]) & y_closed[:, 1:].all(axis=1),
+        'open_palm': extended.all(axis=1),
+        'victory': extended[:, 0] & extended[:, 1] & y_closed[:, 2] & y_closed[:, 3],
+        'ok_sign': (distance(4, 8) <= 0.04) & extended[:, 1:].all(axis=1),
+        'rock': extended[:, 0] & extended[:, 3] & y_closed[:, 1] & y_closed[:, 2],
+        'wrist_x': p[:, 0, 0],
+    }
+
+
+def predict_fist(features, params):
+    """(C, N) is_fist for C candidate threshold sets ({name: (C,) array})"""
+    def column(name):
+        return params[name][:, None]
+
+    fingers_closed = features['curl_needed'][None] < column('fist_finger_distance')
+    thumb_out = (features['thumb_distance'][None] >= column('thumb_length_threshold')) & \
+        (features['tip_to_palm'][None] > features['ip_to_palm'][None] * column('fist_thumb_out_ratio'))
+    thumb_tucked = features['thumb_y_closed'][None] | (features['thumb_distance'][None] < column('fist_thumb_distance'))
+    return fingers_closed & ~thumb_out & thumb_tucked
+
+
+def predict(features, params):
+    """(C, N) gesture codes (index into CASCADE, UNKNOWN_CODE) for C candidate threshold sets"""
+    thumb_up = (features['thumb_length'][None] >= params['thumb_length_threshold'][:, None]) & \
+        (features['tip_to_palm'][None] >= features['ip_to_palm'][None] * params['thumb_out_ratio'][:, None]) & \
+        features['thumb_up_fingers'][None]
+    conditions = (
+        thumb_up,
+        predict_fist(features, params),
+        features['pointing'][None],
+        features['pinch'][None] < params['click_threshold'][:, None],
+        features['open_palm'][None],
+        features['victory'][None],
+        features['ok_sign'][None],
+        features['rock'][None],
+    )
+    # Apply the cascade back to front so the first matching predicate ends up on top
+    codes = np.full((len(params['click_threshold']), len(features['pinch'])), UNKNOWN_CODE, dtype=np.intp)
+    for code in range(len(CASCADE) - 1, -1, -1):
+        codes = np.where(conditions[code], code, codes)
+    return codes
+
+
+def confusion_matrices(predicted, truth, classes):
+    """(C, K, K) counts [candidate, true class, predicted class] with one bincount"""
+    candidates = len(predicted)
+    k = len(classes)
+    index = (np.arange(candidates)[:, None] * k + truth[None]) * k + predicted
+    return np.bincount(index.ravel(), minlength=candidates * k * k).reshape(candidates, k, k)
+
+
+def scores(confusion, present, objective):
+    """(C,) objective per candidate: 'macro_f1' over the labelled classes, or 'accuracy'"""
+    tp = np.diagonal(confusion, axis1=1, axis2=2).astype(np.float64)
+    if objective == 'accuracy':
+        return tp.sum(axis=1) / np.maximum(confusion.sum(axis=(1, 2)), 1)
+    fp = confusion.sum(axis=1) - tp
+    fn = confusion.sum(axis=2) - tp
+    denominator = 2 * tp + fp + fn
+    f1 = np.divide(2 * tp, denominator, out=np.zeros_like(tp), where=denominator > 0)
+    return f1[:, present].mean(axis=1)
+
+
+def candidate_grid(points_per_axis):
+    axes = [np.linspace(low, high, points_per_axis) for low, high in SEARCH_SPACE.values()]
+    mesh = np.meshgrid(*axes, indexing='ij')
+    return {name: values.ravel() for name, values in zip(SEARCH_SPACE, mesh)}
+
+
+def candidate_random(count, seed):
+    rng = np.random.default_rng(seed)
+    return {name: rng.uniform(low, high, count) for name, (low, high) in SEARCH_SPACE.items()}
+
+
+def with_defaults(candidates):
+    """Candidate 0 is always the current defaults (the baseline)"""
+    defaults = default_thresholds()
+    return {name: np.concatenate([[defaults[name]], values]) for name, values in candidates.items()}
+
+
+def evaluate(features, truth, classes, present, candidates, objective):
+    """Objective of every candidate, in batches of at most MAX_CELLS candidate-hand cells"""
+    count = len(candidates['click_threshold'])
+    batch = max(1, MAX_CELLS // max(len(truth), 1))
+    result = np.empty(count)
+    for start in range(0, count, batch):
+        params = {name: values[start:start + batch] for name, values in candidates.items()}
+        confusion = confusion_matrices(predict(features, params), truth, classes)
+        result[start:start + batch] = scores(confusion, present, objective)
+    return result
+
+
+def pick_best(candidates, values, tolerance=1e-9):
+    """Best candidate; among ties the one closest to the defaults (relative to each search range)"""
+    tied = np.flatnonzero(values >= values.max() - tolerance)
+    defaults = default_thresholds()
+    distance = sum(((candidates[name][tied] - defaults[name]) / (high - low)) ** 2
+                   for name, (low, high) in SEARCH_SPACE.items())
+    return int(tied[np.argmin(distance)])
+
+
+def tune_separation(features, labels, pairs, thresholds, steps=121):
+    """(separation, F1, F1 at the default) for the both-fists unlock, or None without two-fist frames"""
+    truth = (labels[pairs[:, 0]] == 'FIST') & (labels[pairs[:, 1]] == 'FIST')
+    if not len(pairs) or not truth.any():
+        return None
+    params = {name: np.array([value]) for name, value in thresholds.items()}
+    fist = predict_fist(features, params)[0]
+    both = fist[pairs[:, 0]] & fist[pairs[:, 1]]
+    gap = np.abs(features['wrist_x'][pairs[:, 0]] - features['wrist_x'][pairs[:, 1]])
+    separations = np.append(np.linspace(*SEPARATION_RANGE, steps), GestureClassifier.both_fists_separation)
+    predicted = both[None] & (gap[None] > separations[:, None])
+    tp = (predicted & truth).sum(axis=1)
+    f1 = 2 * tp / np.maximum(predicted.sum(axis=1) + truth.sum(), 1)
+    sweep = f1[:-1]
+    # Middle of the best plateau - the widest margin on both sides
+    best = np.flatnonzero(sweep >= sweep.max() - 1e-9)
+    return float(separations[best[len(best) // 2]]), float(sweep.max()), float(f1[-1])
+
+
+def class_report(features, truth, classes, thresholds):
+    params = {name: np.array([value]) for name, value in thresholds.items()}
+    confusion = confusion_matrices(predict(features, params), truth, classes)[0]
+    tp = np.diagonal(confusion)
+    return {classes[k]: (tp[k] / confusion[:, k].sum() if confusion[:, k].sum() else None,
+                         tp[k] / confusion[k].sum() if confusion[k].sum() else None,
+                         int(confusion[k].sum()))
+            for k in range(len(classes)) if confusion[k].sum()}
+
+
+def subset(features, index):
+    return {name: values[index] for name, values in features.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit gesture thresholds to a user's labelled recordings")
+    parser.add_argument('recordings', nargs='+', help="<video>.landmarks.npz files from offline_eval.py")
+    parser.add_argument('--user', default=getpass.getuser(), help="Profile name (default: the OS user)")
+    parser.add_argument('--output', default=None, help="Profile file (default: the app's profile for --user)")
+    parser.add_argument('--objective', default='macro_f1', choices=('macro_f1', 'accuracy'))
+    parser.add_argument('--candidates', type=int, default=20000, help="Random search size")
+    parser.add_argument('--grid', type=int, default=None, metavar='N',
+                        help=f"Full grid of N values per threshold instead ({len(SEARCH_SPACE)} thresholds)")
+    parser.add_argument('--validation', type=float, default=0.2, help="Held-out fraction for the report")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    points, labels, pairs = load_recordings(args.recordings)
+    if len(labels) == 0:
+        print("No labelled hands in the recordings")
+        return 1
+    classes = list(CASCADE) + [UNKNOWN] + sorted(set(labels.tolist()) - set(CASCADE) - {UNKNOWN})
+    names, inverse = np.unique(labels, return_inverse=True)
+    truth = np.array([classes.index(name) for name in names])[inverse]
+    features = hand_features(points)
+    train_idx, val_idx = split(len(labels), args.validation, args.seed)
+    present = np.unique(truth[train_idx])
+
+    candidates = candidate_grid(args.grid) if args.grid else candidate_random(args.candidates, args.seed)
+    candidates = with_defaults(candidates)
+    count = len(candidates['click_threshold'])
+    print(f"{len(labels)} labelled hands ({len(train_idx)} tuning, {len(val_idx)} held out), "
+          f"{len(pairs)} two-hand frames, {count} candidates")
+
+    start = time.perf_counter()
+    values = evaluate(subset(features, train_idx), truth[train_idx], classes, present, candidates, args.objective)
+    elapsed = time.perf_counter() - start
+    print(f"Evaluated in {elapsed:.2f}s ({count / elapsed:,.0f} candidates/s, "
+          f"{count * len(train_idx) / elapsed / 1e6:,.1f}M hand classifications/s)")
+
+    best = pick_best(candidates, values)
+    thresholds = {name: float(candidates[name][best]) for name in SEARCH_SPACE}
+    defaults = default_thresholds()
+    separation = tune_separation(features, labels, pairs, thresholds)
+    thresholds['both_fists_separation'] = separation[0] if separation else defaults['both_fists_separation']
+
+    def held_out(chosen):
+        if not len(val_idx):
+            return None
+        params = {name: np.array([chosen[name]]) for name in SEARCH_SPACE}
+        return float(evaluate(subset(features, val_idx), truth[val_idx], classes, np.unique(truth[val_idx]),
+                              params, args.objective)[0])
+
+    baseline_val, tuned_val = held_out(defaults), held_out(thresholds)
+    print(f"\n{args.objective}: defaults {values[0]:.4f} -> tuned {values[best]:.4f} on the tuning hands"
+          + (f", {baseline_val:.4f} -> {tuned_val:.4f} held out" if tuned_val is not None else ""))
+    print(f"\n{'threshold':<24} {'default':>9} {'tuned':>9}")
+    for name in THRESHOLDS:
+        print(f"{name:<24} {defaults[name]:>9.4f} {thresholds[name]:>9.4f}")
+    if separation:
+        print(f"Both-fists unlock F1 {separation[2]:.3f} -> {separation[1]:.3f} on {len(pairs)} two-hand frames")
+    else:
+        print("No frames with two labelled fists - both_fists_separation keeps its default")
+
+    print(f"\n{'gesture':<12} {'precision':>20} {'recall':>20} {'hands':>7}")
+    before, after = class_report(features, truth, classes, defaults), class_report(features, truth, classes, thresholds)
+
+    def pair(a, b):
+        return f"{'-' if a is None else f'{a:.3f}'} -> {'-' if b is None else f'{b:.3f}'}"
+
+    for gesture, (precision, recall, support) in after.items():
+        old_precision, old_recall, _ = before[gesture]
+        print(f"{gesture:<12} {pair(old_precision, precision):>20} {pair(old_recall, recall):>20} {support:>7}")
+
+    output = args.output or profile_path(args.user)
+    save_profile(output, {
+        'version': PROFILE_VERSION,
+        'user': args.user,
+        'created': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'recordings': [os.path.abspath(path) for path in args.recordings],
+        'objective': args.objective,
+        'thresholds': thresholds,
+        'scores': {'default': {'tuning': float(values[0]), 'held_out': baseline_val},
+                   'tuned': {'tuning': float(values[best]), 'held_out': tuned_val}},
+    })
+    print(f"\nProfile saved to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())